@@ -0,0 +1,95 @@
+"""Compare the orjson and stdlib JSON backends on a large synthetic spec.
+
+Usage::
+
+    python benchmarks/bench_json_backend.py --schemas 10000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from oapi_builder import encoding
+
+
+def build_spec(schemas: int) -> dict:
+    components = {}
+    for idx in range(schemas):
+        components[f"Model{idx}"] = {
+            "type": "object",
+            "description": f"Synthetic model number {idx}",
+            "required": ["id", "name"],
+            "properties": {
+                "id": {"type": "integer", "format": "int64", "minimum": 0},
+                "name": {"type": "string", "maxLength": 255},
+                "score": {"type": "number", "format": "double", "default": idx / 7},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "parent": {"$ref": f"#/components/schemas/Model{idx // 2}"},
+            },
+        }
+    paths = {
+        f"/models/{idx}/{{id}}": {
+            "get": {
+                "operationId": f"getModel{idx}",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": f"#/components/schemas/Model{idx}"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+        for idx in range(schemas)
+    }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": components},
+    }
+
+
+def time_backend(spec: dict, backend: str, repeat: int, indent: bool) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoding.dumps(spec, indent=indent, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemas", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--indent", action="store_true")
+    args = parser.parse_args()
+
+    spec = build_spec(args.schemas)
+    backends = [b for b in encoding.BACKENDS if b == "json" or encoding.orjson]
+    outputs = {b: encoding.dumps(spec, indent=args.indent, backend=b) for b in backends}
+    if len(set(outputs.values())) != 1:
+        raise SystemExit("Backends produced different output")
+
+    print(f"{args.schemas} schemas, {len(outputs['json']) / 1e6:.1f} MB output")
+    timings = {b: time_backend(spec, b, args.repeat, args.indent) for b in backends}
+    for backend, seconds in timings.items():
+        print(f"  {backend:<7} {seconds * 1000:9.1f} ms")
+    if "orjson" in timings:
+        print(f"  speedup {timings['json'] / timings['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare lazy, memory-mapped spec access with a full ``json.load``.
+
+A synthetic spec is written to a temporary file (nothing is kept on disk),
+then opened with :class:`~oapi_builder.lazyload.LazySpec` to read a few
+values, patch one operation and write the result back.
+
+Usage::
+
+    python benchmarks/bench_lazyload.py --operations 20000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from synthetic import flat_api
+
+from oapi_builder.lazyload import LazySpec
+from oapi_builder.pointer import escape_token
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    doc = flat_api(args.operations)
+    paths = list(doc["paths"])
+    first = "/paths/" + escape_token(paths[0])
+    last = "/paths/" + escape_token(paths[-1])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "spec.json")
+        with open(path, "w") as fp:
+            json.dump(doc, fp, indent=1)
+        size = os.path.getsize(path)
+
+        def lazy(*pointers: str) -> Callable[[], None]:
+            def run() -> None:
+                with LazySpec(path) as spec:
+                    for pointer in pointers:
+                        spec.get(pointer)
+
+            return run
+
+        def full_load() -> None:
+            with open(path, "rb") as fp:
+                json.load(fp)
+
+        def patch_and_write() -> None:
+            with LazySpec(path) as spec:
+                spec.patch(first + "/get/summary", "patched")
+                spec.write(io.BytesIO())
+
+        timings: Dict[str, float] = {
+            "json.load": best_of(args.repeat, full_load),
+            "open": best_of(args.repeat, lazy()),
+            "get /openapi": best_of(args.repeat, lazy("/openapi")),
+            "get first path": best_of(args.repeat, lazy(first)),
+            "get last path": best_of(args.repeat, lazy(last)),
+            "patch + write": best_of(args.repeat, patch_and_write),
+        }
+    print(f"{args.operations} operations, {size / 1e6:.1f} MB")
+    for name, seconds in timings.items():
+        print(f"  {name:<15} {seconds * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
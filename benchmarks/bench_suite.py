@@ -0,0 +1,177 @@
+"""Build, resolve, validate and render benchmarks on synthetic specs.
+
+Each scenario from :mod:`synthetic` is generated at every requested size
+(number of operations) and run through four phases:
+
+* ``build``: generate the plain document and construct the node tree,
+* ``resolve``: dereference every ``$ref`` under ``paths``,
+* ``validate``: compile each operation's request validator and validate an
+  example payload against it,
+* ``render``: encode the node tree to JSON.
+
+Times are the best of ``--repeat`` runs; peak memory comes from one extra
+run per phase under :mod:`tracemalloc`.  Results are compared against
+``baselines.json`` (phases slower than ``--tolerance`` are reported as
+regressions and make the script exit non-zero); ``--save`` records the
+current numbers as the new baselines.
+
+The default sizes are 1000 and 10000 operations.  100000 is opt-in: it
+takes minutes per scenario, and ``deep`` needs several GiB at that size, so
+its 100k baseline is not recorded.  Baselines only carry the Python
+version and JSON backend; timings still depend on the machine, so record
+them on the runner that checks them.
+
+Usage::
+
+    python benchmarks/bench_suite.py --sizes 1000 10000
+    python benchmarks/bench_suite.py --scenarios flat fan_in polymorphic \\
+        --sizes 100000 --repeat 1
+    python benchmarks/bench_suite.py --scenarios flat --sizes 1000 --save
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from synthetic import SCENARIOS, example_for, operation_schemas
+
+from oapi_builder import Document, RefResolver, SchemaCompiler, encoding
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def _phases(scenario: str, size: int) -> List[Tuple[str, Callable[[], Any]]]:
+    generate = SCENARIOS[scenario]
+    plain = generate(size)
+    tree = Document.from_dict(plain)
+    requests = [
+        (path, method, example_for(plain, schema))
+        for path, method, schema in operation_schemas(plain)
+        if schema is not None
+    ]
+
+    def build() -> Any:
+        return Document.from_dict(generate(size))
+
+    def resolve() -> Any:
+        return RefResolver(plain).dereference(plain["paths"])
+
+    def validate() -> int:
+        compiler = SchemaCompiler(plain)
+        failures = 0
+        for path, method, payload in requests:
+            if compiler.request_validator(path, method).errors(payload):
+                failures += 1
+        if failures:
+            raise AssertionError(f"{failures} example payloads failed to validate")
+        return len(requests)
+
+    def render() -> bytes:
+        return encoding.dumps(tree)
+
+    return [
+        ("build", build),
+        ("resolve", resolve),
+        ("validate", validate),
+        ("render", render),
+    ]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_mb": round(peak / 2**20, 3)}
+
+
+def run(scenarios: List[str], sizes: List[int], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for scenario in scenarios:
+        for size in sizes:
+            key = f"{scenario}/{size}"
+            results[key] = {}
+            for name, func in _phases(scenario, size):
+                results[key][name] = measure(func, repeat)
+                stats = results[key][name]
+                print(
+                    f"{key:<20} {name:<9} {stats['seconds'] * 1000:10.1f} ms"
+                    f" {stats['peak_mb']:9.1f} MB peak",
+                    flush=True,
+                )
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baselines: Dict[str, Any], tolerance: float
+) -> int:
+    regressions = 0
+    for key, phases in results.items():
+        base = baselines.get(key)
+        if base is None:
+            continue
+        for name, stats in phases.items():
+            old = base.get(name)
+            if not old:
+                continue
+            for metric in ("seconds", "peak_mb"):
+                if not old[metric]:
+                    continue
+                ratio = stats[metric] / old[metric]
+                if ratio > 1 + tolerance:
+                    regressions += 1
+                    print(
+                        f"REGRESSION {key} {name} {metric}: "
+                        f"{old[metric]} -> {stats[metric]} ({ratio:.2f}x)"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--save", action="store_true", help="store as baselines")
+    args = parser.parse_args()
+
+    results = run(args.scenarios, args.sizes, args.repeat)
+    stored: Dict[str, Any] = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as fp:
+            stored = json.load(fp)
+    if args.save:
+        stored["environment"] = {
+            "python": platform.python_version(),
+            "json_backend": encoding.BACKEND,
+        }
+        stored.setdefault("results", {}).update(results)
+        with open(args.baselines, "w") as fp:
+            json.dump(stored, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+        print(f"Saved baselines for {len(results)} runs to {args.baselines}")
+        return
+    regressions = compare(results, stored.get("results", {}), args.tolerance)
+    if regressions:
+        sys.exit(f"{regressions} regression(s) beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Synthetic OpenAPI documents for benchmarks.
+
+Every generator takes the number of operations and returns a plain document;
+the shape parameters have defaults that keep documents realistic at any
+size.  :data:`SCENARIOS` maps scenario names to generators, and
+:func:`example_for` produces a payload that validates against a schema so
+the same documents can drive validation benchmarks.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+SCHEMA_REF = "#/components/schemas/"
+
+
+def _document(paths: Dict[str, Any], schemas: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def _operation(
+    idx: int, response: Dict[str, Any], body: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    operation: Dict[str, Any] = {
+        "operationId": f"op{idx}",
+        "tags": [f"tag{idx % 20}"],
+        "parameters": [
+            {
+                "name": "id",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "integer"},
+            },
+            {"name": "verbose", "in": "query", "schema": {"type": "boolean"}},
+        ],
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {"application/json": {"schema": response}},
+            },
+            "404": {"description": "Not found"},
+        },
+    }
+    if body is not None:
+        operation["requestBody"] = {
+            "required": True,
+            "content": {"application/json": {"schema": body}},
+        }
+    return operation
+
+
+def _model(idx: int, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {
+        "id": {"type": "integer", "format": "int64", "minimum": 0},
+        "name": {"type": "string", "maxLength": 255},
+        "score": {"type": "number", "format": "double"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "status": {"type": "string", "enum": ["active", "inactive", "pending"]},
+    }
+    properties.update(extra or {})
+    return {
+        "type": "object",
+        "description": f"Synthetic model number {idx}",
+        "required": ["id", "name"],
+        "properties": properties,
+    }
+
+
+def flat_api(operations: int, schemas: Optional[int] = None) -> Dict[str, Any]:
+    """``operations`` operations over ``schemas`` models (default: half as many).
+
+    Models reference a parent model, forming shallow ``$ref`` chains.
+    """
+    schemas = max(1, operations // 2) if schemas is None else schemas
+    components = {
+        f"Model{idx}": _model(
+            idx, {"parent": {"$ref": f"{SCHEMA_REF}Model{idx // 2}"}} if idx else None
+        )
+        for idx in range(schemas)
+    }
+    paths: Dict[str, Any] = {}
+    for idx in range(operations):
+        ref = {"$ref": f"{SCHEMA_REF}Model{idx % schemas}"}
+        method = "post" if idx % 3 == 0 else "get"
+        body = ref if method == "post" else None
+        paths.setdefault(f"/resources{idx // 2}/{{id}}", {})[method] = _operation(
+            idx, ref, body
+        )
+    return _document(paths, components)
+
+
+def _nested(level: int, depth: int, idx: int) -> Dict[str, Any]:
+    if level == depth:
+        return {"type": "string", "minLength": 1}
+    return {
+        "type": "object",
+        "required": ["child"],
+        "properties": {
+            "label": {"type": "string"},
+            "count": {"type": "integer", "minimum": 0},
+            "child": _nested(level + 1, depth, idx),
+            "items": {"type": "array", "items": {"type": "number"}},
+        },
+    }
+
+
+def deep_nesting(operations: int, depth: int = 12) -> Dict[str, Any]:
+    """Operations whose inline schemas nest ``depth`` objects deep."""
+    paths = {
+        f"/deep{idx}": {
+            "post": _operation(idx, _nested(0, depth, idx), _nested(0, depth, idx))
+        }
+        for idx in range(operations)
+    }
+    return _document(paths, {"Leaf": {"type": "string"}})
+
+
+def ref_fan_in(operations: int, targets: int = 10, chain: int = 4) -> Dict[str, Any]:
+    """Every operation references one of a few heavily shared models.
+
+    Each shared model is the end of a ``chain`` of ``allOf`` references, so
+    resolving any operation walks several shared targets.
+    """
+    components: Dict[str, Any] = {"Base": _model(0)}
+    for target in range(targets):
+        previous = "Base"
+        for link in range(chain):
+            name = f"Shared{target}_{link}"
+            components[name] = {
+                "allOf": [
+                    {"$ref": SCHEMA_REF + previous},
+                    {
+                        "type": "object",
+                        "properties": {f"field{link}": {"type": "string"}},
+                    },
+                ]
+            }
+            previous = name
+    paths = {}
+    for idx in range(operations):
+        ref = {"$ref": f"{SCHEMA_REF}Shared{idx % targets}_{chain - 1}"}
+        paths[f"/shared{idx}"] = {"put": _operation(idx, ref, ref)}
+    return _document(paths, components)
+
+
+def polymorphic(operations: int, depth: int = 3, branching: int = 3) -> Dict[str, Any]:
+    """Operations returning ``oneOf`` trees with discriminators.
+
+    The tree has ``branching`` alternatives per level and ``depth`` levels;
+    leaves are concrete models told apart by a ``kind`` property, and every
+    level maps the kinds below it to the branch that contains them.
+    """
+    components: Dict[str, Any] = {}
+
+    def build(prefix: str, level: int) -> List[str]:
+        if level == depth:
+            components[prefix] = _model(
+                level,
+                {"kind": {"type": "string", "enum": [prefix]}},
+            )
+            components[prefix]["required"] = ["id", "name", "kind"]
+            return [prefix]
+        children = [f"{prefix}_{branch}" for branch in range(branching)]
+        mapping = {
+            kind: SCHEMA_REF + child
+            for child in children
+            for kind in build(child, level + 1)
+        }
+        components[prefix] = {
+            "oneOf": [{"$ref": SCHEMA_REF + child} for child in children],
+            "discriminator": {"propertyName": "kind", "mapping": mapping},
+        }
+        return list(mapping)
+
+    roots = [f"Poly{root}" for root in range(4)]
+    for root in roots:
+        build(root, 0)
+    paths = {}
+    for idx in range(operations):
+        ref = {"$ref": SCHEMA_REF + roots[idx % len(roots)]}
+        paths[f"/poly{idx}"] = {"post": _operation(idx, ref, ref)}
+    return _document(paths, components)
+
+
+SCENARIOS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "flat": flat_api,
+    "deep": deep_nesting,
+    "fan_in": ref_fan_in,
+    "polymorphic": polymorphic,
+}
+
+
+def _resolve(doc: Mapping[str, Any], schema: Mapping[str, Any]) -> Mapping[str, Any]:
+    while "$ref" in schema:
+        schema = doc["components"]["schemas"][schema["$ref"][len(SCHEMA_REF) :]]
+    return schema
+
+
+def example_for(
+    doc: Mapping[str, Any], schema: Mapping[str, Any], depth: int = 0
+) -> Any:
+    """Return a value that validates against ``schema``.
+
+    Only required properties are filled in below a few levels, which keeps
+    examples of recursive models finite.
+    """
+    schema = _resolve(doc, schema)
+    if "oneOf" in schema:
+        return example_for(doc, schema["oneOf"][0], depth)
+    if "allOf" in schema:
+        merged: Dict[str, Any] = {}
+        for part in schema["allOf"]:
+            merged.update(example_for(doc, part, depth))
+        return merged
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        required = set(schema.get("required", ()))
+        return {
+            name: example_for(doc, prop, depth + 1)
+            for name, prop in schema.get("properties", {}).items()
+            if depth < 3 or name in required
+        }
+    if kind == "array":
+        return [example_for(doc, schema.get("items", {}), depth + 1) for _ in range(2)]
+    if kind == "integer":
+        return 7
+    if kind == "number":
+        return 1.5
+    if kind == "boolean":
+        return True
+    if kind == "string":
+        return "sample"
+    return None
+
+
+def operation_schemas(doc: Mapping[str, Any]) -> List[Any]:
+    """``(path, method, request schema or None)`` for every operation."""
+    found = []
+    for path, item in doc["paths"].items():
+        for method, operation in item.items():
+            body = operation.get("requestBody")
+            schema = body["content"]["application/json"]["schema"] if body else None
+            found.append((path, method, schema))
+    return found
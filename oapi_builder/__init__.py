@@ -0,0 +1,123 @@
+"""Build, transform and render OpenAPI documents."""
+from oapi_builder.aio import SpecEndpoint, aiter_json, build_async, render_async
+from oapi_builder.batch import BatchBuildError, build_many
+from oapi_builder.bundle import Bundler, bundle
+from oapi_builder.bulk import BatchReport, validate_jsonl, validate_many
+from oapi_builder.cache import BuildCache, fingerprint
+from oapi_builder.canonical import canonicalize
+from oapi_builder.dedupe import dedupe_schemas
+from oapi_builder.diff import Change, SpecDiff, diff_documents
+from oapi_builder.errors import OapiBuilderError, RefCycleError, RefResolutionError
+from oapi_builder.graph import ReferenceGraph, prune_unused
+from oapi_builder.hashing import structural_hash
+from oapi_builder.incremental import IncrementalDocument
+from oapi_builder.index import SpecIndex
+from oapi_builder.lazy import ComponentLibrary, LazyComponents
+from oapi_builder.lazyload import LazySpec
+from oapi_builder.merge import MergeConflictError, merge_documents
+from oapi_builder.model import (
+    Components,
+    Document,
+    Header,
+    Info,
+    MediaType,
+    Node,
+    Operation,
+    Parameter,
+    PathItem,
+    Reference,
+    RequestBody,
+    Response,
+    Schema,
+    SecurityScheme,
+    Server,
+    Tag,
+    to_plain,
+)
+from oapi_builder.persistent import (
+    filter_operations,
+    prune,
+    public_view,
+    strip_extensions,
+    tenant_view,
+)
+from oapi_builder.profiling import Profiler, profile
+from oapi_builder.resolver import RefResolver
+from oapi_builder.schema_gen import SchemaGenerator
+from oapi_builder.serialize import dump_json, dump_yaml, iter_json, iter_yaml
+from oapi_builder.serving import RenderedSpec
+from oapi_builder.validators import (
+    SchemaCompiler,
+    ValidationError,
+    ValidationIssue,
+    Validator,
+)
+
+__all__ = [
+    "BatchBuildError",
+    "BatchReport",
+    "BuildCache",
+    "Bundler",
+    "Change",
+    "ComponentLibrary",
+    "Components",
+    "Document",
+    "Header",
+    "IncrementalDocument",
+    "Info",
+    "LazyComponents",
+    "LazySpec",
+    "MediaType",
+    "MergeConflictError",
+    "Node",
+    "OapiBuilderError",
+    "Operation",
+    "Parameter",
+    "PathItem",
+    "Profiler",
+    "RefCycleError",
+    "RefResolutionError",
+    "RefResolver",
+    "Reference",
+    "ReferenceGraph",
+    "RenderedSpec",
+    "RequestBody",
+    "Response",
+    "Schema",
+    "SchemaCompiler",
+    "SchemaGenerator",
+    "SecurityScheme",
+    "Server",
+    "SpecDiff",
+    "SpecEndpoint",
+    "SpecIndex",
+    "Tag",
+    "ValidationError",
+    "ValidationIssue",
+    "Validator",
+    "aiter_json",
+    "build_async",
+    "build_many",
+    "bundle",
+    "canonicalize",
+    "dedupe_schemas",
+    "diff_documents",
+    "dump_json",
+    "dump_yaml",
+    "filter_operations",
+    "fingerprint",
+    "iter_json",
+    "iter_yaml",
+    "merge_documents",
+    "profile",
+    "prune",
+    "prune_unused",
+    "public_view",
+    "render_async",
+    "strip_extensions",
+    "structural_hash",
+    "tenant_view",
+    "to_plain",
+    "validate_jsonl",
+    "validate_many",
+]
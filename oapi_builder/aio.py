@@ -0,0 +1,192 @@
+"""Coroutine-friendly building and rendering for asyncio applications.
+
+Building and rendering a large spec is CPU-bound work measured in hundreds
+of milliseconds; running it directly in a coroutine stalls every other
+request on the event loop.  The helpers here either offload that work to a
+thread (:func:`build_async`, :func:`render_async`) or stream the output while
+handing control back to the loop between chunks (:func:`aiter_json`).
+
+:class:`SpecEndpoint` wraps a build function for ``/openapi.json`` style
+endpoints: the spec is built and rendered once, off the loop, on the first
+request; concurrent first requests wait for that single build, and later
+requests get the cached bytes.  It is also a minimal ASGI application.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+from oapi_builder.batch import FORMATS, render
+from oapi_builder.serialize import DEFAULT_CHUNK_SIZE, DEFAULT_STREAM_DEPTH, iter_json
+from oapi_builder.serving import RenderedSpec
+
+__all__ = [
+    "SpecEndpoint",
+    "aiter_json",
+    "build_async",
+    "render_async",
+]
+
+
+async def _offload(
+    executor: Optional[Executor], func: Callable[..., Any], *args: Any
+) -> Any:
+    loop = asyncio.get_running_loop()
+    # Executors do not propagate contextvars; carry them over so an active
+    # profiler sees the offloaded work.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        executor, functools.partial(context.run, func, *args)
+    )
+
+
+async def build_async(
+    build: Callable[..., Any], *args: Any, executor: Optional[Executor] = None
+) -> Any:
+    """Run ``build(*args)`` in ``executor`` (the loop's default thread pool).
+
+    Coroutine functions are awaited directly instead.
+    """
+    if inspect.iscoroutinefunction(build):
+        return await build(*args)
+    return await _offload(executor, build, *args)
+
+
+async def render_async(
+    doc: Any,
+    fmt: str = "json",
+    indent: bool = False,
+    executor: Optional[Executor] = None,
+    canonical: bool = False,
+) -> bytes:
+    """Render ``doc`` to bytes without blocking the event loop.
+
+    ``canonical`` is passed on to :func:`~oapi_builder.batch.render`.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    return await _offload(executor, render, doc, fmt, indent, canonical)
+
+
+async def aiter_json(
+    doc: Any,
+    indent: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream_depth: int = DEFAULT_STREAM_DEPTH,
+) -> AsyncIterator[bytes]:
+    """Stream ``doc`` as JSON, yielding to the event loop between chunks.
+
+    Encoding happens on the loop thread, one chunk of about ``chunk_size``
+    bytes at a time, so no single step blocks for long; suitable for
+    streaming responses.
+    """
+    buffer = []
+    size = 0
+    for piece in iter_json(doc, indent=indent, stream_depth=stream_depth):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+            await asyncio.sleep(0)
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+Build = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class SpecEndpoint:
+    """Builds a spec on first use and serves the cached rendered bytes.
+
+    Responses come from a :class:`~oapi_builder.serving.RenderedSpec`, so
+    gzip and ``If-None-Match`` are handled without re-rendering.
+
+    :param build: returns the document; a plain function runs in
+        ``executor`` (the loop's default thread pool), a coroutine function
+        is awaited.  Rendering and compression always run in ``executor``.
+    :param canonical: render in canonical key order, so rebuilds of an
+        equal document keep the same ETag.
+    """
+
+    def __init__(
+        self,
+        build: Build,
+        fmt: str = "json",
+        indent: bool = False,
+        executor: Optional[Executor] = None,
+        canonical: bool = False,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        self.build = build
+        self.fmt = fmt
+        self.indent = indent
+        self.executor = executor
+        self.canonical = canonical
+        self._rendered: Optional[RenderedSpec] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.builds = 0
+
+    @property
+    def cached(self) -> bool:
+        return self._rendered is not None
+
+    def invalidate(self) -> None:
+        """Drop the cached bytes; the next request rebuilds the spec."""
+        self._rendered = None
+
+    async def rendered(self) -> RenderedSpec:
+        """Return the rendered spec, building it on first use."""
+        rendered = self._rendered
+        if rendered is not None:
+            return rendered
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._rendered is None:
+                doc = await build_async(self.build, executor=self.executor)
+                self._rendered = await _offload(
+                    self.executor,
+                    RenderedSpec.from_document,
+                    doc,
+                    self.fmt,
+                    self.indent,
+                    self.canonical,
+                )
+                self.builds += 1
+            return self._rendered
+
+    async def body(self) -> bytes:
+        """Return the rendered bytes, building the spec on first use."""
+        return (await self.rendered()).body
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Serve the spec as an ASGI application."""
+        if scope["type"] != "http":
+            raise RuntimeError(f"SpecEndpoint cannot handle {scope['type']!r} scopes")
+        request_headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers") or ()
+        }
+        status, headers, body = (await self.rendered()).respond(
+            request_headers.get("if-none-match"),
+            request_headers.get("accept-encoding"),
+            head=scope.get("method") == "HEAD",
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,162 @@
+"""Build and render many specs in parallel.
+
+:func:`build_many` takes a mapping of spec names to definitions and a
+``build`` callable turning one definition into a document.  Each spec is
+built and rendered in a worker process; results come back keyed and ordered
+by name regardless of completion order, and failures are collected into a
+single :class:`BatchBuildError` instead of aborting the whole batch.
+
+``build`` and the definitions must be picklable (module-level functions and
+plain data), as with any :class:`~concurrent.futures.ProcessPoolExecutor`.
+"""
+from __future__ import annotations
+
+import os
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from oapi_builder import encoding
+from oapi_builder.canonical import canonicalize
+from oapi_builder.errors import OapiBuilderError
+from oapi_builder.profiling import phase
+from oapi_builder.serialize import iter_yaml
+
+__all__ = ["BatchBuildError", "SpecFailure", "build_many", "render"]
+
+FORMATS = ("json", "yaml")
+
+
+class SpecFailure:
+    """The error raised while building one spec of a batch."""
+
+    __slots__ = ("name", "error", "traceback")
+
+    def __init__(self, name: str, error: str, traceback: str):
+        self.name = name
+        self.error = error
+        self.traceback = traceback
+
+    def __repr__(self) -> str:
+        return f"SpecFailure({self.name!r}, {self.error!r})"
+
+
+class BatchBuildError(OapiBuilderError):
+    """One or more specs of a batch failed to build.
+
+    ``failures`` holds a :class:`SpecFailure` per failed spec, sorted by
+    name, and ``results`` the rendered output of the specs that succeeded.
+    """
+
+    def __init__(self, failures: List[SpecFailure], results: Dict[str, bytes]):
+        self.failures = failures
+        self.results = results
+        lines = [f"{len(failures)} of {len(failures) + len(results)} specs failed:"]
+        lines.extend(f"  {failure.name}: {failure.error}" for failure in failures)
+        super().__init__("\n".join(lines))
+
+
+def render(
+    doc: Any, fmt: str = "json", indent: bool = False, canonical: bool = False
+) -> bytes:
+    """Render ``doc`` to bytes in ``fmt`` (``"json"`` or ``"yaml"``).
+
+    With ``canonical`` the output is in the key order of
+    :func:`~oapi_builder.canonical.canonicalize`, so equal documents render to
+    identical bytes however they were built.
+    """
+    if canonical:
+        with phase("serialization"):
+            doc = canonicalize(doc)
+    if fmt == "json":
+        with phase("serialization"):
+            return encoding.dumps(doc, indent=indent)
+    if fmt == "yaml":
+        with phase("serialization"):
+            return "".join(iter_yaml(doc)).encode("utf-8")
+    raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+
+
+def _build_one(
+    name: str,
+    build: Callable[[Any], Any],
+    definition: Any,
+    fmt: str,
+    indent: bool,
+    output_dir: Optional[str],
+    canonical: bool,
+) -> Tuple[str, Optional[bytes], Optional[Tuple[str, str]]]:
+    try:
+        data = render(build(definition), fmt, indent, canonical)
+        if output_dir is not None:
+            path = os.path.join(output_dir, f"{name}.{fmt}")
+            with open(path, "wb") as fp:
+                fp.write(data)
+        return name, data, None
+    except Exception as err:  # reported through BatchBuildError
+        return name, None, (f"{type(err).__name__}: {err}", traceback.format_exc())
+
+
+def build_many(
+    definitions: Mapping[str, Any],
+    build: Callable[[Any], Any],
+    fmt: str = "json",
+    indent: bool = False,
+    max_workers: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    canonical: bool = False,
+) -> Dict[str, bytes]:
+    """Build and render every definition, in parallel.
+
+    :param definitions: spec name -> definition passed to ``build``.
+    :param build: returns the document for one definition.
+    :param output_dir: when given, each spec is also written to
+        ``<output_dir>/<name>.<fmt>`` by the worker that built it.
+    :param executor: an existing executor to submit to; by default a
+        process pool with ``max_workers`` workers is created for the call.
+    :param canonical: render in canonical key order (see :func:`render`).
+    :returns: spec name -> rendered bytes, ordered by name.
+    :raises BatchBuildError: if any spec failed; every spec is still
+        attempted and the successful results are attached to the error.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    names = sorted(definitions)
+    results: Dict[str, bytes] = {}
+    failures: List[SpecFailure] = []
+
+    def record(name: str, data: Optional[bytes], error: Any) -> None:
+        if error is None:
+            results[name] = data
+        else:
+            failures.append(SpecFailure(name, *error))
+
+    def arguments(name: str) -> Tuple[Any, ...]:
+        return (name, build, definitions[name], fmt, indent, output_dir, canonical)
+
+    def collect(pool: Executor) -> None:
+        futures = {pool.submit(_build_one, *arguments(name)): name for name in names}
+        for future in as_completed(futures):
+            try:
+                record(*future.result())
+            except Exception as err:  # the worker died or could not unpickle
+                error = (f"{type(err).__name__}: {err}", traceback.format_exc())
+                record(futures[future], None, error)
+
+    if executor is not None:
+        collect(executor)
+    elif len(names) <= 1 or max_workers == 1:
+        for name in names:
+            record(*_build_one(*arguments(name)))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            collect(pool)
+
+    ordered = {name: results[name] for name in names if name in results}
+    if failures:
+        failures.sort(key=lambda failure: failure.name)
+        raise BatchBuildError(failures, ordered)
+    return ordered
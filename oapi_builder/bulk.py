@@ -0,0 +1,220 @@
+"""Validate many payloads against one schema.
+
+The functions here take a :class:`~oapi_builder.validators.Validator`
+(typically from :meth:`SchemaCompiler.request_validator
+<oapi_builder.validators.SchemaCompiler.request_validator>` or
+:meth:`~oapi_builder.validators.SchemaCompiler.response_validator`) and run
+it over a whole batch, sharing everything that does not depend on the
+individual record:
+
+* the schema is compiled once, before the first record;
+* JSON Lines input is decoded with the fastest available backend, line by
+  line, so files far larger than memory can be checked;
+* records that are byte-for-byte identical (captured traffic repeats a lot)
+  are validated once and the outcome reused, as are repeated objects in an
+  in-memory batch.
+
+Only failing records are kept in the :class:`BatchReport`.
+"""
+from __future__ import annotations
+
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from oapi_builder import encoding
+from oapi_builder.validators import ValidationIssue, Validator
+
+__all__ = [
+    "BatchReport",
+    "RecordResult",
+    "iter_validate_jsonl",
+    "validate_jsonl",
+    "validate_many",
+]
+
+DEFAULT_CACHE_SIZE = 65536
+
+_NO_ISSUES: Tuple[ValidationIssue, ...] = ()
+
+
+class RecordResult:
+    """The outcome of validating one record.
+
+    :ivar index: position of the record in the batch; for JSON Lines input,
+        the 1-based line number.
+    :ivar issues: problems found, empty for a valid record.
+    """
+
+    __slots__ = ("index", "issues")
+
+    def __init__(self, index: int, issues: Tuple[ValidationIssue, ...]):
+        self.index = index
+        self.issues = issues
+
+    @property
+    def valid(self) -> bool:
+        return not self.issues
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "issues": [i.to_dict() for i in self.issues]}
+
+    def __repr__(self) -> str:
+        return f"<RecordResult {self.index}: {len(self.issues)} issues>"
+
+
+class BatchReport:
+    """Summary of a batch: the record count and every failing record."""
+
+    def __init__(self, total: int, failures: List[RecordResult], reused: int):
+        self.total = total
+        self.failures = failures
+        #: records whose outcome was taken from an identical earlier record
+        self.reused = reused
+
+    @property
+    def valid(self) -> bool:
+        return not self.failures
+
+    @property
+    def errors(self) -> Dict[int, Tuple[ValidationIssue, ...]]:
+        """Record index -> issues, for failing records only."""
+        return {result.index: result.issues for result in self.failures}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "invalid": len(self.failures),
+            "failures": [result.to_dict() for result in self.failures],
+        }
+
+    def __repr__(self) -> str:
+        return f"<BatchReport {len(self.failures)} of {self.total} records invalid>"
+
+
+class _OutcomeCache:
+    """Bounded map from a record key to its issues."""
+
+    def __init__(self, size: int):
+        self.size = size
+        # key -> (issues, pinned value); the value keeps an id key valid.
+        self.entries: Dict[Any, Tuple[Tuple[ValidationIssue, ...], Any]] = {}
+        self.hits = 0
+
+    def get(self, key: Any) -> Optional[Tuple[ValidationIssue, ...]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(
+        self, key: Any, issues: Tuple[ValidationIssue, ...], pin: Any = None
+    ) -> None:
+        if self.size <= 0:
+            return
+        if len(self.entries) >= self.size:
+            self.entries.clear()
+        self.entries[key] = (issues, pin)
+
+
+def _check(validator: Validator, payload: Any) -> Tuple[ValidationIssue, ...]:
+    issues = validator.errors(payload)
+    return tuple(issues) if issues else _NO_ISSUES
+
+
+def validate_many(
+    validator: Validator,
+    payloads: Iterable[Any],
+    cache_size: int = DEFAULT_CACHE_SIZE,
+) -> BatchReport:
+    """Validate every decoded payload in ``payloads``.
+
+    Container payloads are matched by identity for reuse, so a batch holding
+    the same object many times validates it once; payloads must not be
+    mutated while the call runs.
+    """
+    cache = _OutcomeCache(cache_size)
+    failures: List[RecordResult] = []
+    total = 0
+    for index, payload in enumerate(payloads):
+        total += 1
+        if isinstance(payload, (dict, list)):
+            issues = cache.get(id(payload))
+            if issues is None:
+                issues = _check(validator, payload)
+                cache.put(id(payload), issues, payload)
+        else:
+            issues = _check(validator, payload)
+        if issues:
+            failures.append(RecordResult(index, issues))
+    return BatchReport(total, failures, cache.hits)
+
+
+def _iter_lines(
+    validator: Validator, lines: Iterable[bytes], cache: _OutcomeCache
+) -> Iterator[RecordResult]:
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        issues = cache.get(line)
+        if issues is None:
+            try:
+                payload = encoding.loads(line)
+            except ValueError as err:
+                issues = (ValidationIssue("", "json", f"invalid JSON: {err}"),)
+            else:
+                issues = _check(validator, payload)
+            cache.put(line, issues)
+        yield RecordResult(lineno, issues)
+
+
+def _open_lines(
+    source: Union[str, IO[bytes]],
+    results: Callable[[IO[bytes]], Iterator[RecordResult]],
+) -> Iterator[RecordResult]:
+    if isinstance(source, str):
+        with open(source, "rb") as fp:
+            yield from results(fp)
+    else:
+        yield from results(source)
+
+
+def iter_validate_jsonl(
+    validator: Validator,
+    source: Union[str, IO[bytes]],
+    cache_size: int = DEFAULT_CACHE_SIZE,
+) -> Iterator[RecordResult]:
+    """Validate a JSON Lines file lazily, yielding a result per record.
+
+    :param source: a path or a binary file object.  Blank lines are skipped;
+        lines that are not valid JSON fail with the ``json`` keyword.
+    """
+    cache = _OutcomeCache(cache_size)
+    return _open_lines(source, lambda fp: _iter_lines(validator, fp, cache))
+
+
+def validate_jsonl(
+    validator: Validator,
+    source: Union[str, IO[bytes]],
+    cache_size: int = DEFAULT_CACHE_SIZE,
+) -> BatchReport:
+    """Validate a JSON Lines file; see :func:`iter_validate_jsonl`."""
+    cache = _OutcomeCache(cache_size)
+    total = 0
+    failures: List[RecordResult] = []
+    for result in _open_lines(source, lambda fp: _iter_lines(validator, fp, cache)):
+        total += 1
+        if result.issues:
+            failures.append(result)
+    return BatchReport(total, failures, cache.hits)
@@ -0,0 +1,160 @@
+"""Bundle a spec split across many files into a single document.
+
+External references such as ``./common.yaml#/components/schemas/Error`` are
+either hoisted into the bundled document's ``components`` (the default) and
+replaced with local references, or inlined in place.  The component kind of
+a hoisted target is taken from its pointer when it points into another
+document's ``components``, and from where the reference appears otherwise
+(a reference under ``responses`` becomes a response, one under ``schema`` a
+schema, ...).
+
+All parsing goes through one :class:`~oapi_builder.resolver.RefResolver`,
+so each file is read and parsed once per :class:`Bundler` no matter how many
+references point into it, and every ``(file, pointer)`` target is copied
+into the bundle once.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from oapi_builder.errors import RefCycleError
+from oapi_builder.pointer import escape_token, split_pointer, split_ref
+from oapi_builder.resolver import RefResolver, load_document
+
+__all__ = ["Bundler", "bundle"]
+
+Key = Tuple[str, str]
+
+_CHILD_KINDS = {
+    "schema": "schemas",
+    "schemas": "schemas",
+    "parameters": "parameters",
+    "responses": "responses",
+    "requestBody": "requestBodies",
+    "requestBodies": "requestBodies",
+    "headers": "headers",
+    "examples": "examples",
+    "links": "links",
+    "callbacks": "callbacks",
+    "securitySchemes": "securitySchemes",
+}
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _child_kind(kind: Optional[str], key: str) -> Optional[str]:
+    if kind == "schemas":
+        return kind
+    return _CHILD_KINDS.get(key, kind)
+
+
+class Bundler:
+    """Bundles multi-file specs, sharing one parse cache across runs.
+
+    Files are cached for the lifetime of the bundler; call :meth:`clear`
+    (or create a new bundler) to pick up changes on disk.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_document):
+        self._loader = loader
+        self.resolver = RefResolver(loader=self._load)
+        self.parses = 0
+
+    def _load(self, uri: str) -> Any:
+        self.parses += 1
+        return self._loader(uri)
+
+    def clear(self) -> None:
+        self.resolver.invalidate()
+
+    def bundle(self, path: str, mode: str = "hoist") -> Dict[str, Any]:
+        """Return the document at ``path`` with all external refs resolved.
+
+        :param mode: ``"hoist"`` moves external targets into ``components``;
+            ``"inline"`` copies them in place, hoisting only targets that
+            refer back to themselves and so cannot be inlined.
+        """
+        if mode not in ("hoist", "inline"):
+            raise ValueError("mode must be 'hoist' or 'inline'")
+        root_uri = os.path.abspath(path)
+        return _BundleRun(self.resolver, root_uri, mode).run()
+
+
+class _BundleRun:
+    def __init__(self, resolver: RefResolver, root_uri: str, mode: str):
+        self.resolver = resolver
+        self.root_uri = root_uri
+        self.mode = mode
+        self.root = resolver.document(root_uri)
+        existing = self.root.get("components") or {}
+        self.used: Dict[str, Set[str]] = {
+            kind: set(entries) for kind, entries in existing.items()
+        }
+        self.hoisted: Dict[Key, str] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.inlining: Dict[Key, None] = {}
+
+    def run(self) -> Dict[str, Any]:
+        doc = self.copy(self.root, self.root_uri, None)
+        if self.components:
+            components = doc.setdefault("components", {})
+            for kind, entries in self.components.items():
+                components.setdefault(kind, {}).update(entries)
+        return doc
+
+    def copy(self, node: Any, uri: str, kind: Optional[str]) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self.reference(ref, uri, kind)
+            return {
+                key: self.copy(value, uri, _child_kind(kind, key))
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [self.copy(value, uri, kind) for value in node]
+        return node
+
+    def reference(self, ref: str, uri: str, kind: Optional[str]) -> Any:
+        key = split_ref(ref, uri)
+        target_uri, pointer = key
+        if target_uri == self.root_uri:
+            return {"$ref": "#" + pointer}
+        tokens = split_pointer(pointer)
+        if len(tokens) == 3 and tokens[0] == "components":
+            kind = tokens[1]
+        if key in self.hoisted:
+            return {"$ref": self.hoisted[key]}
+        if kind is None or (self.mode == "inline" and key not in self.inlining):
+            if key in self.inlining:
+                raise RefCycleError([*self.inlining, key])
+            self.inlining[key] = None
+            try:
+                return self.copy(self.resolver.lookup(*key), target_uri, kind)
+            finally:
+                del self.inlining[key]
+        return {"$ref": self.hoist(key, kind, tokens)}
+
+    def hoist(self, key: Key, kind: str, tokens: List[str]) -> str:
+        target_uri, _ = key
+        stem = os.path.splitext(os.path.basename(target_uri))[0]
+        base = _INVALID_NAME_CHARS.sub("_", tokens[-1] if tokens else stem) or stem
+        used = self.used.setdefault(kind, set())
+        name, suffix = base, 1
+        while name in used:
+            suffix += 1
+            name = f"{base}{suffix}"
+        used.add(name)
+        local = f"#/components/{kind}/{escape_token(name)}"
+        # Register before copying so recursive targets refer to themselves.
+        self.hoisted[key] = local
+        entries = self.components.setdefault(kind, {})
+        entries[name] = None
+        entries[name] = self.copy(self.resolver.lookup(*key), target_uri, kind)
+        return local
+
+
+def bundle(path: str, mode: str = "hoist") -> Dict[str, Any]:
+    """Bundle the spec at ``path`` with a one-off :class:`Bundler`."""
+    return Bundler().bundle(path, mode)
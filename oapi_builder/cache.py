@@ -0,0 +1,235 @@
+"""Persistent on-disk cache for generated schemas and rendered fragments.
+
+Entries are keyed by a fingerprint of the Python object they were generated
+from: its module, qualified name and source code, the sources of its base
+classes and of every type its annotations refer to (nested models, generic
+arguments, the members of type aliases), optionally combined with extra
+inputs.  A CI job can point :class:`BuildCache` at a directory that survives
+between pipelines and only pay for the types and handlers whose code
+actually changed.
+
+Only what the annotations reach is tracked: a module-level constant used in
+a default value or a method body is not part of the fingerprint, so pass it
+as an extra input (or bump :data:`CACHE_FORMAT`) when it affects the output.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+import typing
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import attr
+except ImportError:  # pragma: no cover - depends on the environment
+    attr = None
+
+from oapi_builder import encoding
+
+__all__ = ["CACHE_FORMAT", "BuildCache", "fingerprint"]
+
+# Bump when generated output changes for unchanged inputs.
+CACHE_FORMAT = "1"
+
+_STDLIB = frozenset(getattr(sys, "stdlib_module_names", ())) | {"builtins"}
+
+
+def _source_of(obj: Any) -> str:
+    target = inspect.unwrap(obj) if callable(obj) else obj
+    try:
+        return inspect.getsource(target)
+    except (OSError, TypeError):
+        pass
+    # Dynamically created objects: fall back to what can be introspected.
+    annotations = getattr(target, "__annotations__", None)
+    code = getattr(target, "__code__", None)
+    return repr(
+        (
+            sorted((str(k), repr(v)) for k, v in (annotations or {}).items()),
+            code.co_code.hex() if code is not None else None,
+        )
+    )
+
+
+def _is_stdlib(obj: Any) -> bool:
+    module = getattr(obj, "__module__", None) or "builtins"
+    return module.partition(".")[0] in _STDLIB
+
+
+def _hints(obj: Any) -> Dict[str, Any]:
+    try:
+        return typing.get_type_hints(obj, include_extras=True)
+    except Exception:  # unresolvable forward references
+        return dict(getattr(obj, "__annotations__", None) or {})
+
+
+def _describe(value: Any) -> str:
+    # A stable spelling of an annotation: types by name, metadata by value.
+    origin = typing.get_origin(value)
+    if origin is not None:
+        args = ", ".join(_describe(arg) for arg in typing.get_args(value))
+        return f"{_describe(origin)}[{args}]"
+    if isinstance(value, (type, typing.TypeVar)) or callable(value):
+        module = getattr(value, "__module__", "") or ""
+        name = getattr(value, "__qualname__", None) or getattr(value, "__name__", "")
+        return f"{module}.{name}" if name else type(value).__name__
+    try:
+        return encoding.dumps_str(value)
+    except TypeError:
+        return type(value).__name__
+
+
+def _collect(tp: Any, found: Dict[Any, None]) -> None:
+    origin = typing.get_origin(tp)
+    if origin is not None:  # generics, unions, Annotated, Literal
+        for arg in (origin, *typing.get_args(tp)):
+            _collect(arg, found)
+        return
+    supertype = getattr(tp, "__supertype__", None)
+    if supertype is not None:  # NewType
+        _collect(supertype, found)
+        return
+    if not inspect.isclass(tp) or tp in found or _is_stdlib(tp):
+        return
+    for cls in tp.__mro__:
+        if not _is_stdlib(cls):
+            found[cls] = None
+    for cls in tp.__mro__:
+        if not _is_stdlib(cls):
+            for hint in _hints(cls).values():
+                _collect(hint, found)
+    if attr is not None and attr.has(tp):
+        for field in attr.fields(tp):
+            if field.type is not None:
+                _collect(field.type, found)
+
+
+def fingerprint(obj: Any, *extra: Any) -> str:
+    """Return a stable hex digest identifying ``obj`` and ``extra``.
+
+    ``obj`` is usually a class, a function or a parameterized generic such as
+    ``Page[Item]``.  The digest covers the sources of ``obj`` and of every
+    class outside the standard library that it inherits from or refers to
+    through annotations, recursively, plus the spelling of those annotations
+    so that changes to type aliases are noticed.  ``extra`` values must be
+    JSON serializable and are folded in as-is, e.g. generator options.
+    """
+    h = hashlib.sha256()
+    h.update(CACHE_FORMAT.encode("ascii"))
+    found: Dict[Any, None] = {}
+    if inspect.isclass(obj) or typing.get_origin(obj) is not None:
+        h.update(f"\0{_describe(obj)}\0".encode("utf-8"))
+        _collect(obj, found)
+    else:
+        found[obj] = None
+        for hint in _hints(obj).values():
+            _collect(hint, found)
+    for target in found:
+        module = getattr(target, "__module__", "") or ""
+        name = getattr(target, "__qualname__", None) or repr(target)
+        h.update(f"\0{module}.{name}\0".encode("utf-8"))
+        h.update(_source_of(target).encode("utf-8"))
+        hints = _hints(target) if inspect.isclass(target) else {}
+        for key, hint in hints.items():
+            h.update(f"\0{key}: {_describe(hint)}".encode("utf-8"))
+    if extra:
+        h.update(b"\0")
+        h.update(encoding.dumps(list(extra)))
+    return h.hexdigest()
+
+
+class BuildCache:
+    """A directory of cached build artifacts.
+
+    Entries live under ``<directory>/<kind>/<key[:2]>/<key>`` and are written
+    atomically, so concurrent builds sharing a cache directory never observe
+    partial files.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, key[:2], key)
+
+    def load_bytes(self, kind: str, key: str) -> Optional[bytes]:
+        """Return the cached bytes for ``key`` or ``None``."""
+        try:
+            with open(self._path(kind, key), "rb") as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def store_bytes(self, kind: str, key: str, data: bytes) -> None:
+        """Atomically write ``data`` as the entry for ``key``."""
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def load(self, kind: str, key: str) -> Any:
+        """Return the cached JSON value for ``key`` or ``None``."""
+        data = self.load_bytes(kind, key)
+        return None if data is None else encoding.loads(data)
+
+    def store(self, kind: str, key: str, value: Any) -> None:
+        self.store_bytes(kind, key, encoding.dumps(value))
+
+    def get_or_build(
+        self,
+        source: Any,
+        build: Callable[[], Any],
+        *extra: Any,
+        kind: str = "schema",
+    ) -> Any:
+        """Return the value built from ``source``, building it on a miss.
+
+        ``build`` must return a JSON-serializable value (nodes are accepted
+        and stored in their plain form).
+        """
+        key = fingerprint(source, *extra)
+        data = self.load_bytes(kind, key)
+        if data is not None:
+            return encoding.loads(data)
+        value = build()
+        data = encoding.dumps(value)
+        self.store_bytes(kind, key, data)
+        return encoding.loads(data)
+
+    def get_or_render(
+        self,
+        source: Any,
+        build: Callable[[], Any],
+        *extra: Any,
+        kind: str = "fragment",
+    ) -> bytes:
+        """Return the encoded JSON of the value built from ``source``."""
+        key = fingerprint(source, *extra)
+        data = self.load_bytes(kind, key)
+        if data is None:
+            data = encoding.dumps(build())
+            self.store_bytes(kind, key, data)
+        return data
+
+    def clear(self, kind: Optional[str] = None) -> None:
+        """Remove every entry, or only the entries of ``kind``."""
+        target = self.directory if kind is None else os.path.join(self.directory, kind)
+        shutil.rmtree(target, ignore_errors=True)
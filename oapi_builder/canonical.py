@@ -0,0 +1,178 @@
+"""Canonical key order for byte-identical rendering.
+
+Two builds of the same API can produce documents whose mappings were filled
+in different orders, and the encoders preserve insertion order, so their
+rendered bytes differ.  :func:`canonicalize` returns a plain copy of a
+document (or node tree) with every mapping in a fixed order, so equal
+documents always render to identical bytes and a hash of the output can
+stand in for a diff.  The order is:
+
+* fields of OpenAPI objects in specification order (the order of the
+  fields of the :mod:`oapi_builder.model` classes), then any other keys
+  sorted by code point, then ``x-`` extensions sorted by code point;
+* ``paths`` sorted by path, which puts ``/pets/mine`` before
+  ``/pets/{id}``; operations within a path item in
+  :data:`~oapi_builder.model.HTTP_METHODS` order;
+* ``responses`` by status code: numeric codes ascending, then ranges such
+  as ``4XX``, then ``default``;
+* component names, media types, headers and every other name-keyed map
+  sorted by code point;
+* schema keywords in the order of :class:`~oapi_builder.model.Schema`'s
+  fields, then others sorted, then extensions; schema ``properties`` keep
+  their given order, which is meaningful to code generators;
+* free-form values (examples, defaults, extension values) with all keys
+  sorted.
+
+Lists are never reordered.  The rank of every field is computed once per
+node class, and sort keys are computed once per mapping; subtrees that occur
+several times in the input are canonicalized once.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from oapi_builder.model import Document, Node, Operation, Reference, Schema
+
+__all__ = ["canonicalize", "status_sort_key"]
+
+# Children the model keeps in ``extra`` that still hold schemas.
+_EXTRA_CHILDREN: Dict[type, Dict[str, Any]] = {
+    Schema: {
+        "not": Schema,
+        "patternProperties": ("map", Schema),
+        "$defs": ("map", Schema),
+    },
+}
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+# Maps whose keys are not sorted by code point.
+_ORDERED_MAPS = {(Schema, "properties")}
+
+
+def status_sort_key(status: Any) -> Tuple[int, int, str]:
+    """Sort key for response status codes: ``200 < 404 < 4XX < default``."""
+    status = str(status)
+    if status.isdigit():
+        return (0, int(status), "")
+    if status == "default":
+        return (2, 0, "")
+    return (1, 0, status.upper())
+
+
+_MAP_KEYS: Dict[Tuple[type, str], Callable[[Any], Any]] = {
+    (Operation, "responses"): status_sort_key,
+}
+
+# Node class -> OpenAPI key -> (rank of the field or None, child spec).  Map
+# specs carry their owner, ``("map", cls, (owner class, key))``, so that the
+# map's key order can depend on where it appears.
+_LAYOUTS: Dict[type, Dict[str, Tuple[Optional[int], Any]]] = {}
+
+
+def _layout(cls: type) -> Dict[str, Tuple[Optional[int], Any]]:
+    layout = _LAYOUTS.get(cls)
+    if layout is None:
+        layout = {}
+        children = {
+            **{key: cls._children.get(attr) for attr, key in cls._fields},
+            **_EXTRA_CHILDREN.get(cls, {}),
+        }
+        ranks = {key: rank for rank, (_, key) in enumerate(cls._fields)}
+        for key, spec in children.items():
+            if isinstance(spec, tuple) and spec[0] == "map":
+                spec = ("map", spec[1], (cls, key))
+            layout[key] = (ranks.get(key), spec)
+        _LAYOUTS[cls] = layout
+    return layout
+
+
+def _sort_key(
+    layout: Dict[str, Tuple[Optional[int], Any]], key: str
+) -> Tuple[int, int, str]:
+    entry = layout.get(key)
+    if entry is not None and entry[0] is not None:
+        return (0, entry[0], "")
+    return (2 if key.startswith("x-") else 1, 0, key)
+
+
+def _is_mapping(value: Any) -> bool:
+    return type(value) is dict or isinstance(value, Mapping)
+
+
+class _Canonicalizer:
+    __slots__ = ("memo", "orders")
+
+    def __init__(self) -> None:
+        # (id(value), spec) -> result; values are kept alive by the input.
+        self.memo: Dict[Tuple[int, Any], Any] = {}
+        # (node class, keys in input order) -> ((key, child spec), ...) in
+        # canonical order; most mappings of a document share a few layouts.
+        self.orders: Dict[Tuple[type, Tuple[str, ...]], Tuple[Any, ...]] = {}
+
+    def value(self, value: Any, spec: Any) -> Any:
+        kind = type(value)
+        if kind in _SCALAR_TYPES:
+            return value
+        if kind is not dict and kind is not list:
+            if isinstance(value, Node):
+                # Converted per occurrence: node items are not held by the input.
+                return self.node(kind, dict(value.oapi_items()))
+            if not isinstance(value, (Mapping, list)):
+                return value
+        memo_key = (id(value), spec)
+        result = self.memo.get(memo_key)
+        if result is None:
+            result = self.memo[memo_key] = self._container(value, spec)
+        return result
+
+    def _container(self, value: Any, spec: Any) -> Any:
+        if isinstance(spec, tuple):
+            kind, cls, *owner = spec
+            if kind == "list" and isinstance(value, list):
+                return [self.value(item, cls) for item in value]
+            if kind == "map" and _is_mapping(value):
+                return self.map(value, cls, owner[0] if owner else None)
+            return self.free(value)
+        if spec is not None and _is_mapping(value):
+            if "$ref" in value:
+                spec = Reference
+            return self.node(spec, value)
+        return self.free(value)
+
+    def node(self, cls: type, value: Mapping[str, Any]) -> Dict[str, Any]:
+        keys = tuple(value)
+        order = self.orders.get((cls, keys))
+        if order is None:
+            layout = _layout(cls)
+            order = self.orders[(cls, keys)] = tuple(
+                (key, layout[key][1] if key in layout else None)
+                for key in sorted(keys, key=lambda key: _sort_key(layout, key))
+            )
+        return {key: self.value(value[key], spec) for key, spec in order}
+
+    def map(
+        self, value: Mapping[str, Any], cls: type, owner: Optional[Tuple[type, str]]
+    ) -> Dict[str, Any]:
+        if owner in _ORDERED_MAPS:
+            keys = list(value)
+        else:
+            sort_key = _MAP_KEYS.get(owner, str) if owner is not None else str
+            keys = sorted(value, key=sort_key)
+        return {key: self.value(value[key], cls) for key in keys}
+
+    def free(self, value: Any) -> Any:
+        if _is_mapping(value):
+            return {key: self.value(value[key], None) for key in sorted(value, key=str)}
+        if isinstance(value, list):
+            return [self.value(item, None) for item in value]
+        return value
+
+
+def canonicalize(doc: Any) -> Dict[str, Any]:
+    """Return a plain copy of ``doc`` with every mapping in canonical order.
+
+    ``doc`` may be a node tree or a plain document; it is not modified.
+    """
+    canonicalizer = _Canonicalizer()
+    if isinstance(doc, Node):
+        return canonicalizer.node(type(doc), dict(doc.oapi_items()))
+    return canonicalizer.node(Document, doc)
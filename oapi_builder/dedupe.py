@@ -0,0 +1,177 @@
+"""Collapse structurally identical inline schemas into shared components.
+
+Every schema in the document is hashed once, bottom-up, with
+:class:`~oapi_builder.hashing.StructuralHasher`.  A schema is hoisted into
+``components/schemas`` and replaced by a ``$ref`` when it would still occur
+at least ``min_occurrences`` times after its enclosing schemas have been
+collapsed, so a nested schema that only ever appears inside one repeated
+envelope does not get a component of its own.  Inline copies of schemas that
+already exist under ``components/schemas`` are replaced by a reference to
+the existing component, whatever their number, provided they pass the
+candidate filter: with the default :func:`is_composite_schema`, an inline
+copy of a scalar component (a string enum, say) stays inline.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Set, Tuple
+
+from oapi_builder.hashing import StructuralHasher
+from oapi_builder.model import to_plain
+from oapi_builder.profiling import phase
+from oapi_builder.walk import iter_document_schemas, iter_subschemas
+
+__all__ = ["SCHEMA_REF_PREFIX", "dedupe_schemas", "is_composite_schema"]
+
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+_VALID_NAME = re.compile(r"[A-Za-z0-9._-]+\Z")
+
+
+def is_composite_schema(schema: Mapping[str, Any]) -> bool:
+    """Default candidate filter: object and composition schemas only.
+
+    Scalar schemas such as ``{"type": "string"}`` are cheaper inline than as
+    a reference and are never hoisted.
+    """
+    return "$ref" not in schema and (
+        "properties" in schema
+        or "allOf" in schema
+        or "oneOf" in schema
+        or "anyOf" in schema
+    )
+
+
+class _Entry:
+    __slots__ = ("schema", "size", "children", "inline")
+
+    def __init__(self, schema: Mapping[str, Any]):
+        self.schema = schema
+        self.size = 0
+        self.children: List[bytes] = []
+        self.inline = 0
+
+
+def _default_name(schema: Mapping[str, Any], digest: str) -> str:
+    title = schema.get("title")
+    if isinstance(title, str) and _VALID_NAME.match(title):
+        return title
+    return f"Schema_{digest[:10]}"
+
+
+def dedupe_schemas(
+    doc: Any,
+    min_occurrences: int = 2,
+    is_candidate: Callable[[Mapping[str, Any]], bool] = is_composite_schema,
+    name_for: Callable[[Mapping[str, Any], str], str] = _default_name,
+) -> Dict[str, Any]:
+    """Replace repeated inline schemas in ``doc`` with ``$ref``s.
+
+    Plain documents are updated in place and returned; model documents are
+    converted with :func:`~oapi_builder.model.to_plain` first.  Only schemas
+    accepted by ``is_candidate`` are ever replaced, including inline copies
+    of existing components.  ``name_for``
+    receives the schema and its hex digest and proposes a component name;
+    clashes with existing names get a numeric suffix.
+    """
+    with phase("dedupe"):
+        return _dedupe(to_plain(doc), min_occurrences, is_candidate, name_for)
+
+
+def _dedupe(
+    doc: Dict[str, Any],
+    min_occurrences: int,
+    is_candidate: Callable[[Mapping[str, Any]], bool],
+    name_for: Callable[[Mapping[str, Any], str], str],
+) -> Dict[str, Any]:
+    hasher = StructuralHasher()
+    entries: Dict[bytes, _Entry] = {}
+
+    def visit(schema: Mapping[str, Any]) -> bytes:
+        digest = hasher.hash(schema)
+        entry = entries.get(digest)
+        if entry is None:
+            entry = entries[digest] = _Entry(schema)
+            entry.size = 1
+            for _, _, child in _children(schema):
+                child_digest = visit(child)
+                entry.children.append(child_digest)
+                entry.size += entries[child_digest].size
+        return digest
+
+    components = doc.get("components")
+    schemas = components.get("schemas") if isinstance(components, dict) else None
+    # Created on the first hoist, so documents needing no change keep none.
+    attached = isinstance(schemas, dict)
+    if not attached:
+        schemas = {}
+    named: Dict[bytes, str] = {}
+    for container, key, _ in iter_document_schemas(doc):
+        digest = visit(container[key])
+        if container is schemas:
+            named.setdefault(digest, key)
+        else:
+            entries[digest].inline += 1
+
+    # Parents are larger than their children, so visiting entries by size
+    # settles every parent's occurrence count before its children's.
+    occurrences = {digest: entry.inline for digest, entry in entries.items()}
+    collapse: Set[bytes] = set()
+    for digest in sorted(entries, key=lambda d: entries[d].size, reverse=True):
+        entry = entries[digest]
+        count = occurrences[digest]
+        if (digest in named or count >= min_occurrences) and is_candidate(entry.schema):
+            collapse.add(digest)
+            # A collapsed schema is emitted once, as its component.
+            weight = 1
+        else:
+            weight = count + (digest in named)
+        for child in entry.children:
+            occurrences[child] += weight
+
+    used_names = set(schemas)
+    refs: Dict[bytes, str] = {
+        digest: SCHEMA_REF_PREFIX + name for digest, name in named.items()
+    }
+
+    def component_for(digest: bytes) -> str:
+        nonlocal attached
+        ref = refs.get(digest)
+        if ref is None:
+            if not attached:
+                doc.setdefault("components", {})["schemas"] = schemas
+                attached = True
+            schema = entries[digest].schema
+            base = name_for(schema, digest.hex())
+            name, suffix = base, 1
+            while name in used_names:
+                suffix += 1
+                name = f"{base}{suffix}"
+            used_names.add(name)
+            ref = refs[digest] = SCHEMA_REF_PREFIX + name
+            rewrite(schema)
+            schemas[name] = schema
+        return ref
+
+    def rewrite(schema: Mapping[str, Any]) -> None:
+        for container, key, child in _children(schema):
+            replace(container, key, child)
+
+    def replace(container: Any, key: Any, schema: Mapping[str, Any]) -> None:
+        digest = hasher.hash(schema)
+        if digest in collapse:
+            container[key] = {"$ref": component_for(digest)}
+        else:
+            rewrite(schema)
+
+    for name in list(schemas):
+        rewrite(schemas[name])
+    slots = list(iter_document_schemas(doc, include_components=False))
+    for container, key, _ in slots:
+        replace(container, key, container[key])
+    return doc
+
+
+def _children(schema: Mapping[str, Any]) -> Iterator[Tuple[Any, Any, Any]]:
+    for container, key, _ in iter_subschemas(schema):
+        yield container, key, container[key]
@@ -0,0 +1,559 @@
+"""Compare two versions of a document.
+
+:func:`diff_documents` reports added, removed and changed operations,
+parameters, request bodies, responses and schemas, each labelled breaking or
+not.  Both documents are hashed bottom-up once with a
+:class:`~oapi_builder.hashing.StructuralHasher`; any pair of sub-trees with
+equal hashes is skipped without being walked, so diffing two large specs
+that barely differ costs one hashing pass plus work proportional to the
+changed parts.
+
+Whether a schema change breaks clients depends on which way data flows:
+narrowing what a server accepts breaks requests, widening what it returns
+breaks responses.  Component schemas are used both ways and are judged
+against both.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Mapping, Set, Tuple
+
+from oapi_builder.dedupe import SCHEMA_REF_PREFIX
+from oapi_builder.errors import RefResolutionError
+from oapi_builder.hashing import StructuralHasher
+from oapi_builder.model import HTTP_METHODS, to_plain
+from oapi_builder.pointer import join_pointer, resolve_pointer
+
+__all__ = ["Change", "SpecDiff", "diff_documents"]
+
+REQUEST = "request"
+RESPONSE = "response"
+BOTH = "both"
+
+_LOWER_BOUNDS = (
+    "minimum",
+    "exclusiveMinimum",
+    "minLength",
+    "minItems",
+    "minProperties",
+)
+_UPPER_BOUNDS = (
+    "maximum",
+    "exclusiveMaximum",
+    "maxLength",
+    "maxItems",
+    "maxProperties",
+)
+_COMPOSITIONS = ("allOf", "oneOf", "anyOf")
+
+Location = Tuple[Any, ...]
+
+
+class Change:
+    """One difference between two documents.
+
+    :ivar kind: ``"operation"``, ``"parameter"``, ``"request_body"``,
+        ``"response"`` or ``"schema"``.
+    :ivar action: ``"added"``, ``"removed"`` or ``"changed"``.
+    :ivar location: JSON pointer of the change (in the new document for
+        additions, the old one otherwise).
+    """
+
+    __slots__ = ("kind", "action", "location", "breaking", "detail")
+
+    def __init__(
+        self, kind: str, action: str, location: str, breaking: bool, detail: str = ""
+    ):
+        self.kind = kind
+        self.action = action
+        self.location = location
+        self.breaking = breaking
+        self.detail = detail
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Change):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        label = "breaking" if self.breaking else "non-breaking"
+        detail = f": {self.detail}" if self.detail else ""
+        return f"<Change {self.action} {self.kind} {self.location} ({label}){detail}>"
+
+
+class SpecDiff:
+    """The changes between two documents, in document order."""
+
+    def __init__(self, changes: List[Change]):
+        self.changes = changes
+
+    @property
+    def breaking(self) -> List[Change]:
+        return [change for change in self.changes if change.breaking]
+
+    @property
+    def is_breaking(self) -> bool:
+        return any(change.breaking for change in self.changes)
+
+    def __iter__(self) -> Iterator[Change]:
+        return iter(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "breaking": self.is_breaking,
+            "changes": [change.to_dict() for change in self.changes],
+        }
+
+    def __repr__(self) -> str:
+        return f"<SpecDiff {len(self.changes)} changes, {len(self.breaking)} breaking>"
+
+
+def _breaks(direction: str, *, request: bool = False, response: bool = False) -> bool:
+    if direction == REQUEST:
+        return request
+    if direction == RESPONSE:
+        return response
+    return request or response
+
+
+def _as_set(value: Any) -> Set[Any]:
+    if not isinstance(value, list):
+        return set()
+    return {repr(item) for item in value}
+
+
+class _Differ:
+    def __init__(self, old: Mapping[str, Any], new: Mapping[str, Any]):
+        self.old = old
+        self.new = new
+        self.old_hash = StructuralHasher()
+        self.new_hash = StructuralHasher()
+        self.changes: List[Change] = []
+        self._ref_pairs: Set[Tuple[str, str, str]] = set()
+
+    def same(self, old: Any, new: Any) -> bool:
+        return self.old_hash(old) == self.new_hash(new)
+
+    def add(
+        self,
+        kind: str,
+        action: str,
+        location: Location,
+        breaking: bool,
+        detail: str = "",
+    ) -> None:
+        self.changes.append(
+            Change(kind, action, join_pointer(location), breaking, detail)
+        )
+
+    @staticmethod
+    def deref(doc: Mapping[str, Any], value: Any) -> Any:
+        if isinstance(value, Mapping) and isinstance(value.get("$ref"), str):
+            ref = value["$ref"]
+            if ref.startswith("#"):
+                try:
+                    return resolve_pointer(doc, ref[1:])
+                except RefResolutionError:
+                    pass
+        return value
+
+    def run(self) -> List[Change]:
+        if self.same(self.old, self.new):
+            return []
+        self.diff_paths()
+        old_schemas = (self.old.get("components") or {}).get("schemas") or {}
+        new_schemas = (self.new.get("components") or {}).get("schemas") or {}
+        if not self.same(old_schemas, new_schemas):
+            location = ("components", "schemas")
+            for name in old_schemas:
+                if name not in new_schemas:
+                    self.add("schema", "removed", location + (name,), True)
+            for name, schema in new_schemas.items():
+                if name not in old_schemas:
+                    self.add("schema", "added", location + (name,), False)
+                else:
+                    self.schema(old_schemas[name], schema, location + (name,), BOTH)
+        return self.changes
+
+    def diff_paths(self) -> None:
+        old_paths = self.old.get("paths") or {}
+        new_paths = self.new.get("paths") or {}
+        if self.same(old_paths, new_paths):
+            return
+        for path in {**old_paths, **new_paths}:
+            old_item = old_paths.get(path) or {}
+            new_item = new_paths.get(path) or {}
+            if self.same(old_item, new_item):
+                continue
+            for method in HTTP_METHODS:
+                old_op, new_op = old_item.get(method), new_item.get(method)
+                location = ("paths", path, method)
+                if old_op is None and new_op is None:
+                    continue
+                if new_op is None:
+                    self.add("operation", "removed", location, True)
+                elif old_op is None:
+                    self.add("operation", "added", location, False)
+                else:
+                    self.operation(old_item, old_op, new_item, new_op, location)
+
+    def parameters(
+        self,
+        doc: Mapping[str, Any],
+        item: Mapping[str, Any],
+        operation: Mapping[str, Any],
+        location: Location,
+    ) -> Dict[Tuple[str, str], Tuple[Any, Location]]:
+        # Operation parameters override path item parameters of the same key.
+        params: Dict[Tuple[str, str], Tuple[Any, Location]] = {}
+        for owner, prefix in ((item, location[:-1]), (operation, location)):
+            for idx, param in enumerate(owner.get("parameters") or ()):
+                resolved = self.deref(doc, param)
+                if isinstance(resolved, Mapping):
+                    key = (resolved.get("in", ""), resolved.get("name", ""))
+                    params[key] = (resolved, prefix + ("parameters", idx))
+        return params
+
+    def operation(
+        self,
+        old_item: Mapping[str, Any],
+        old_op: Mapping[str, Any],
+        new_item: Mapping[str, Any],
+        new_op: Mapping[str, Any],
+        location: Location,
+    ) -> None:
+        item_params_same = self.same(
+            old_item.get("parameters") or [], new_item.get("parameters") or []
+        )
+        if item_params_same and self.same(old_op, new_op):
+            return
+        start = len(self.changes)
+        old_params = self.parameters(self.old, old_item, old_op, location)
+        new_params = self.parameters(self.new, new_item, new_op, location)
+        for key, (param, loc) in old_params.items():
+            if key not in new_params:
+                self.add("parameter", "removed", loc, True, f"{key[0]} {key[1]}")
+        for key, (param, loc) in new_params.items():
+            old = old_params.get(key)
+            if old is None:
+                required = bool(param.get("required"))
+                detail = f"{'required ' if required else ''}{key[0]} {key[1]}"
+                self.add("parameter", "added", loc, required, detail)
+            elif not self.same(old[0], param):
+                self.parameter(old[0], param, loc)
+
+        self.request_body(
+            old_op.get("requestBody"), new_op.get("requestBody"), location
+        )
+        self.responses(
+            old_op.get("responses") or {}, new_op.get("responses") or {}, location
+        )
+        if len(self.changes) == start and not self.same(old_op, new_op):
+            self.add("operation", "changed", location, False)
+
+    def parameter(
+        self, old: Mapping[str, Any], new: Mapping[str, Any], location: Location
+    ) -> None:
+        start = len(self.changes)
+        if not old.get("required") and new.get("required"):
+            self.add("parameter", "changed", location, True, "became required")
+        old_schema, new_schema = old.get("schema"), new.get("schema")
+        if isinstance(old_schema, Mapping) and isinstance(new_schema, Mapping):
+            self.schema(old_schema, new_schema, location + ("schema",), REQUEST)
+        self.content(
+            old.get("content"), new.get("content"), location + ("content",), REQUEST
+        )
+        if len(self.changes) == start:
+            self.add("parameter", "changed", location, False)
+
+    def request_body(self, old: Any, new: Any, location: Location) -> None:
+        location = location + ("requestBody",)
+        old = self.deref(self.old, old)
+        new = self.deref(self.new, new)
+        if old is None and new is None:
+            return
+        if old is None:
+            required = bool(new.get("required"))
+            self.add("request_body", "added", location, required)
+            return
+        if new is None:
+            self.add("request_body", "removed", location, True)
+            return
+        if self.same(old, new):
+            return
+        start = len(self.changes)
+        if not old.get("required") and new.get("required"):
+            self.add("request_body", "changed", location, True, "became required")
+        self.content(
+            old.get("content"), new.get("content"), location + ("content",), REQUEST
+        )
+        if len(self.changes) == start:
+            self.add("request_body", "changed", location, False)
+
+    def responses(
+        self, old: Mapping[str, Any], new: Mapping[str, Any], location: Location
+    ) -> None:
+        if self.same(old, new):
+            return
+        location = location + ("responses",)
+        for status in old:
+            if status not in new:
+                self.add("response", "removed", location + (status,), True)
+        for status, response in new.items():
+            if status not in old:
+                self.add("response", "added", location + (status,), False)
+                continue
+            old_response = self.deref(self.old, old[status])
+            response = self.deref(self.new, response)
+            if self.same(old_response, response) or not isinstance(response, Mapping):
+                continue
+            start = len(self.changes)
+            self.content(
+                old_response.get("content"),
+                response.get("content"),
+                location + (status, "content"),
+                RESPONSE,
+            )
+            if len(self.changes) == start:
+                self.add("response", "changed", location + (status,), False)
+
+    def content(self, old: Any, new: Any, location: Location, direction: str) -> None:
+        old = old if isinstance(old, Mapping) else {}
+        new = new if isinstance(new, Mapping) else {}
+        if self.same(old, new):
+            return
+        kind = "request_body" if direction == REQUEST else "response"
+        for media_type in old:
+            if media_type not in new:
+                self.add(kind, "removed", location + (media_type,), True, "media type")
+        for media_type, media in new.items():
+            if media_type not in old:
+                self.add(kind, "added", location + (media_type,), False, "media type")
+                continue
+            old_schema = (old[media_type] or {}).get("schema")
+            new_schema = (media or {}).get("schema")
+            if isinstance(old_schema, Mapping) and isinstance(new_schema, Mapping):
+                self.schema(
+                    old_schema, new_schema, location + (media_type, "schema"), direction
+                )
+
+    def schema_changed(
+        self,
+        location: Location,
+        direction: str,
+        detail: str,
+        *,
+        request: bool = False,
+        response: bool = False,
+    ) -> None:
+        breaking = _breaks(direction, request=request, response=response)
+        self.add("schema", "changed", location, breaking, detail)
+
+    def schema(
+        self,
+        old: Mapping[str, Any],
+        new: Mapping[str, Any],
+        location: Location,
+        direction: str,
+    ) -> None:
+        if self.same(old, new):
+            return
+        start = len(self.changes)
+        add = self.add
+
+        old_ref, new_ref = old.get("$ref"), new.get("$ref")
+        if old_ref != new_ref:
+            if (
+                isinstance(old_ref, str)
+                and isinstance(new_ref, str)
+                and old_ref.startswith(SCHEMA_REF_PREFIX)
+                and new_ref.startswith(SCHEMA_REF_PREFIX)
+            ):
+                # A renamed component: compare the targets, once per pair.
+                pair = (old_ref, new_ref, direction)
+                if pair not in self._ref_pairs:
+                    self._ref_pairs.add(pair)
+                    self.schema(
+                        self.deref(self.old, old),
+                        self.deref(self.new, new),
+                        location,
+                        direction,
+                    )
+                if len(self.changes) == start:
+                    add(
+                        "schema",
+                        "changed",
+                        location,
+                        False,
+                        f"$ref {old_ref} -> {new_ref}",
+                    )
+            else:
+                add("schema", "changed", location, True, f"$ref {old_ref} -> {new_ref}")
+            return
+
+        for keyword in ("type", "format"):
+            old_value, new_value = old.get(keyword), new.get(keyword)
+            if old_value == new_value:
+                continue
+            if old_value is None:  # newly constrained
+                breaking = _breaks(direction, request=True)
+            elif new_value is None:  # constraint dropped
+                breaking = _breaks(direction, response=True)
+            else:
+                breaking = True
+            detail = f"{keyword} {old_value!r} -> {new_value!r}"
+            add("schema", "changed", location, breaking, detail)
+
+        if old.get("nullable") != new.get("nullable"):
+            narrowed = bool(old.get("nullable")) and not new.get("nullable")
+            self.schema_changed(
+                location,
+                direction,
+                "nullable" if not narrowed else "no longer nullable",
+                request=narrowed,
+                response=not narrowed,
+            )
+
+        if "enum" in old or "enum" in new:
+            old_enum, new_enum = _as_set(old.get("enum")), _as_set(new.get("enum"))
+            if "enum" not in old:
+                self.schema_changed(location, direction, "enum added", request=True)
+            elif "enum" not in new:
+                self.schema_changed(location, direction, "enum removed", response=True)
+            else:
+                if old_enum - new_enum:
+                    self.schema_changed(
+                        location, direction, "enum values removed", request=True
+                    )
+                if new_enum - old_enum:
+                    self.schema_changed(
+                        location, direction, "enum values added", response=True
+                    )
+
+        for keyword in _LOWER_BOUNDS + _UPPER_BOUNDS:
+            old_bound, new_bound = old.get(keyword), new.get(keyword)
+            if old_bound == new_bound:
+                continue
+            if old_bound is None or new_bound is None:
+                tightened = old_bound is None
+            elif isinstance(old_bound, bool) or isinstance(new_bound, bool):
+                tightened = bool(new_bound)  # 3.0 boolean exclusive bounds
+            elif keyword in _LOWER_BOUNDS:
+                tightened = new_bound > old_bound
+            else:
+                tightened = new_bound < old_bound
+            self.schema_changed(
+                location,
+                direction,
+                f"{keyword} {old_bound!r} -> {new_bound!r}",
+                request=tightened,
+                response=not tightened,
+            )
+
+        old_required = set(old.get("required") or ())
+        new_required = set(new.get("required") or ())
+        for name in sorted(new_required - old_required):
+            self.schema_changed(
+                location + ("properties", name),
+                direction,
+                "became required",
+                request=True,
+            )
+        for name in sorted(old_required - new_required):
+            self.schema_changed(
+                location + ("properties", name),
+                direction,
+                "no longer required",
+                response=True,
+            )
+
+        old_props = old.get("properties") or {}
+        new_props = new.get("properties") or {}
+        if not self.same(old_props, new_props):
+            for name in old_props:
+                if name not in new_props:
+                    add(
+                        "schema",
+                        "removed",
+                        location + ("properties", name),
+                        _breaks(direction, response=True),
+                        "property",
+                    )
+            for name, prop in new_props.items():
+                if name not in old_props:
+                    add(
+                        "schema",
+                        "added",
+                        location + ("properties", name),
+                        _breaks(direction, request=name in new_required),
+                        "property",
+                    )
+                elif isinstance(prop, Mapping) and isinstance(old_props[name], Mapping):
+                    self.schema(
+                        old_props[name],
+                        prop,
+                        location + ("properties", name),
+                        direction,
+                    )
+
+        for keyword in ("items", "additionalProperties", "not"):
+            old_sub, new_sub = old.get(keyword), new.get(keyword)
+            if isinstance(old_sub, Mapping) and isinstance(new_sub, Mapping):
+                self.schema(old_sub, new_sub, location + (keyword,), direction)
+            elif keyword == "additionalProperties" and old_sub != new_sub:
+                closed = new_sub is False
+                self.schema_changed(
+                    location + (keyword,),
+                    direction,
+                    f"{keyword} {old_sub!r} -> {new_sub!r}",
+                    request=closed,
+                    response=not closed,
+                )
+
+        for keyword in _COMPOSITIONS:
+            old_list, new_list = old.get(keyword) or [], new.get(keyword) or []
+            if self.same(old_list, new_list):
+                continue
+            for idx, (old_sub, new_sub) in enumerate(zip(old_list, new_list)):
+                if isinstance(old_sub, Mapping) and isinstance(new_sub, Mapping):
+                    self.schema(old_sub, new_sub, location + (keyword, idx), direction)
+            if len(new_list) < len(old_list):
+                add(
+                    "schema",
+                    "removed",
+                    location + (keyword, len(new_list)),
+                    _breaks(
+                        direction,
+                        request=keyword != "allOf",
+                        response=keyword == "allOf",
+                    ),
+                    f"{len(old_list) - len(new_list)} {keyword} members",
+                )
+            elif len(new_list) > len(old_list):
+                add(
+                    "schema",
+                    "added",
+                    location + (keyword, len(old_list)),
+                    _breaks(
+                        direction,
+                        request=keyword == "allOf",
+                        response=keyword != "allOf",
+                    ),
+                    f"{len(new_list) - len(old_list)} {keyword} members",
+                )
+
+        if len(self.changes) == start:
+            add("schema", "changed", location, False)
+
+
+def diff_documents(old: Any, new: Any) -> SpecDiff:
+    """Return the changes that turn document ``old`` into ``new``."""
+    return SpecDiff(_Differ(to_plain(old), to_plain(new)).run())
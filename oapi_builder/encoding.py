@@ -0,0 +1,168 @@
+"""JSON encoding backends.
+
+orjson is used when it is installed; otherwise the stdlib :mod:`json` module
+is used and its output is normalized to match orjson byte for byte:
+
+* compact separators (``,`` and ``:``) or two-space indentation,
+* non-ASCII characters are emitted as UTF-8 rather than ``\\uXXXX`` escapes,
+* floats use orjson's layout (``1e16`` rather than ``1e+16`` and
+  ``0.00001`` rather than ``1e-05``),
+* ``NaN`` and infinities are encoded as ``null``,
+* integer, boolean and ``None`` mapping keys are converted to strings
+  (``200`` becomes ``"200"``).  Float keys, which have no place in an
+  OpenAPI document, keep each encoder's own float format.
+
+Set ``OAPI_BUILDER_JSON_BACKEND=json`` to force the stdlib backend.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Callable, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+__all__ = [
+    "BACKEND",
+    "BACKENDS",
+    "default",
+    "dumps",
+    "dumps_str",
+    "key_str",
+    "loads",
+]
+
+BACKENDS = ("orjson", "json")
+
+
+def default(node: Any) -> Any:
+    """Expand lazily built nodes for the JSON encoders."""
+    if hasattr(node, "oapi_items"):
+        return dict(node.oapi_items())
+    if isinstance(node, Mapping):
+        return dict(node)
+    raise TypeError(f"Object of type {type(node).__name__} is not JSON serializable")
+
+
+_NEEDS_FIXUP = re.compile(r"\de[-+]\d|NaN|Infinity")
+_FIXUP_TOKEN = re.compile(
+    r'"(?:[^"\\]|\\.)*"' r"|(-?)(\d+)(?:\.(\d+))?e([-+])(\d+)" r"|-?Infinity|NaN"
+)
+
+
+def _fixup_token(match: "re.Match[str]") -> str:
+    token = match.group(0)
+    if token[0] == '"':
+        return token
+    if match.group(2) is None:
+        return "null"
+    sign, whole, frac, exp_sign, exp = match.groups()
+    exp = exp.lstrip("0") or "0"
+    if exp_sign == "+":
+        return f"{token[: match.start(4) - match.start(0) - 1]}e{exp}"
+    if exp == "5":
+        # orjson switches to exponent notation one decade later than repr().
+        return f"{sign}0.0000{whole}{frac or ''}"
+    return f"{token[: match.start(4) - match.start(0) - 1]}e-{exp}"
+
+
+def _json_dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Encode with the stdlib, normalized to orjson's output."""
+    if indent:
+        text = json.dumps(obj, ensure_ascii=False, indent=indent, default=default)
+    else:
+        text = json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=default
+        )
+    if _NEEDS_FIXUP.search(text):
+        text = _FIXUP_TOKEN.sub(_fixup_token, text)
+    return text
+
+
+def _json_dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    return _json_dumps(obj, 2 if indent else None).encode("utf-8")
+
+
+if orjson is not None:
+    # Non-string keys (status codes loaded from YAML as ints) are converted
+    # the way the stdlib converts them.
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def _orjson_dumps(obj: Any, indent: bool = False) -> bytes:
+        option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError as err:
+            # Integers wider than 64 bits are only supported by the stdlib.
+            if "Integer exceeds" not in str(err):
+                raise TypeError(str(err)) from err
+            return _json_dumps_bytes(obj, indent)
+
+
+def _select_backend() -> str:
+    requested = os.environ.get("OAPI_BUILDER_JSON_BACKEND", "").strip().lower()
+    if requested and requested not in BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend {requested!r}; expected one of {BACKENDS}"
+        )
+    if orjson is None or requested == "json":
+        return "json"
+    return "orjson"
+
+
+BACKEND = _select_backend()
+
+
+def _encoder(backend: Optional[str]) -> Callable[[Any, bool], bytes]:
+    backend = backend or BACKEND
+    if backend == "orjson":
+        if orjson is None:
+            raise ValueError("The orjson backend requires orjson to be installed")
+        return _orjson_dumps
+    if backend == "json":
+        return _json_dumps_bytes
+    raise ValueError(f"Unknown JSON backend {backend!r}; expected one of {BACKENDS}")
+
+
+def dumps(obj: Any, indent: bool = False, backend: Optional[str] = None) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON bytes.
+
+    ``indent`` selects two-space indentation, the only indented layout orjson
+    supports.  ``backend`` overrides the process-wide :data:`BACKEND`.
+    """
+    return _encoder(backend)(obj, indent)
+
+
+def dumps_str(obj: Any, indent: bool = False, backend: Optional[str] = None) -> str:
+    """Like :func:`dumps` but return text."""
+    if (backend or BACKEND) == "json":
+        return _json_dumps(obj, 2 if indent else None)
+    return dumps(obj, indent, backend).decode("utf-8")
+
+
+def key_str(key: Any, backend: Optional[str] = None) -> str:
+    """Return the string the encoders write for the mapping key ``key``."""
+    if isinstance(key, str):
+        return key
+    # '{"<key>":null}'
+    return dumps_str({key: None}, backend=backend)[2:-7]
+
+
+def loads(data: Any, backend: Optional[str] = None) -> Any:
+    """Decode JSON ``bytes`` or ``str`` with the selected backend."""
+    if (backend or BACKEND) == "orjson" and orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Integers wider than 64 bits are only supported by the stdlib;
+            # anything else fails again below with the stdlib's message.
+            pass
+    return json.loads(data)
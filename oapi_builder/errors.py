@@ -0,0 +1,31 @@
+"""Exceptions raised by oapi_builder."""
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+__all__ = ["OapiBuilderError", "RefCycleError", "RefResolutionError"]
+
+
+class OapiBuilderError(Exception):
+    """Base class for all oapi_builder errors."""
+
+
+class RefResolutionError(OapiBuilderError, LookupError):
+    """A ``$ref`` could not be resolved."""
+
+    def __init__(self, message: str, ref: str = ""):
+        super().__init__(message)
+        self.ref = ref
+
+
+class RefCycleError(RefResolutionError):
+    """Resolving a ``$ref`` led back to itself.
+
+    ``cycle`` lists the ``(uri, pointer)`` pairs that form the loop, starting
+    and ending with the same entry.
+    """
+
+    def __init__(self, cycle: Sequence[Tuple[str, str]]):
+        self.cycle = tuple(cycle)
+        chain = " -> ".join(f"{uri}#{pointer}" for uri, pointer in self.cycle)
+        super().__init__(f"Reference cycle: {chain}", ref=chain)
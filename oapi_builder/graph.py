@@ -0,0 +1,334 @@
+"""The reference graph between operations and components.
+
+:class:`ReferenceGraph` scans a plain document once and records which
+components every operation and every component refers to, through local
+``$ref``s (``#/components/<kind>/<name>...``), discriminator mappings and
+the names in security requirements.  Questions such as "which components
+does this set of operations need" are then answered by a traversal of the
+recorded edges, without looking at the document again.
+
+The same edges give code generators an emission order:
+:meth:`ReferenceGraph.strongly_connected` groups mutually recursive
+components, and :meth:`ReferenceGraph.topological_order` lists every
+component after the ones it refers to, so types can be emitted in one pass.
+:meth:`ReferenceGraph.to_dict` exports all of it as plain data.
+
+The graph describes the document as it was when the graph was built; build
+a new one after editing the document.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from oapi_builder.model import HTTP_METHODS, Node
+from oapi_builder.pointer import escape_token, split_pointer
+from oapi_builder.walk import iter_refs
+
+__all__ = [
+    "ComponentKey",
+    "OperationKey",
+    "ReferenceGraph",
+    "component_refs",
+    "prune_unused",
+]
+
+# ``(kind, name)`` of a component and ``(path, method)`` of an operation.
+ComponentKey = Tuple[str, str]
+OperationKey = Tuple[str, str]
+
+_COMPONENT_PREFIX = "#/components/"
+
+
+def _targets(node: Any, cache: Dict[str, Optional[ComponentKey]]) -> List[ComponentKey]:
+    """The components ``node`` refers to through local ``$ref``s and mappings."""
+    targets = []
+    for ref in iter_refs(node, mappings=True):
+        try:
+            target = cache[ref]
+        except KeyError:
+            target = cache[ref] = None
+            if ref.startswith(_COMPONENT_PREFIX):
+                tokens = split_pointer(ref[1:])
+                if len(tokens) >= 3:
+                    target = cache[ref] = (tokens[1], tokens[2])
+        if target is not None:
+            targets.append(target)
+    return targets
+
+
+def component_refs(node: Any) -> Tuple[ComponentKey, ...]:
+    """The components ``node`` refers to, in order of appearance.
+
+    These are the edges :class:`ReferenceGraph` records for a component:
+    local ``$ref``s and discriminator mapping targets.
+    """
+    return _unique(_targets(node, {}))
+
+
+def _schemes(requirements: Any) -> List[ComponentKey]:
+    """The security schemes named by a list of security requirements."""
+    if not isinstance(requirements, list):
+        return []
+    return [
+        ("securitySchemes", name)
+        for requirement in requirements
+        if isinstance(requirement, Mapping)
+        for name in requirement
+    ]
+
+
+def _ref_for(key: ComponentKey) -> str:
+    return f"{_COMPONENT_PREFIX}{escape_token(key[0])}/{escape_token(key[1])}"
+
+
+def _unique(keys: Iterable[ComponentKey]) -> Tuple[ComponentKey, ...]:
+    return tuple(dict.fromkeys(keys))
+
+
+class ReferenceGraph:
+    """Direct references of every operation and component of a document.
+
+    :ivar operations: ``(path, method)`` -> the components the operation
+        refers to directly, including through its path item's parameters
+        and the security requirements that apply to it.
+    :ivar edges: ``(kind, name)`` -> the components that component refers
+        to directly.  Every component of the document has an entry; targets
+        missing from the document do not.
+    :ivar roots: components used outside ``paths`` and ``components``, such
+        as the schemes of the top-level ``security``; they are always
+        reachable.
+    """
+
+    def __init__(self, doc: Any):
+        self.doc: Dict[str, Any] = doc.to_dict() if isinstance(doc, Node) else doc
+        self.operations: Dict[OperationKey, Tuple[ComponentKey, ...]] = {}
+        self.edges: Dict[ComponentKey, Tuple[ComponentKey, ...]] = {}
+        self.roots: Tuple[ComponentKey, ...] = ()
+        self._used: Optional[Set[ComponentKey]] = None
+        self._groups: Optional[List[Tuple[ComponentKey, ...]]] = None
+        self._scan()
+
+    def _scan(self) -> None:
+        doc = self.doc
+        cache: Dict[str, Optional[ComponentKey]] = {}
+        rest = {
+            key: value
+            for key, value in doc.items()
+            if key not in ("paths", "components")
+        }
+        self.roots = _unique([*_targets(rest, cache), *_schemes(doc.get("security"))])
+        default_security = doc.get("security")
+        paths = doc.get("paths")
+        for path, item in (paths if isinstance(paths, Mapping) else {}).items():
+            if not isinstance(item, Mapping):
+                continue
+            shared = _targets(item.get("parameters") or (), cache)
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, Mapping):
+                    continue
+                security = operation.get("security", default_security)
+                self.operations[(path, method)] = _unique(
+                    [*shared, *_targets(operation, cache), *_schemes(security)]
+                )
+        components = doc.get("components")
+        if isinstance(components, Mapping):
+            for kind, entries in components.items():
+                if not isinstance(entries, Mapping):
+                    continue
+                for name, component in entries.items():
+                    self.edges[(kind, name)] = _unique(_targets(component, cache))
+
+    def reachable(
+        self, operations: Optional[Iterable[OperationKey]] = None
+    ) -> Set[ComponentKey]:
+        """Components used, directly or not, by ``operations`` (default: all).
+
+        The :attr:`roots` are always included.  Only components present in
+        the document are returned.  The result for all operations is
+        computed once and shared by later calls; do not modify it.
+        """
+        if operations is None:
+            if self._used is None:
+                self._used = self._traverse(self.operations)
+            return self._used
+        return self._traverse(operations)
+
+    def _traverse(self, operations: Iterable[OperationKey]) -> Set[ComponentKey]:
+        edges = self.edges
+        seen: Set[ComponentKey] = set()
+        stack: List[ComponentKey] = list(self.roots)
+        for operation in operations:
+            stack.extend(self.operations[operation])
+        while stack:
+            key = stack.pop()
+            if key in seen or key not in edges:
+                continue
+            seen.add(key)
+            stack.extend(edges[key])
+        return seen
+
+    def unused(self) -> Set[ComponentKey]:
+        """Components that nothing in the document uses, even indirectly."""
+        used = self.reachable()
+        return {key for key in self.edges if key not in used}
+
+    def pruned(self, kinds: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return the document without its :meth:`unused` components.
+
+        :param kinds: component kinds to prune (default: all); e.g.
+            ``["schemas"]`` keeps unused responses and parameters.
+
+        The document is not modified: the result shares everything with it
+        except the component maps that lost entries.  The traversal is done
+        once per graph, so further prunes of the same document (of other
+        kinds, say) only filter the component maps.
+        """
+        components = self.doc.get("components")
+        if not isinstance(components, Mapping):
+            return self.doc
+        used = self.reachable()
+        selected = None if kinds is None else frozenset(kinds)
+        result: Dict[str, Any] = {}
+        for kind, entries in components.items():
+            if isinstance(entries, Mapping) and (selected is None or kind in selected):
+                kept = {
+                    name: value
+                    for name, value in entries.items()
+                    if (kind, name) in used
+                }
+                if len(kept) < len(entries):
+                    if kept:
+                        result[kind] = kept
+                    continue
+            result[kind] = entries
+        if len(result) == len(components) and all(
+            result[kind] is entries for kind, entries in components.items()
+        ):
+            return self.doc
+        return {**self.doc, "components": result}
+
+    def strongly_connected(self) -> List[Tuple[ComponentKey, ...]]:
+        """Return the strongly connected components of the component graph.
+
+        Every component belongs to exactly one group; a group with more than
+        one member (or a member that refers to itself) is a reference cycle.
+        Groups come in dependency order: a group is listed after every group
+        its members refer to.  Members keep document order.  Computed once
+        per graph (Tarjan's algorithm, iteratively).
+        """
+        if self._groups is None:
+            self._groups = self._tarjan()
+        return self._groups
+
+    def _tarjan(self) -> List[Tuple[ComponentKey, ...]]:
+        edges = self.edges
+        position = {key: idx for idx, key in enumerate(edges)}
+        index: Dict[ComponentKey, int] = {}
+        low: Dict[ComponentKey, int] = {}
+        on_stack: Set[ComponentKey] = set()
+        stack: List[ComponentKey] = []
+        groups: List[Tuple[ComponentKey, ...]] = []
+        for start in edges:
+            if start in index:
+                continue
+            # Frames of (component, iterator over its targets).
+            work = [(start, iter(edges[start]))]
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                key, targets = work[-1]
+                for target in targets:
+                    if target not in edges:
+                        continue
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(edges[target])))
+                        break
+                    if target in on_stack:
+                        low[key] = min(low[key], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[key])
+                    if low[key] == index[key]:
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            members.append(member)
+                            if member == key:
+                                break
+                        members.sort(key=position.__getitem__)
+                        groups.append(tuple(members))
+        return groups
+
+    def cyclic(self) -> Set[ComponentKey]:
+        """Components that take part in a reference cycle."""
+        found: Set[ComponentKey] = set()
+        for group in self.strongly_connected():
+            if len(group) > 1 or group[0] in self.edges[group[0]]:
+                found.update(group)
+        return found
+
+    def topological_order(self) -> List[ComponentKey]:
+        """Every component, each after the components it refers to.
+
+        Members of a cycle cannot all come after each other; they are
+        listed together, in document order, after everything the cycle
+        depends on.  Code generators can emit types in this order and only
+        need forward declarations for :meth:`cyclic` ones.
+        """
+        return [key for group in self.strongly_connected() for key in group]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the graph as plain data, with components as local refs.
+
+        ``components`` maps each component to the components it refers to,
+        ``operations`` maps ``"METHOD path"`` to the components the
+        operation refers to directly, ``cycles`` lists the reference cycles
+        and ``order`` is :meth:`topological_order`.
+        """
+        name = _ref_for
+        cyclic = self.cyclic()
+        return {
+            "components": {
+                name(key): [name(target) for target in targets if target in self.edges]
+                for key, targets in self.edges.items()
+            },
+            "operations": {
+                f"{method.upper()} {path}": [name(target) for target in targets]
+                for (path, method), targets in self.operations.items()
+            },
+            "cycles": [
+                [name(key) for key in group]
+                for group in self.strongly_connected()
+                if group[0] in cyclic
+            ],
+            "order": [name(key) for key in self.topological_order()],
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReferenceGraph {len(self.operations)} operations, "
+            f"{len(self.edges)} components>"
+        )
+
+
+def prune_unused(
+    doc: Any,
+    kinds: Optional[Iterable[str]] = None,
+    graph: Optional[ReferenceGraph] = None,
+) -> Dict[str, Any]:
+    """Return ``doc`` without the components nothing references.
+
+    Pass the ``graph`` of ``doc`` when one is at hand to skip the scan; see
+    :meth:`ReferenceGraph.pruned`.
+    """
+    if graph is None:
+        graph = ReferenceGraph(doc)
+    return graph.pruned(kinds)
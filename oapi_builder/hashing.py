@@ -0,0 +1,92 @@
+"""Structural hashing of JSON values.
+
+Hashes are computed bottom-up from the hashes of child values, so hashing a
+whole document touches every node exactly once and the hash of any sub-tree
+is available afterwards without re-serializing it.  Mapping key order does
+not affect the hash; list order does.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Mapping, Tuple
+
+__all__ = ["StructuralHasher", "structural_hash"]
+
+_DIGEST_SIZE = 16
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+class StructuralHasher:
+    """Memoizes structural hashes of containers by object identity.
+
+    A hasher must not outlive mutations of the values it has hashed; create a
+    new one (or call :meth:`clear`) after changing a document.
+    """
+
+    def __init__(self) -> None:
+        # id -> (value, digest); the value is kept to pin its id.
+        self._memo: Dict[int, Tuple[Any, bytes]] = {}
+        self._scalars: Dict[Tuple[type, Any], bytes] = {}
+        self._keys: Dict[str, bytes] = {}
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+    def forget(self, value: Any) -> None:
+        """Drop the memoized hash of ``value`` (but not of its children)."""
+        self._memo.pop(id(value), None)
+
+    def __call__(self, value: Any) -> bytes:
+        return self.hash(value)
+
+    def _key(self, key: Any) -> bytes:
+        key = str(key)
+        digest = self._keys.get(key)
+        if digest is None:
+            digest = self._keys[key] = _digest(b"k", key.encode("utf-8"))
+        return digest
+
+    def hash(self, value: Any) -> bytes:
+        """Return the digest of ``value``."""
+        # Exact type checks first: ABC isinstance checks dominate otherwise.
+        cls = type(value)
+        if cls is dict or (
+            cls not in _SCALAR_TYPES and cls is not list and isinstance(value, Mapping)
+        ):
+            cached = self._memo.get(id(value))
+            if cached is not None:
+                return cached[1]
+            parts = [b"{"]
+            for key in sorted(value, key=str):
+                parts.append(self._key(key))
+                parts.append(self.hash(value[key]))
+            digest = _digest(*parts)
+        elif cls is list or cls is tuple or isinstance(value, (list, tuple)):
+            cached = self._memo.get(id(value))
+            if cached is not None:
+                return cached[1]
+            digest = _digest(b"[", *(self.hash(item) for item in value))
+        else:
+            # The type tag keeps 1, 1.0, True and "1" apart.
+            key = (cls, value)
+            digest = self._scalars.get(key)
+            if digest is None:
+                tag = cls.__name__.encode("ascii")
+                digest = _digest(tag, json.dumps(value).encode("utf-8"))
+                self._scalars[key] = digest
+            return digest
+        self._memo[id(value)] = (value, digest)
+        return digest
+
+
+def structural_hash(value: Any) -> str:
+    """Return the hex structural hash of ``value``."""
+    return StructuralHasher().hash(value).hex()
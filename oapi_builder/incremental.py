@@ -0,0 +1,147 @@
+"""Incremental rendering of documents that change a little at a time.
+
+:class:`IncrementalDocument` keeps the encoded bytes of every path item,
+operation and component from the previous render.  Edits made through its
+methods mark the affected fragments dirty, and the next :meth:`render`
+re-encodes only those fragments and splices them into the cached output of
+their unchanged siblings.  The result is byte-identical to
+``encoding.dumps(doc)``.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from oapi_builder import encoding
+from oapi_builder.model import to_plain
+from oapi_builder.profiling import phase
+
+__all__ = ["IncrementalDocument"]
+
+Location = Tuple[str, ...]
+
+# Mappings shallower than this are assembled from their entries' cached
+# fragments; deeper values are encoded as a whole.  Three levels separate
+# ``paths -> path -> method`` and ``components -> kind -> name``.
+FRAGMENT_DEPTH = 3
+
+
+class _Fragment:
+    """Cached encoding of one value and, for containers, of its entries."""
+
+    __slots__ = ("key", "value", "data", "entry", "children")
+
+    def __init__(self, key: bytes, value: Any):
+        self.key = key
+        self.value = value
+        self.data: Optional[bytes] = None
+        # ``key:data`` as it appears inside the parent mapping.
+        self.entry = b""
+        self.children: Dict[str, _Fragment] = {}
+
+
+class IncrementalDocument:
+    """A plain document whose rendered JSON is updated fragment by fragment.
+
+    Edit the document through :meth:`set`, :meth:`delete` and the
+    path/operation/component helpers.  Changes made directly to ``doc``,
+    whether a value is mutated in place or replaced, must be reported by
+    passing the changed location to :meth:`touch`.
+    """
+
+    def __init__(self, doc: Any):
+        self.doc: Dict[str, Any] = to_plain(doc)
+        self._root = _Fragment(b"", self.doc)
+        self._changed: Set[Location] = set()
+        self.encoded = 0
+        self.reused = 0
+
+    @property
+    def changed(self) -> Set[Location]:
+        """Locations edited since the last :meth:`render`."""
+        return set(self._changed)
+
+    def touch(self, *location: str) -> None:
+        """Mark the value at ``location`` (and everything inside it) as changed."""
+        self._changed.add(location)
+        fragment = self._root
+        fragment.data = None
+        for key in location[:-1]:
+            fragment = fragment.children.get(key)
+            if fragment is None:
+                return
+            fragment.data = None
+        if location:
+            fragment.children.pop(location[-1], None)
+        else:
+            fragment.children.clear()
+
+    def set(self, location: Iterable[str], value: Any) -> None:
+        """Set the value at ``location``, creating parent mappings as needed."""
+        location = tuple(location)
+        if not location:
+            raise ValueError("Cannot replace the document root; create a new one")
+        parent = self.doc
+        for key in location[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[location[-1]] = to_plain(value)
+        self.touch(*location)
+
+    def delete(self, location: Iterable[str]) -> None:
+        """Remove the value at ``location``; missing locations are ignored."""
+        location = tuple(location)
+        parent: Any = self.doc
+        for key in location[:-1]:
+            parent = parent.get(key) if isinstance(parent, Mapping) else None
+        if isinstance(parent, dict) and location[-1] in parent:
+            del parent[location[-1]]
+            self.touch(*location)
+
+    def set_path(self, path: str, item: Any) -> None:
+        self.set(("paths", path), item)
+
+    def remove_path(self, path: str) -> None:
+        self.delete(("paths", path))
+
+    def set_operation(self, path: str, method: str, operation: Any) -> None:
+        self.set(("paths", path, method.lower()), operation)
+
+    def remove_operation(self, path: str, method: str) -> None:
+        self.delete(("paths", path, method.lower()))
+
+    def set_component(self, kind: str, name: str, value: Any) -> None:
+        self.set(("components", kind, name), value)
+
+    def remove_component(self, kind: str, name: str) -> None:
+        self.delete(("components", kind, name))
+
+    def render(self) -> bytes:
+        """Return the compact JSON encoding of the document."""
+        with phase("serialization"):
+            self._render(self._root, self.doc, 0)
+        self._changed.clear()
+        return self._root.data
+
+    def _render(self, fragment: _Fragment, value: Any, depth: int) -> None:
+        if fragment.data is not None and fragment.value is value:
+            self.reused += 1
+            return
+        fragment.value = value
+        if depth >= FRAGMENT_DEPTH or not isinstance(value, Mapping):
+            self.encoded += 1
+            fragment.data = encoding.dumps(value)
+            fragment.children.clear()
+        else:
+            children = {}
+            for key, child_value in value.items():
+                child = fragment.children.get(key)
+                if child is None:
+                    child = _Fragment(
+                        encoding.dumps(encoding.key_str(key)) + b":", child_value
+                    )
+                self._render(child, child_value, depth + 1)
+                children[key] = child
+            fragment.children = children
+            fragment.data = (
+                b"{" + b",".join(child.entry for child in children.values()) + b"}"
+            )
+        fragment.entry = fragment.key + fragment.data
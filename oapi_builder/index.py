@@ -0,0 +1,196 @@
+"""Operation indexes for producing many filtered views of one spec.
+
+:class:`SpecIndex` scans a document once and maps tags, path prefixes,
+``x-`` extension values and security schemes and scopes to the operations
+that carry them.  A filtered sub-spec, such as "only tag=billing" or "only
+public operations", is then an index lookup followed by a traversal of the
+:class:`~oapi_builder.graph.ReferenceGraph` from the selected operations::
+
+    index = SpecIndex(doc)
+    billing = index.view(tag="billing")
+    partner = index.view(extension=("x-audience", "partner"), scope="read")
+
+Views contain the selected operations, the components they use directly or
+indirectly and the tags they mention; everything else in the document is
+kept as is.  Path items and components are shared with the indexed
+document, not copied, so neither should be mutated afterwards.
+"""
+from __future__ import annotations
+
+import bisect
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from oapi_builder.graph import ComponentKey, OperationKey, ReferenceGraph
+from oapi_builder.model import HTTP_METHODS
+
+__all__ = ["SpecIndex"]
+
+_EMPTY: FrozenSet[OperationKey] = frozenset()
+
+
+def _index_values(value: Any) -> List[Any]:
+    """The hashable values an extension is indexed under."""
+    values = value if isinstance(value, list) else [value]
+    return [item for item in values if isinstance(item, (str, int, float, bool))]
+
+
+class SpecIndex:
+    """Tag, path, extension and security indexes over a document's operations.
+
+    :param graph: a reference graph of the same document, if one was
+        already built.
+    """
+
+    def __init__(self, doc: Any = None, graph: Optional[ReferenceGraph] = None):
+        if graph is None:
+            if doc is None:
+                raise TypeError("SpecIndex needs a document or a graph")
+            graph = ReferenceGraph(doc)
+        self.graph = graph
+        self.doc = graph.doc
+        # Document order, used to order every result.
+        self.operations: List[OperationKey] = list(graph.operations)
+        self._order = {key: idx for idx, key in enumerate(self.operations)}
+        self.tags: Dict[str, Set[OperationKey]] = {}
+        self.extensions: Dict[Tuple[str, Any], Set[OperationKey]] = {}
+        self.schemes: Dict[str, Set[OperationKey]] = {}
+        self.scopes: Dict[Tuple[Optional[str], str], Set[OperationKey]] = {}
+        self.public: Set[OperationKey] = set()
+        self._paths: Dict[str, List[OperationKey]] = {}
+        self._build()
+        self._sorted_paths = sorted(self._paths)
+        self._positions: Dict[ComponentKey, int] = {
+            key: idx for idx, key in enumerate(graph.edges)
+        }
+
+    def _build(self) -> None:
+        paths = self.doc.get("paths") or {}
+        default_security = self.doc.get("security")
+        for key in self.operations:
+            path, method = key
+            operation = paths[path][method]
+            self._paths.setdefault(path, []).append(key)
+            for tag in operation.get("tags") or ():
+                self.tags.setdefault(tag, set()).add(key)
+            for name, value in operation.items():
+                if name.startswith("x-"):
+                    for item in _index_values(value):
+                        self.extensions.setdefault((name, item), set()).add(key)
+            security = operation.get("security", default_security)
+            if not security or any(not requirement for requirement in security):
+                self.public.add(key)
+            for requirement in security or ():
+                if not isinstance(requirement, Mapping):
+                    continue
+                for scheme, scopes in requirement.items():
+                    self.schemes.setdefault(scheme, set()).add(key)
+                    for scope in scopes or ():
+                        self.scopes.setdefault((scheme, scope), set()).add(key)
+                        self.scopes.setdefault((None, scope), set()).add(key)
+
+    def under(self, prefix: str) -> Set[OperationKey]:
+        """Operations whose path is ``prefix`` or continues it with ``/``."""
+        prefix = prefix.rstrip("/")
+        paths = self._sorted_paths
+        found: Set[OperationKey] = set()
+        for idx in range(bisect.bisect_left(paths, prefix), len(paths)):
+            path = paths[idx]
+            if not path.startswith(prefix):
+                break
+            if len(path) == len(prefix) or path[len(prefix)] == "/":
+                found.update(self._paths[path])
+        return found
+
+    def select(
+        self,
+        tag: Optional[str] = None,
+        path_prefix: Optional[str] = None,
+        extension: Optional[Tuple[str, Any]] = None,
+        scheme: Optional[str] = None,
+        scope: Optional[str] = None,
+        public: Optional[bool] = None,
+    ) -> List[OperationKey]:
+        """Return the operations matching every given filter, in document order.
+
+        :param extension: ``(name, value)``; list-valued extensions match
+            any of their items.
+        :param scope: an OAuth scope, of ``scheme`` if given and of any
+            scheme otherwise.
+        :param public: operations that need no authentication (``True``) or
+            that do (``False``).
+        """
+        candidates: List[Set[OperationKey]] = []
+        if tag is not None:
+            candidates.append(self.tags.get(tag, _EMPTY))
+        if path_prefix is not None:
+            candidates.append(self.under(path_prefix))
+        if extension is not None:
+            candidates.append(self.extensions.get(tuple(extension), _EMPTY))
+        if scope is not None:
+            candidates.append(self.scopes.get((scheme, scope), _EMPTY))
+        elif scheme is not None:
+            candidates.append(self.schemes.get(scheme, _EMPTY))
+        if public:
+            candidates.append(self.public)
+        if not candidates:
+            selected: Iterable[OperationKey] = self.operations
+        else:
+            candidates.sort(key=len)
+            selected = set(candidates[0]).intersection(*candidates[1:])
+        if public is False:
+            selected = [key for key in selected if key not in self.public]
+        return sorted(selected, key=self._order.__getitem__)
+
+    def subset(self, operations: Iterable[OperationKey]) -> Dict[str, Any]:
+        """Return the document reduced to ``operations`` and what they use."""
+        doc = self.doc
+        operations = sorted(set(operations), key=self._order.__getitem__)
+        chosen: Dict[str, List[str]] = {}
+        for path, method in operations:
+            chosen.setdefault(path, []).append(method)
+        source = doc.get("paths") or {}
+        paths = {}
+        tags: Set[str] = set()
+        for path, methods in chosen.items():
+            item = source[path]
+            if len(methods) == len(self._paths[path]):
+                paths[path] = item
+            else:
+                paths[path] = {
+                    key: value
+                    for key, value in item.items()
+                    if key not in HTTP_METHODS or key in methods
+                }
+            for method in methods:
+                tags.update(item[method].get("tags") or ())
+
+        view = dict(doc)
+        view["paths"] = paths
+        components = doc.get("components")
+        if isinstance(components, Mapping):
+            used = sorted(self.graph.reachable(operations), key=self._positions.get)
+            kept: Dict[str, Dict[str, Any]] = {}
+            for kind, name in used:
+                kept.setdefault(kind, {})[name] = components[kind][name]
+            view["components"] = {
+                kind: kept[kind] if isinstance(entries, Mapping) else entries
+                for kind, entries in components.items()
+                if kind in kept or not isinstance(entries, Mapping)
+            }
+        if isinstance(doc.get("tags"), list):
+            view["tags"] = [
+                tag
+                for tag in doc["tags"]
+                if not isinstance(tag, Mapping) or tag.get("name") in tags
+            ]
+        return view
+
+    def view(self, **filters: Any) -> Dict[str, Any]:
+        """Return the sub-spec of the operations :meth:`select` picks."""
+        return self.subset(self.select(**filters))
+
+    def __repr__(self) -> str:
+        return (
+            f"<SpecIndex {len(self.operations)} operations, {len(self.tags)} tags, "
+            f"{len(self.extensions)} extension values>"
+        )
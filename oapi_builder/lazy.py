@@ -0,0 +1,157 @@
+"""Lazily materialized components.
+
+A :class:`LazyComponents` map holds component factories and only calls one
+when its entry is first read, either because something looks it up or
+because the map is rendered.  A :class:`ComponentLibrary` groups such maps
+by component kind (``schemas``, ``parameters``, ``responses``, ...) and can
+copy into a document exactly the components that document references,
+directly or transitively, leaving every other factory untouched.
+"""
+from __future__ import annotations
+
+import copy
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from oapi_builder.graph import ComponentKey, ReferenceGraph, component_refs
+from oapi_builder.model import to_plain
+
+__all__ = ["COMPONENT_KINDS", "ComponentLibrary", "LazyComponents"]
+
+COMPONENT_KINDS = (
+    "schemas",
+    "responses",
+    "parameters",
+    "examples",
+    "requestBodies",
+    "headers",
+    "securitySchemes",
+    "links",
+    "callbacks",
+)
+
+Factory = Callable[[], Any]
+
+
+class LazyComponents(MutableMapping):
+    """A component map whose values may be produced on first access."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self._factories: Dict[str, Optional[Factory]] = {}
+
+    def register(self, name: str, factory: Factory) -> None:
+        """Add ``name`` whose value is ``factory()``, evaluated on first use."""
+        self._factories[name] = factory
+        self._values.pop(name, None)
+
+    def is_materialized(self, name: str) -> bool:
+        return name in self._values
+
+    def materialized(self) -> List[str]:
+        """Names whose values have been produced so far."""
+        return [name for name in self._factories if name in self._values]
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            factory = self._factories[name]
+        value = self._values[name] = to_plain(factory())
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._factories[name] = None
+        self._values[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self._factories[name]
+        self._values.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def __repr__(self) -> str:
+        return (
+            f"<LazyComponents {len(self)} entries, "
+            f"{len(self._values)} materialized>"
+        )
+
+
+class ComponentLibrary:
+    """A shared set of reusable components, grouped by kind."""
+
+    def __init__(self) -> None:
+        self.kinds: Dict[str, LazyComponents] = {}
+
+    def __getitem__(self, kind: str) -> LazyComponents:
+        return self.kinds[kind]
+
+    def _kind(self, kind: str) -> LazyComponents:
+        if kind not in COMPONENT_KINDS:
+            raise ValueError(f"Unknown component kind {kind!r}")
+        return self.kinds.setdefault(kind, LazyComponents())
+
+    def register(self, kind: str, name: str, factory: Optional[Factory] = None) -> Any:
+        """Register a component factory; usable as a decorator.
+
+        >>> @library.register("schemas", "Error")
+        ... def error_schema():
+        ...     return {"type": "object"}
+        """
+        if factory is None:
+            return lambda func: self.register(kind, name, func)
+        self._kind(kind).register(name, factory)
+        return factory
+
+    def add(self, kind: str, name: str, value: Any) -> None:
+        """Register an already built component."""
+        self._kind(kind)[name] = value
+
+    def get(self, kind: str, name: str) -> Any:
+        return self.kinds[kind][name]
+
+    def materialize(self, doc: Any) -> Dict[str, Any]:
+        """Add every library component ``doc`` references to ``doc``.
+
+        References are the edges of a
+        :class:`~oapi_builder.graph.ReferenceGraph`: ``$ref``s, discriminator
+        mapping targets and the security schemes named in security
+        requirements.  They are followed transitively through the added
+        components; components already present in ``doc`` are left as they
+        are.  Each document gets its own deep copy of the added components,
+        so editing one never changes the library or other documents.  Plain
+        documents are updated in place and returned.
+        """
+        doc = to_plain(doc)
+        graph = ReferenceGraph(doc)
+        components = doc.setdefault("components", {})
+        pending: List[ComponentKey] = list(graph.roots)
+        for targets in graph.operations.values():
+            pending.extend(targets)
+        for targets in graph.edges.values():
+            pending.extend(targets)
+        pending.reverse()
+        seen: Set[ComponentKey] = set()
+        while pending:
+            key = pending.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            kind, name = key
+            existing = components.get(kind)
+            if existing is not None and name in existing:
+                continue
+            library = self.kinds.get(kind)
+            if library is None or name not in library:
+                continue
+            value = copy.deepcopy(library[name])
+            components.setdefault(kind, {})[name] = value
+            pending.extend(reversed(component_refs(value)))
+        return doc
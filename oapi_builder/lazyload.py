@@ -0,0 +1,363 @@
+"""Lazily parsed, memory-mapped access to large JSON specs.
+
+:class:`LazySpec` maps the file into memory and parses nothing up front.
+Objects are exposed as :class:`LazyObject` views whose members are located
+by scanning only as far as needed to find the requested key; member values
+are skipped over (strings and brackets are matched, nothing is decoded) and
+only the sub-tree that is actually returned gets handed to the JSON parser.
+
+Patches are recorded per object and applied while writing: untouched bytes
+are copied from the map verbatim, so loading a huge spec, changing a handful
+of operations and writing it back costs little more than a file copy.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from oapi_builder import encoding
+from oapi_builder.errors import OapiBuilderError, RefResolutionError
+from oapi_builder.pointer import split_pointer
+
+__all__ = ["LazyObject", "LazySpec", "SpecSyntaxError"]
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(rb"[^,\]} \t\r\n]+")
+# Everything up to and including the next bracket outside a string.
+_TO_BRACKET = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])', re.DOTALL
+)
+
+_DELETED = object()
+
+# Key start, value start, value end; the end of an object value is ``None``
+# until something needs to get past it.
+Member = Tuple[int, int, Optional[int]]
+
+
+class SpecSyntaxError(OapiBuilderError, ValueError):
+    """The mapped file is not well-formed JSON where it was scanned."""
+
+
+class LazyObject(Mapping):
+    """A read-only view of one JSON object inside a :class:`LazySpec`.
+
+    Nested objects are returned as further views; arrays and scalars are
+    parsed when accessed.  Patches recorded on the spec are reflected.
+    """
+
+    def __init__(self, spec: "LazySpec", start: int, end: Optional[int], pointer: str):
+        self._spec = spec
+        self.start = start
+        self._end = end
+        self.pointer = pointer
+        self._members: Dict[str, Member] = {}
+        self._scan_pos: Optional[int] = start + 1
+        # Key of the last indexed member when its object value was not
+        # skipped; ``_scan_pos`` is then that value's start.
+        self._open: Optional[str] = None
+        self._children: Dict[str, LazyObject] = {}
+
+    @property
+    def end(self) -> int:
+        """Offset just past the closing brace; found by indexing every member."""
+        if self._end is None:
+            self.members()
+        return self._end
+
+    def _value_end(self, key: str) -> int:
+        key_start, value_start, value_end = self._members[key]
+        if value_end is None:
+            child = self._children.get(key)
+            if child is not None:
+                value_end = child.end
+            else:
+                value_end = self._spec._skip_value(value_start)
+            self._members[key] = (key_start, value_start, value_end)
+        return value_end
+
+    def _scan_next(self) -> Optional[str]:
+        """Index the next member; return its key or ``None`` when done."""
+        buf = self._spec._buf
+        if self._open is not None:
+            self._scan_pos = self._value_end(self._open)
+            self._open = None
+        pos = _WHITESPACE.match(buf, self._scan_pos).end()
+        if buf[pos : pos + 1] == b"}":
+            self._scan_pos = None
+            self._end = pos + 1
+            return None
+        if self._members:
+            if buf[pos : pos + 1] != b",":
+                raise self._spec._error("expected ',' or '}'", pos)
+            pos = _WHITESPACE.match(buf, pos + 1).end()
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise self._spec._error("expected an object key", pos)
+        key = json.loads(match.group())
+        pos = _WHITESPACE.match(buf, match.end()).end()
+        if buf[pos : pos + 1] != b":":
+            raise self._spec._error("expected ':'", pos)
+        value_start = _WHITESPACE.match(buf, pos + 1).end()
+        if buf[value_start : value_start + 1] == b"{":
+            # Objects are only skipped once scanning has to get past them,
+            # so a lookup can descend into this one without reading it twice.
+            self._members[key] = (match.start(), value_start, None)
+            self._open = key
+            self._scan_pos = value_start
+        else:
+            value_end = self._spec._skip_value(value_start)
+            self._members[key] = (match.start(), value_start, value_end)
+            self._scan_pos = value_end
+        return key
+
+    def _member(self, key: str) -> Optional[Member]:
+        member = self._members.get(key)
+        while member is None and self._scan_pos is not None:
+            if self._scan_next() == key:
+                member = self._members[key]
+        return member
+
+    def members(self) -> List[Tuple[str, Member]]:
+        """Index every member and return them in document order."""
+        while self._scan_pos is not None:
+            self._scan_next()
+        return list(self._members.items())
+
+    def _patches(self) -> Dict[str, Any]:
+        return self._spec._patches.get(self.start, {})
+
+    def __getitem__(self, key: str) -> Any:
+        patches = self._patches()
+        if key in patches:
+            if patches[key] is _DELETED:
+                raise KeyError(key)
+            return patches[key]
+        member = self._member(key)
+        if member is None:
+            raise KeyError(key)
+        _, value_start, value_end = member
+        if self._spec._buf[value_start : value_start + 1] == b"{":
+            child = self._children.get(key)
+            if child is None:
+                pointer = f"{self.pointer}/{key.replace('~', '~0').replace('/', '~1')}"
+                child = LazyObject(self._spec, value_start, value_end, pointer)
+                self._children[key] = child
+            return child
+        return json.loads(self._spec._buf[value_start:value_end])
+
+    def __iter__(self) -> Iterator[str]:
+        patches = self._patches()
+        for key, _ in self.members():
+            if patches.get(key) is not _DELETED:
+                yield key
+        for key, value in patches.items():
+            if key not in self._members and value is not _DELETED:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        patches = self._patches()
+        if key in patches:
+            return patches[key] is not _DELETED
+        return isinstance(key, str) and self._member(key) is not None
+
+    def raw(self) -> bytes:
+        """The original bytes of this object, ignoring patches."""
+        return bytes(self._spec._buf[self.start : self.end])
+
+    def load(self) -> Dict[str, Any]:
+        """Parse this object completely, with patches applied."""
+        if not self._spec._has_patches_within(self.start, self.end):
+            return json.loads(self._spec._buf[self.start : self.end])
+        return {key: _load(self[key]) for key in self}
+
+    def __repr__(self) -> str:
+        return f"<LazyObject {self.pointer or '/'} bytes {self.start}-{self.end}>"
+
+
+def _load(value: Any) -> Any:
+    return value.load() if isinstance(value, LazyObject) else value
+
+
+class LazySpec:
+    """A JSON spec file mapped into memory and parsed on demand.
+
+    Use as a context manager, or call :meth:`close` when done; views and
+    parsed values must not be used after closing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fp = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._fp.close()
+            raise SpecSyntaxError(f"{path} is empty") from None
+        # object start offset -> key -> new value (or _DELETED)
+        self._patches: Dict[int, Dict[str, Any]] = {}
+        start = _WHITESPACE.match(self._buf, 0).end()
+        if self._buf[start : start + 1] != b"{":
+            error = self._error("the document must be a JSON object", start)
+            self.close()
+            raise error
+        self.root = LazyObject(self, start, None, "")
+
+    def close(self) -> None:
+        self._buf.close()
+        self._fp.close()
+
+    def __enter__(self) -> "LazySpec":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __getitem__(self, key: str) -> Any:
+        return self.root[key]
+
+    def _error(self, message: str, pos: int) -> SpecSyntaxError:
+        return SpecSyntaxError(f"{self.path}: {message} at byte {pos}")
+
+    def _skip_value(self, pos: int) -> int:
+        buf = self._buf
+        first = buf[pos : pos + 1]
+        if first == b'"':
+            match = _STRING.match(buf, pos)
+            if match is None:
+                raise self._error("unterminated string", pos)
+            return match.end()
+        if first in (b"{", b"["):
+            depth = 1
+            end = pos + 1
+            match_bracket = _TO_BRACKET.match
+            while True:
+                match = match_bracket(buf, end)
+                if match is None:
+                    raise self._error("unterminated container", pos)
+                end = match.end()
+                if match.group(1) in b"[{":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if not depth:
+                        return end
+        match = _SCALAR.match(buf, pos)
+        if match is None:
+            raise self._error("expected a value", pos)
+        return match.end()
+
+    def get(self, pointer: str) -> Any:
+        """Return the value at JSON ``pointer``, parsing only that sub-tree."""
+        node: Any = self.root
+        for token in split_pointer(pointer):
+            try:
+                if isinstance(node, Mapping):
+                    node = node[token]
+                elif isinstance(node, list):
+                    node = node[int(token)]
+                else:
+                    raise KeyError(token)
+            except (KeyError, IndexError, ValueError):
+                raise RefResolutionError(
+                    f"Unresolvable JSON pointer {pointer!r}", pointer
+                ) from None
+        return _load(node)
+
+    def _parent(self, pointer: str) -> Tuple[Any, str]:
+        tokens = split_pointer(pointer)
+        if not tokens:
+            raise ValueError("Cannot patch the document root")
+        node: Any = self.root
+        for token in tokens[:-1]:
+            node = node[token] if isinstance(node, Mapping) else node[int(token)]
+        return node, tokens[-1]
+
+    def patch(self, pointer: str, value: Any) -> None:
+        """Set the object member at ``pointer`` to ``value`` (adding it if new)."""
+        parent, key = self._parent(pointer)
+        value = json.loads(encoding.dumps(value))
+        if isinstance(parent, LazyObject):
+            self._patches.setdefault(parent.start, {})[key] = value
+            parent._children.pop(key, None)
+        elif isinstance(parent, dict):  # inside an already patched value
+            parent[key] = value
+        else:
+            raise TypeError(f"Cannot patch {pointer!r}: parent is not an object")
+
+    def delete(self, pointer: str) -> None:
+        """Remove the object member at ``pointer``."""
+        parent, key = self._parent(pointer)
+        if key not in parent:
+            raise KeyError(pointer)
+        if isinstance(parent, LazyObject):
+            self._patches.setdefault(parent.start, {})[key] = _DELETED
+            parent._children.pop(key, None)
+        elif isinstance(parent, dict):
+            del parent[key]
+        else:
+            raise TypeError(f"Cannot delete {pointer!r}: parent is not an object")
+
+    def _has_patches_within(self, start: int, end: int) -> bool:
+        return any(start <= offset < end for offset in self._patches)
+
+    def _object_at(self, start: int) -> LazyObject:
+        node = self.root
+        while node.start != start:
+            for key, _ in node.members():
+                value_start = node._members[key][1]
+                if value_start <= start < node._value_end(key):
+                    node = node[key]
+                    break
+            else:  # pragma: no cover - patches always target indexed objects
+                raise AssertionError(f"no object at byte {start}")
+        return node
+
+    def write(self, fp: BinaryIO) -> None:
+        """Write the document, with patches applied, to binary file ``fp``."""
+        self._emit(self.root.start, self.root.end, fp)
+
+    def _emit(self, start: int, end: int, fp: BinaryIO) -> None:
+        view = memoryview(self._buf)
+        pos = start
+        for offset in sorted(o for o in self._patches if start <= o < end):
+            if offset < pos:
+                continue  # nested inside an object already re-emitted
+            fp.write(view[pos:offset])
+            obj = self._object_at(offset)
+            self._emit_object(obj, fp)
+            pos = obj.end
+        fp.write(view[pos:end])
+
+    def _emit_object(self, obj: LazyObject, fp: BinaryIO) -> None:
+        patches = self._patches[obj.start]
+        fp.write(b"{")
+        first = True
+        for key, (key_start, value_start, _) in obj.members():
+            value_end = obj._value_end(key)
+            value = patches.get(key, obj)
+            if value is _DELETED:
+                continue
+            if not first:
+                fp.write(b",")
+            first = False
+            if value is obj:
+                self._emit(key_start, value_end, fp)
+            else:
+                fp.write(self._buf[key_start:value_start])
+                fp.write(encoding.dumps(value))
+        for key, value in patches.items():
+            if key in obj._members or value is _DELETED:
+                continue
+            if not first:
+                fp.write(b",")
+            first = False
+            fp.write(encoding.dumps(key) + b":" + encoding.dumps(value))
+        fp.write(b"}")
@@ -0,0 +1,425 @@
+"""Merge many service specs into one gateway document.
+
+:func:`merge_documents` combines the specs of several services in a single
+pass over each of them, so the work grows with the total size of the specs
+rather than with the number of pairs:
+
+* paths get the service's prefix (``/pets`` becomes ``/store/pets``); two
+  services may share a path only if they define different operations on it;
+* components are merged by name.  When two services define a component of
+  the same name and kind, a structurally identical definition (compared by
+  :class:`~oapi_builder.hashing.StructuralHasher`, including the components
+  it refers to) is kept once, and a different one is renamed with
+  ``name_for(service, name)`` and every reference to it rewritten;
+* duplicate ``operationId`` values are renamed the same way;
+* tags are merged by name, the first definition winning field by field;
+* security schemes are components; a service's top-level ``security``
+  stays top-level when every service declares the same requirements and is
+  otherwise copied into the service's operations that do not set their own.
+
+Components that are deduplicated are only compared against the service
+that first defined the name, and a dedupe is undone (the component renamed
+after all) when one of the components it refers to ends up with a different
+name on the two sides.  Each undo is propagated to the components referring
+to it through a reverse index, so the check stays linear.  Inputs are not
+modified; subtrees that need no rewriting are shared with them.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+from oapi_builder.errors import OapiBuilderError
+from oapi_builder.hashing import StructuralHasher
+from oapi_builder.model import HTTP_METHODS, Node
+from oapi_builder.pointer import escape_token, unescape_token
+from oapi_builder.walk import discriminator_ref, iter_refs
+
+__all__ = ["MergeConflictError", "merge_documents"]
+
+Key = Tuple[str, str]
+
+_LOCAL_REF = re.compile(r"#/components/([^/]+)/([^/]+)\Z")
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class MergeConflictError(OapiBuilderError, ValueError):
+    """Two services define something that cannot be merged or renamed."""
+
+
+def _service_name(service: str, name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", f"{service}_{name}")
+
+
+def _local_target(ref: str) -> Optional[Key]:
+    match = _LOCAL_REF.match(ref)
+    if match is None:
+        return None
+    return match.group(1), unescape_token(match.group(2))
+
+
+class _Service:
+    __slots__ = ("name", "doc", "prefix", "components", "final")
+
+    def __init__(self, name: str, doc: Mapping[str, Any], prefix: str):
+        self.name = name
+        self.doc = doc
+        self.prefix = prefix.rstrip("/")
+        self.components: Mapping[str, Any] = doc.get("components") or {}
+        # (kind, original name) -> name in the gateway document.
+        self.final: Dict[Key, str] = {}
+
+    def component(self, key: Key) -> Any:
+        return self.components[key[0]][key[1]]
+
+
+class _Merge:
+    def __init__(
+        self,
+        services: List[_Service],
+        conflicts: str,
+        name_for: Callable[[str, str], str],
+    ):
+        self.services = services
+        self.conflicts = conflicts
+        self.name_for = name_for
+        self.hasher = StructuralHasher()
+        # (kind, gateway name) -> (service, original name) that claimed it.
+        self.owners: Dict[Key, Tuple[_Service, str]] = {}
+
+    def rename(self, service: _Service, key: Key) -> str:
+        kind, name = key
+        if self.conflicts == "error":
+            raise MergeConflictError(
+                f"Service {service.name!r} redefines {kind} component {name!r}"
+            )
+        base = self.name_for(service.name, name)
+        new, suffix = base, 1
+        while (kind, new) in self.owners:
+            suffix += 1
+            new = f"{base}{suffix}"
+        self.owners[(kind, new)] = (service, name)
+        return new
+
+    def claim_components(self) -> List[Tuple[_Service, Key, _Service]]:
+        """Give every component a gateway name; return the tentative dedupes."""
+        dedupes = []
+        for service in self.services:
+            for kind, entries in service.components.items():
+                if not isinstance(entries, Mapping):
+                    continue
+                for name, component in entries.items():
+                    key = (kind, name)
+                    owner = self.owners.get(key)
+                    if owner is None:
+                        self.owners[key] = (service, name)
+                        service.final[key] = name
+                        continue
+                    theirs = owner[0].component((kind, owner[1]))
+                    if owner[1] == name and (
+                        self.hasher.hash(component) == self.hasher.hash(theirs)
+                    ):
+                        service.final[key] = name
+                        dedupes.append((service, key, owner[0]))
+                    else:
+                        service.final[key] = self.rename(service, key)
+        return dedupes
+
+    def settle_dedupes(self, dedupes: List[Tuple[_Service, Key, _Service]]) -> None:
+        """Undo dedupes whose references resolve differently on each side."""
+        refs: Dict[Tuple[int, Key], List[Key]] = {}
+        waiting: Dict[Tuple[int, Key], List[Tuple[_Service, Key, _Service]]] = {}
+        for entry in dedupes:
+            service, key, owner = entry
+            targets = []
+            for ref in iter_refs(service.component(key), mappings=True):
+                target = _local_target(ref)
+                if target is not None and target != key:
+                    targets.append(target)
+                    waiting.setdefault((id(service), target), []).append(entry)
+                    waiting.setdefault((id(owner), target), []).append(entry)
+            refs[(id(service), key)] = targets
+
+        queue: Deque[Tuple[_Service, Key, _Service]] = deque(dedupes)
+        while queue:
+            service, key, owner = queue.popleft()
+            if service.final[key] != key[1]:
+                continue  # already renamed
+            if all(
+                service.final.get(target) == owner.final.get(target)
+                for target in refs[(id(service), key)]
+            ):
+                continue
+            service.final[key] = self.rename(service, key)
+            queue.extend(waiting.get((id(service), key), ()))
+
+    def kept(self, service: _Service, key: Key) -> bool:
+        owner = self.owners.get((key[0], service.final[key]))
+        return owner is not None and owner[0] is service and owner[1] == key[1]
+
+
+def _rewrite(value: Any, refs: Dict[str, str]) -> Any:
+    """Return ``value`` with renamed references; unchanged parts are shared.
+
+    Discriminator ``mapping`` values count as references; a renamed target
+    is written back as a full ``$ref``.
+    """
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        out = None
+        for key, child in value.items():
+            if key == "$ref" and isinstance(ref, str):
+                new = refs.get(ref, ref)
+            elif key == "discriminator" and isinstance(child, dict):
+                new = _rewrite_discriminator(child, refs)
+            else:
+                new = _rewrite(child, refs)
+            if new is not child:
+                if out is None:
+                    out = dict(value)
+                out[key] = new
+        return value if out is None else out
+    if isinstance(value, list):
+        items = [_rewrite(item, refs) for item in value]
+        if all(new is old for new, old in zip(items, value)):
+            return value
+        return items
+    return value
+
+
+def _rewrite_discriminator(value: Dict[str, Any], refs: Dict[str, str]) -> Any:
+    mapping = value.get("mapping")
+    if not isinstance(mapping, dict):
+        return _rewrite(value, refs)
+    renamed = {
+        key: (
+            refs.get(discriminator_ref(target), target)
+            if isinstance(target, str)
+            else target
+        )
+        for key, target in mapping.items()
+    }
+    if renamed == mapping:
+        return value
+    return {**value, "mapping": renamed}
+
+
+def _rewrite_security(item: Any, schemes: Dict[str, str]) -> Any:
+    """Rename schemes in the requirements of a path item's operations.
+
+    Callbacks of the operations are path items too and are handled alike.
+    """
+    if not schemes or not isinstance(item, Mapping):
+        return item
+    out = None
+    for method in HTTP_METHODS:
+        operation = item.get(method)
+        if not isinstance(operation, Mapping):
+            continue
+        updated = operation
+        security = operation.get("security")
+        renamed = _rename_requirements(security, schemes)
+        if renamed is not security:
+            updated = {**updated, "security": renamed}
+        callbacks = operation.get("callbacks")
+        if isinstance(callbacks, Mapping):
+            rewritten = _rewrite_values(
+                callbacks, lambda callback: _rewrite_callback(callback, schemes)
+            )
+            if rewritten is not callbacks:
+                updated = {**updated, "callbacks": rewritten}
+        if updated is not operation:
+            if out is None:
+                out = dict(item)
+            out[method] = updated
+    return item if out is None else out
+
+
+def _rewrite_callback(callback: Any, schemes: Dict[str, str]) -> Any:
+    if not isinstance(callback, Mapping):
+        return callback
+    return _rewrite_values(callback, lambda item: _rewrite_security(item, schemes))
+
+
+def _rewrite_values(mapping: Mapping[str, Any], rewrite: Callable[[Any], Any]) -> Any:
+    """Apply ``rewrite`` to every value of ``mapping``, sharing it if unchanged."""
+    out = None
+    for key, value in mapping.items():
+        new = rewrite(value)
+        if new is not value:
+            if out is None:
+                out = dict(mapping)
+            out[key] = new
+    return mapping if out is None else out
+
+
+def _renames(service: _Service) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """The service's renamed ``$ref`` targets and security scheme names."""
+    refs = {}
+    schemes = {}
+    for (kind, name), final in service.final.items():
+        if final != name:
+            refs[f"#/components/{kind}/{escape_token(name)}"] = (
+                f"#/components/{kind}/{escape_token(final)}"
+            )
+            if kind == "securitySchemes":
+                schemes[name] = final
+    return refs, schemes
+
+
+def _rename_requirements(requirements: Any, schemes: Dict[str, str]) -> Any:
+    if not schemes or not isinstance(requirements, list):
+        return requirements
+    renamed = [
+        (
+            {schemes.get(name, name): scopes for name, scopes in requirement.items()}
+            if isinstance(requirement, Mapping)
+            else requirement
+        )
+        for requirement in requirements
+    ]
+    return renamed if renamed != requirements else requirements
+
+
+def merge_documents(
+    services: Mapping[str, Any],
+    prefixes: Optional[Mapping[str, str]] = None,
+    info: Optional[Mapping[str, Any]] = None,
+    servers: Optional[List[Any]] = None,
+    conflicts: str = "rename",
+    name_for: Callable[[str, str], str] = _service_name,
+) -> Dict[str, Any]:
+    """Merge the specs of ``services`` (name -> document) into one document.
+
+    :param prefixes: service name -> path prefix, e.g. ``{"store": "/store"}``;
+        services without one keep their paths.
+    :param info: the gateway's ``info``; defaults to a generic title.
+    :param servers: the gateway's ``servers``.  The services' own
+        ``servers`` are dropped since the gateway serves their paths.
+    :param conflicts: ``"rename"`` renames clashing components and operation
+        ids with ``name_for(service, name)`` (plus a numeric suffix if that
+        is taken too); ``"error"`` raises :class:`MergeConflictError`.
+    :raises MergeConflictError: when two services define the same operation
+        on the same path, or on any clash with ``conflicts="error"``.
+    """
+    if conflicts not in ("rename", "error"):
+        raise ValueError("conflicts must be 'rename' or 'error'")
+    prefixes = prefixes or {}
+    plan = []
+    for name, doc in services.items():
+        if isinstance(doc, Node):
+            doc = doc.to_dict()
+        plan.append(_Service(name, doc, prefixes.get(name, "")))
+    merge = _Merge(plan, conflicts, name_for)
+    merge.settle_dedupes(merge.claim_components())
+
+    renames = [_renames(service) for service in plan]
+    requirements = [
+        _rename_requirements(service.doc.get("security"), schemes)
+        for service, (_, schemes) in zip(plan, renames)
+    ]
+    shared_security = requirements[0] if requirements else None
+    if any(security != shared_security for security in requirements):
+        shared_security = None
+
+    paths: Dict[str, Any] = {}
+    components: Dict[str, Dict[str, Any]] = {}
+    tags: Dict[str, Dict[str, Any]] = {}
+    operation_ids: Dict[str, str] = {}
+    for service, (refs, schemes), security in zip(plan, renames, requirements):
+        rewrite: Callable[[Any], Any] = (
+            (lambda value: _rewrite(value, refs)) if refs else (lambda value: value)
+        )
+
+        for key, final in service.final.items():
+            if merge.kept(service, key):
+                kind = key[0]
+                component = rewrite(service.component(key))
+                if kind == "pathItems":
+                    component = _rewrite_security(component, schemes)
+                elif kind == "callbacks":
+                    component = _rewrite_callback(component, schemes)
+                components.setdefault(kind, {})[final] = component
+
+        if shared_security is not None:
+            security = None
+        for path, item in (service.doc.get("paths") or {}).items():
+            item = _rewrite_security(rewrite(item), schemes)
+            if isinstance(item, Mapping):
+                item = _service_operations(
+                    service, item, security, operation_ids, merge
+                )
+            _add_path(paths, service.prefix + path, item, service.name)
+
+        for tag in service.doc.get("tags") or ():
+            if isinstance(tag, Mapping) and "name" in tag:
+                tags[tag["name"]] = {**tag, **tags.get(tag["name"], {})}
+
+    doc: Dict[str, Any] = {
+        "openapi": plan[0].doc.get("openapi", "3.0.3") if plan else "3.0.3",
+        "info": dict(info) if info else {"title": "API gateway", "version": "1.0"},
+    }
+    if servers:
+        doc["servers"] = list(servers)
+    doc["paths"] = paths
+    if components:
+        doc["components"] = components
+    if shared_security is not None:
+        doc["security"] = shared_security
+    if tags:
+        doc["tags"] = list(tags.values())
+    return doc
+
+
+def _service_operations(
+    service: _Service,
+    item: Mapping[str, Any],
+    security: Optional[List[Any]],
+    operation_ids: Dict[str, str],
+    merge: _Merge,
+) -> Mapping[str, Any]:
+    """Apply the service's security and unique operation ids to a path item."""
+    out = None
+    for method in HTTP_METHODS:
+        operation = item.get(method)
+        if not isinstance(operation, Mapping):
+            continue
+        updated = operation
+        if security is not None and "security" not in operation:
+            updated = {**updated, "security": security}
+        operation_id = operation.get("operationId")
+        if isinstance(operation_id, str):
+            if operation_id in operation_ids:
+                if merge.conflicts == "error":
+                    raise MergeConflictError(
+                        f"Service {service.name!r} reuses operationId "
+                        f"{operation_id!r} of service {operation_ids[operation_id]!r}"
+                    )
+                base = merge.name_for(service.name, operation_id)
+                operation_id, suffix = base, 1
+                while operation_id in operation_ids:
+                    suffix += 1
+                    operation_id = f"{base}{suffix}"
+                updated = {**updated, "operationId": operation_id}
+            operation_ids[operation_id] = service.name
+        if updated is not operation:
+            if out is None:
+                out = dict(item)
+            out[method] = updated
+    return item if out is None else out
+
+
+def _add_path(paths: Dict[str, Any], path: str, item: Any, service: str) -> None:
+    existing = paths.get(path)
+    if existing is None:
+        paths[path] = item
+        return
+    merged = dict(existing)
+    for key, value in item.items():
+        if key in merged and merged[key] != value:
+            raise MergeConflictError(
+                f"Service {service!r} redefines {key!r} of path {path!r}"
+            )
+        merged[key] = value
+    paths[path] = merged
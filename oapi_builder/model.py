@@ -0,0 +1,446 @@
+"""Compact object model for OpenAPI 3 documents.
+
+Every node class uses ``__slots__`` for the fields that are commonly set and
+keeps anything else (specification extensions and rarely used keywords) in a
+single ``extra`` dict that is only allocated when needed.  Repeated strings
+such as media types, ``type``/``format`` values, parameter locations,
+property names and status codes are interned with :func:`sys.intern` so the
+many copies held by a large document share one object.
+
+Nodes implement ``oapi_items()`` and can be handed straight to the
+serializers in :mod:`oapi_builder.serialize`; :meth:`Node.to_dict` produces
+the plain JSON form used by the document passes.
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any, ClassVar, Dict, FrozenSet, Iterator, Mapping, Optional, Tuple
+
+__all__ = [
+    "Components",
+    "Contact",
+    "Document",
+    "ExternalDocs",
+    "Header",
+    "Info",
+    "License",
+    "MediaType",
+    "Node",
+    "Operation",
+    "Parameter",
+    "PathItem",
+    "Reference",
+    "RequestBody",
+    "Response",
+    "Schema",
+    "SecurityScheme",
+    "Server",
+    "Tag",
+    "HTTP_METHODS",
+    "to_plain",
+]
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def _camel(attr: str) -> str:
+    head, *rest = attr.rstrip("_").split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+def _intern(value: Any) -> Any:
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is list:
+        return [sys.intern(v) if type(v) is str else v for v in value]
+    return value
+
+
+def _intern_keys(value: Any) -> Any:
+    if type(value) is dict:
+        return {
+            (sys.intern(k) if type(k) is str else k): v for k, v in value.items()
+        }
+    return value
+
+
+class Node:
+    """Base class for OpenAPI objects.
+
+    Subclasses list their fields in ``__slots__`` using snake_case names; the
+    serialized key is the camelCase form unless overridden in ``_aliases``.
+    ``_children`` describes which fields hold nested nodes, as a node class,
+    ``("list", cls)`` or ``("map", cls)``, and is used by :meth:`from_dict`.
+    """
+
+    __slots__ = ("extra",)
+
+    _aliases: ClassVar[Dict[str, str]] = {}
+    _children: ClassVar[Dict[str, Any]] = {}
+    _interned_values: ClassVar[FrozenSet[str]] = frozenset()
+    _interned_keys: ClassVar[FrozenSet[str]] = frozenset()
+    # Populated by __init_subclass__.
+    _fields: ClassVar[Tuple[Tuple[str, str], ...]] = ()
+    _attrs: ClassVar[FrozenSet[str]] = frozenset()
+    _attrs_by_key: ClassVar[Dict[str, str]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        attrs = []
+        for klass in reversed(cls.__mro__):
+            for attr in klass.__dict__.get("__slots__", ()):
+                if attr != "extra" and attr not in attrs:
+                    attrs.append(attr)
+        cls._fields = tuple(
+            (attr, sys.intern(cls._aliases.get(attr) or _camel(attr)))
+            for attr in attrs
+        )
+        cls._attrs = frozenset(attrs)
+        cls._attrs_by_key = {key: attr for attr, key in cls._fields}
+
+    def __init__(self, extra: Optional[Mapping[str, Any]] = None, **fields: Any):
+        for attr, _ in self._fields:
+            setattr(self, attr, None)
+        self.extra = dict(extra) if extra else None
+        for name, value in fields.items():
+            self[name] = value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        """Set a field by attribute name or OpenAPI key."""
+        attr = name if name in self._attrs else self._attrs_by_key.get(name)
+        if attr is None:
+            key = name if name.startswith(("x-", "$")) else _camel(name)
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+            return
+        if attr in self._interned_values:
+            value = _intern(value)
+        elif attr in self._interned_keys:
+            value = _intern_keys(value)
+        setattr(self, attr, value)
+
+    def oapi_items(self) -> Iterator[Tuple[str, Any]]:
+        """Yield the ``(key, value)`` pairs of the set fields in spec order."""
+        for attr, key in self._fields:
+            value = getattr(self, attr)
+            if value is not None:
+                yield key, value
+        if self.extra:
+            yield from self.extra.items()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the plain JSON representation of this node."""
+        return {key: to_plain(value) for key, value in self.oapi_items()}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Any:
+        """Build a node tree from its plain JSON representation.
+
+        Mappings containing ``$ref`` become :class:`Reference` objects.  Keys
+        that are not fields of ``cls`` are stored in ``extra`` unchanged.
+        """
+        if "$ref" in data and cls is not Reference:
+            return Reference.from_dict(data)
+        node = cls.__new__(cls)
+        for attr, _ in cls._fields:
+            setattr(node, attr, None)
+        node.extra = None
+        for key, value in data.items():
+            attr = cls._attrs_by_key.get(key)
+            if attr is None:
+                # Unknown keys are kept verbatim so the round trip is lossless.
+                if node.extra is None:
+                    node.extra = {}
+                node.extra[key] = value
+                continue
+            spec = cls._children.get(attr)
+            if spec is not None:
+                value = _convert(spec, value)
+            node[attr] = value
+        return node
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr, _ in self._fields
+        ) and (self.extra or None) == (other.extra or None)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{attr}={getattr(self, attr)!r}"
+            for attr, _ in self._fields
+            if getattr(self, attr) is not None
+        )
+        if self.extra:
+            fields = ", ".join(filter(None, [fields, f"extra={self.extra!r}"]))
+        return f"{type(self).__name__}({fields})"
+
+
+def _convert(spec: Any, value: Any) -> Any:
+    if isinstance(spec, tuple):
+        kind, cls = spec
+        if kind == "list" and isinstance(value, list):
+            return [_convert(cls, item) for item in value]
+        if kind == "map" and isinstance(value, Mapping):
+            return {key: _convert(cls, item) for key, item in value.items()}
+        return value
+    if isinstance(value, Mapping):
+        return spec.from_dict(value)
+    return value
+
+
+def to_plain(node: Any) -> Any:
+    """Convert nodes (and containers holding nodes) to plain JSON values.
+
+    Plain mappings are returned as is when they contain no nodes.
+    """
+    if isinstance(node, Node):
+        return node.to_dict()
+    if isinstance(node, dict):
+        converted = {key: to_plain(value) for key, value in node.items()}
+        if all(converted[key] is value for key, value in node.items()):
+            return node
+        return converted
+    if isinstance(node, (list, tuple)):
+        converted = [to_plain(value) for value in node]
+        if all(a is b for a, b in zip(converted, node)):
+            return node
+        return converted
+    return node
+
+
+class Reference(Node):
+    __slots__ = ("ref",)
+    _aliases = {"ref": "$ref"}
+
+
+class ExternalDocs(Node):
+    __slots__ = ("description", "url")
+
+
+class Contact(Node):
+    __slots__ = ("name", "url", "email")
+
+
+class License(Node):
+    __slots__ = ("name", "url")
+
+
+class Info(Node):
+    __slots__ = (
+        "title",
+        "description",
+        "terms_of_service",
+        "contact",
+        "license",
+        "version",
+    )
+    _children = {"contact": Contact, "license": License}
+
+
+class Server(Node):
+    __slots__ = ("url", "description", "variables")
+
+
+class Tag(Node):
+    __slots__ = ("name", "description", "external_docs")
+    _children = {"external_docs": ExternalDocs}
+
+
+class Schema(Node):
+    """A Schema object.
+
+    Only the most frequently used keywords have slots; the remaining ones
+    (``minimum``, ``pattern``, ``readOnly``, ...) are kept in ``extra`` and
+    can still be passed as keyword arguments, e.g. ``Schema(min_length=1)``.
+    """
+
+    __slots__ = (
+        "title",
+        "type",
+        "format",
+        "description",
+        "enum",
+        "nullable",
+        "required",
+        "properties",
+        "additional_properties",
+        "items",
+        "all_of",
+        "one_of",
+        "any_of",
+    )
+    _interned_values = frozenset(["type", "format", "required"])
+    _interned_keys = frozenset(["properties"])
+
+
+Schema._children = {
+    "properties": ("map", Schema),
+    "additional_properties": Schema,
+    "items": Schema,
+    "all_of": ("list", Schema),
+    "one_of": ("list", Schema),
+    "any_of": ("list", Schema),
+}
+
+
+class MediaType(Node):
+    __slots__ = ("schema", "example", "examples", "encoding")
+    _children = {"schema": Schema}
+
+
+class Header(Node):
+    __slots__ = (
+        "description",
+        "required",
+        "deprecated",
+        "style",
+        "explode",
+        "schema",
+    )
+    _children = {"schema": Schema}
+    _interned_values = frozenset(["style"])
+
+
+class Parameter(Node):
+    __slots__ = (
+        "name",
+        "in_",
+        "description",
+        "required",
+        "deprecated",
+        "style",
+        "explode",
+        "schema",
+        "content",
+    )
+    _children = {"schema": Schema, "content": ("map", MediaType)}
+    _interned_values = frozenset(["name", "in_", "style"])
+    _interned_keys = frozenset(["content"])
+
+
+class RequestBody(Node):
+    __slots__ = ("description", "content", "required")
+    _children = {"content": ("map", MediaType)}
+    _interned_keys = frozenset(["content"])
+
+
+class Response(Node):
+    __slots__ = ("description", "headers", "content", "links")
+    _children = {"headers": ("map", Header), "content": ("map", MediaType)}
+    _interned_keys = frozenset(["headers", "content"])
+
+
+class Operation(Node):
+    __slots__ = (
+        "tags",
+        "summary",
+        "description",
+        "external_docs",
+        "operation_id",
+        "parameters",
+        "request_body",
+        "responses",
+        "callbacks",
+        "deprecated",
+        "security",
+        "servers",
+    )
+    _children = {
+        "external_docs": ExternalDocs,
+        "parameters": ("list", Parameter),
+        "request_body": RequestBody,
+        "responses": ("map", Response),
+        "servers": ("list", Server),
+    }
+    _interned_values = frozenset(["tags"])
+    _interned_keys = frozenset(["responses"])
+
+
+class PathItem(Node):
+    __slots__ = (
+        "summary",
+        "description",
+        *HTTP_METHODS,
+        "servers",
+        "parameters",
+    )
+    _children = {
+        **{method: Operation for method in HTTP_METHODS},
+        "servers": ("list", Server),
+        "parameters": ("list", Parameter),
+    }
+
+    def operations(self) -> Iterator[Tuple[str, Operation]]:
+        """Yield ``(method, operation)`` for every operation that is set."""
+        for method in HTTP_METHODS:
+            operation = getattr(self, method)
+            if operation is not None:
+                yield method, operation
+
+
+class SecurityScheme(Node):
+    __slots__ = (
+        "type",
+        "description",
+        "name",
+        "in_",
+        "scheme",
+        "bearer_format",
+        "flows",
+        "open_id_connect_url",
+    )
+    _interned_values = frozenset(["type", "in_", "scheme"])
+
+
+class Components(Node):
+    __slots__ = (
+        "schemas",
+        "responses",
+        "parameters",
+        "examples",
+        "request_bodies",
+        "headers",
+        "security_schemes",
+        "links",
+        "callbacks",
+    )
+    _children = {
+        "schemas": ("map", Schema),
+        "responses": ("map", Response),
+        "parameters": ("map", Parameter),
+        "request_bodies": ("map", RequestBody),
+        "headers": ("map", Header),
+        "security_schemes": ("map", SecurityScheme),
+    }
+
+
+class Document(Node):
+    __slots__ = (
+        "openapi",
+        "info",
+        "servers",
+        "paths",
+        "components",
+        "security",
+        "tags",
+        "external_docs",
+    )
+    _children = {
+        "info": Info,
+        "servers": ("list", Server),
+        "paths": ("map", PathItem),
+        "components": Components,
+        "tags": ("list", Tag),
+        "external_docs": ExternalDocs,
+    }
+
+    def __init__(
+        self, extra: Optional[Mapping[str, Any]] = None, **fields: Any
+    ) -> None:
+        fields.setdefault("openapi", "3.0.3")
+        super().__init__(extra, **fields)
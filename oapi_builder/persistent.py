@@ -0,0 +1,342 @@
+"""Copy-on-write variants of plain documents.
+
+Publishing filtered views of one master spec (public-only, per tenant,
+internal fields stripped) used to mean deep-copying the master for every
+view and deleting from the copy.  The functions here treat documents as
+persistent values instead: they never modify their input, and the result
+shares every subtree the change did not touch with the original.  Only the
+containers on the way from the root to a change are copied, so a view that
+drops a few operations costs a few small dicts rather than a full copy, and
+forty views of one master take little more memory than the master itself.
+
+Because subtrees are shared, neither the master nor its variants may be
+mutated in place afterwards; derive further variants with :func:`assoc`,
+:func:`dissoc` or :func:`prune` instead.  An object that occurs several
+times in the input (one schema dict used by many operations, say) is
+rewritten once and stays shared in the output.  Nodes met in the input are
+converted to plain dicts, which copies them; convert a node master once with
+:func:`~oapi_builder.model.to_plain` and derive every view from the result.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from oapi_builder.errors import RefResolutionError
+from oapi_builder.graph import ReferenceGraph
+from oapi_builder.model import HTTP_METHODS, Node, to_plain
+
+__all__ = [
+    "assoc",
+    "dissoc",
+    "filter_operations",
+    "prune",
+    "public_view",
+    "strip_extensions",
+    "tenant_view",
+]
+
+Location = Tuple[Any, ...]
+
+_MISSING = object()
+_DROPPED = object()
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+def assoc(doc: Any, location: Location, value: Any) -> Any:
+    """Return ``doc`` with ``value`` stored at ``location``.
+
+    Missing intermediate mappings are created.  ``doc`` itself is returned
+    when the location already holds ``value``.
+    """
+    if not location:
+        return value
+    key, rest = location[0], location[1:]
+    if isinstance(doc, list):
+        child = doc[key]
+    else:
+        child = doc.get(key, _MISSING)
+        if child is _MISSING:
+            child = {} if rest else None
+    new = assoc(child, rest, value)
+    if new is child and (rest or key in doc):
+        return doc
+    copy = list(doc) if isinstance(doc, list) else dict(doc)
+    copy[key] = new
+    return copy
+
+
+def dissoc(doc: Any, location: Location) -> Any:
+    """Return ``doc`` without the entry at ``location``.
+
+    ``doc`` itself is returned when there is nothing at ``location``.
+    """
+    if not location:
+        raise ValueError("Cannot remove the document root")
+    key, rest = location[0], location[1:]
+    try:
+        child = doc[key]
+    except (KeyError, IndexError, TypeError):
+        return doc
+    if rest:
+        new = dissoc(child, rest)
+        if new is child:
+            return doc
+    copy = list(doc) if isinstance(doc, list) else dict(doc)
+    if rest:
+        copy[key] = new
+    else:
+        del copy[key]
+    return copy
+
+
+class _Pruner:
+    """Rewrites a document bottom-up, reusing every unchanged container."""
+
+    __slots__ = ("drop", "drop_key", "memo")
+
+    def __init__(
+        self,
+        drop: Optional[Callable[[Mapping[str, Any]], bool]],
+        drop_key: Optional[Callable[[Any], bool]],
+    ):
+        self.drop = drop
+        self.drop_key = drop_key
+        # id(input container) -> rewritten container; inputs outlive the
+        # pruner, so ids are stable.
+        self.memo: Dict[int, Any] = {}
+
+    def rewrite(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is dict:
+            rewrite = self._mapping
+        elif kind is list:
+            rewrite = self._list
+        elif kind in _SCALAR_TYPES:
+            return value
+        elif isinstance(value, Node):
+            # Not memoized: the converted dict may be freed and its id reused.
+            return self._mapping(value.to_dict())
+        elif isinstance(value, Mapping):
+            rewrite = self._mapping
+        elif isinstance(value, list):
+            rewrite = self._list
+        else:
+            return value
+        result = self.memo.get(id(value), _MISSING)
+        if result is _MISSING:
+            result = self.memo[id(value)] = rewrite(value)
+        return result
+
+    def _child(self, child: Any) -> Any:
+        drop = self.drop
+        if drop is not None:
+            if type(child) is not dict and isinstance(child, Node):
+                child = child.to_dict()
+                return _DROPPED if drop(child) else self._mapping(child)
+            if isinstance(child, Mapping) and drop(child):
+                return _DROPPED
+        return self.rewrite(child)
+
+    def _mapping(self, value: Mapping[str, Any]) -> Any:
+        drop_key = self.drop_key
+        out: Optional[Dict[str, Any]] = None
+        for key, child in value.items():
+            new = _DROPPED if drop_key is not None and drop_key(key) else None
+            if new is None:
+                new = self._child(child)
+                if new is child:
+                    if out is not None:
+                        out[key] = child
+                    continue
+            if out is None:
+                out = {}
+                for seen, kept in value.items():
+                    if seen == key:
+                        break
+                    out[seen] = kept
+            if new is not _DROPPED:
+                out[key] = new
+        if out is None:
+            return value
+        properties = out.get("properties")
+        required = out.get("required")
+        if (
+            properties is not value.get("properties")
+            and isinstance(properties, Mapping)
+            and isinstance(required, list)
+        ):
+            # Removed properties cannot stay required.
+            out["required"] = [name for name in required if name in properties]
+        return out
+
+    def _list(self, value: list) -> Any:
+        out: Optional[list] = None
+        for idx, child in enumerate(value):
+            new = self._child(child)
+            if new is child:
+                if out is not None:
+                    out.append(child)
+                continue
+            if out is None:
+                out = value[:idx]
+            if new is not _DROPPED:
+                out.append(new)
+        return value if out is None else out
+
+
+def _without_emptied_paths(doc: Any, original: Any) -> Any:
+    """Remove path items that lost all their operations."""
+    paths = doc.get("paths") if isinstance(doc, Mapping) else None
+    before = original.get("paths") if isinstance(original, Mapping) else None
+    if not isinstance(paths, Mapping) or paths is before:
+        return doc
+    if not isinstance(before, Mapping):
+        before = {}
+    kept = {
+        path: item
+        for path, item in paths.items()
+        if item is before.get(path)
+        or not isinstance(item, Mapping)
+        or any(method in item for method in HTTP_METHODS)
+    }
+    if len(kept) == len(paths):
+        return doc
+    return assoc(doc, ("paths",), kept)
+
+
+def prune(
+    doc: Any,
+    drop: Optional[Callable[[Mapping[str, Any]], bool]] = None,
+    drop_key: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """Return ``doc`` without the entries the predicates select.
+
+    ``drop(value)`` is called for every mapping nested in ``doc`` (as a
+    mapping value or a list item) and removes it when true; ``drop_key(key)``
+    is called for every mapping key and removes that entry.  Names of removed
+    properties are also removed from the enclosing schema's ``required``.
+    Path items left without operations are removed.
+    """
+    pruned = _Pruner(drop, drop_key).rewrite(doc)
+    return _without_emptied_paths(pruned, doc)
+
+
+def filter_operations(
+    doc: Any, keep: Callable[[str, str, Mapping[str, Any]], bool]
+) -> Any:
+    """Return ``doc`` with only the operations ``keep`` accepts.
+
+    ``keep(path, method, operation)`` is called once per operation; path
+    items left without operations are removed.
+    """
+    doc = to_plain(doc)
+    paths = doc.get("paths")
+    if not isinstance(paths, Mapping):
+        return doc
+    kept: Dict[str, Any] = {}
+    for path, item in paths.items():
+        if not isinstance(item, Mapping):
+            kept[path] = item
+            continue
+        methods = [method for method in HTTP_METHODS if method in item]
+        dropped = [
+            method
+            for method in methods
+            if isinstance(item[method], Mapping)
+            and not keep(path, method, item[method])
+        ]
+        if not dropped:
+            kept[path] = item
+        elif len(dropped) < len(methods):
+            kept[path] = {
+                key: value for key, value in item.items() if key not in dropped
+            }
+    if len(kept) == len(paths) and all(
+        kept[path] is item for path, item in paths.items()
+    ):
+        return doc
+    return assoc(doc, ("paths",), kept)
+
+
+def strip_extensions(doc: Any, names: Optional[Iterable[str]] = None) -> Any:
+    """Remove specification extensions: every ``x-`` key, or only ``names``."""
+    if names is None:
+        return prune(doc, drop_key=_is_extension)
+    return prune(doc, drop_key=frozenset(names).__contains__)
+
+
+def _is_extension(key: Any) -> bool:
+    return type(key) is str and key.startswith("x-")
+
+
+def _without_orphans(view: Any, original: Any) -> Any:
+    """Drop the components only removed content used; refuse dangling refs."""
+    if view is original or not isinstance(view, Mapping):
+        return view
+    before = ReferenceGraph(original)
+    after = ReferenceGraph(view)
+    used = after.reachable()
+    sources = [after.roots, *after.operations.values()]
+    sources.extend(after.edges[key] for key in used)
+    dangling = sorted(
+        {
+            f"{kind}/{name}"
+            for targets in sources
+            for kind, name in targets
+            if (kind, name) in before.edges and (kind, name) not in after.edges
+        }
+    )
+    if dangling:
+        raise RefResolutionError(
+            f"The view still refers to removed components: {', '.join(dangling)}",
+            ref=dangling[0],
+        )
+    orphaned = {
+        key for key in before.reachable() if key in after.edges and key not in used
+    }
+    for kind in sorted({kind for kind, _ in orphaned}):
+        entries = view["components"][kind]
+        kept = {
+            name: value
+            for name, value in entries.items()
+            if (kind, name) not in orphaned
+        }
+        if kept:
+            view = assoc(view, ("components", kind), kept)
+        else:
+            view = dissoc(view, ("components", kind))
+    return view
+
+
+def public_view(doc: Any, marker: str = "x-internal") -> Any:
+    """Drop everything flagged with a truthy ``marker`` extension.
+
+    Operations, path items, parameters, properties, components and tags
+    carrying ``marker`` are removed, and the marker itself is stripped from
+    what remains.  Components that only removed content used are removed as
+    well.  Raises :class:`~oapi_builder.errors.RefResolutionError` if what
+    remains still refers to a removed component.
+    """
+    pruned = prune(
+        doc,
+        drop=lambda value: bool(value.get(marker)),
+        drop_key=lambda key: key == marker,
+    )
+    return _without_orphans(pruned, doc)
+
+
+def tenant_view(doc: Any, tenant: str, key: str = "x-tenants") -> Any:
+    """Keep only what is visible to ``tenant``.
+
+    Anything carrying a ``key`` extension that lists tenants but not
+    ``tenant`` is removed; entries without the extension are visible to
+    everyone.  The extension itself is stripped from the result.  Components
+    are handled as in :func:`public_view`.
+    """
+
+    def hidden(value: Mapping[str, Any]) -> bool:
+        tenants = value.get(key)
+        return isinstance(tenants, list) and tenant not in tenants
+
+    pruned = prune(doc, drop=hidden, drop_key=lambda name: name == key)
+    return _without_orphans(pruned, doc)
@@ -0,0 +1,66 @@
+"""JSON Pointer (RFC 6901) and ``$ref`` helpers."""
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Mapping, Tuple
+from urllib.parse import unquote, urldefrag, urljoin
+
+from oapi_builder.errors import RefResolutionError
+
+__all__ = [
+    "escape_token",
+    "join_pointer",
+    "resolve_pointer",
+    "split_pointer",
+    "split_ref",
+    "unescape_token",
+]
+
+
+def escape_token(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def unescape_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def join_pointer(parts: Iterable[Any]) -> str:
+    """Build a JSON pointer from its reference tokens."""
+    return "".join("/" + escape_token(part) for part in parts)
+
+
+def split_pointer(pointer: str) -> List[str]:
+    """Split a JSON pointer into its unescaped reference tokens."""
+    if not pointer:
+        return []
+    if not pointer.startswith("/"):
+        raise RefResolutionError(f"Invalid JSON pointer {pointer!r}", pointer)
+    return [unescape_token(token) for token in pointer[1:].split("/")]
+
+
+def split_ref(ref: str, base_uri: str = "") -> Tuple[str, str]:
+    """Split ``ref`` into an absolute document URI and a JSON pointer."""
+    uri, fragment = urldefrag(ref)
+    if uri:
+        uri = urljoin(base_uri, uri) if base_uri else uri
+    else:
+        uri = base_uri
+    return uri, unquote(fragment)
+
+
+def resolve_pointer(doc: Any, pointer: str) -> Any:
+    """Return the value ``pointer`` designates inside ``doc``."""
+    node = doc
+    for token in split_pointer(pointer):
+        try:
+            if isinstance(node, Mapping):
+                node = node[token]
+            elif isinstance(node, list):
+                node = node[int(token)]
+            else:
+                raise KeyError(token)
+        except (KeyError, IndexError, ValueError):
+            raise RefResolutionError(
+                f"Unresolvable JSON pointer {pointer!r}", pointer
+            ) from None
+    return node
@@ -0,0 +1,263 @@
+"""Per-phase timing and allocation reports for builds.
+
+The library's passes are instrumented with :func:`phase` spans: schema
+generation (per model), reference resolution (per target), dedupe,
+validation (per compiled validator) and serialization.  The spans cost one
+context-variable lookup while no profiler is active.  To collect them, run
+the build under :func:`profile`::
+
+    with profile(trace_allocations=True) as profiler:
+        doc = build_spec()
+        dump_json(doc, fp)
+    print(profiler.summary())
+    report = profiler.report()  # or profiler.report_json()
+
+Wall times are inclusive; ``self_ms`` excludes time spent in nested spans,
+so the self times of all spans add up to the instrumented total.  With
+``trace_allocations`` :mod:`tracemalloc` is enabled for the duration and
+each span records the net memory it left allocated, which slows the build
+down noticeably.
+
+The profiler and the stack of open spans live in :mod:`contextvars`.  Work
+in threads or tasks that do not inherit the profiling context (a plain
+:class:`threading.Thread`, a build started elsewhere) is not recorded;
+tasks created inside the ``with`` block and work offloaded through
+:mod:`oapi_builder.aio` inherit it and are.  Each such task keeps its own
+span stack, nested under the span that was open when it started, so
+concurrent tasks never pop each other's spans.  When sibling tasks overlap,
+their time is counted once per task, so self times then add up to more
+than the elapsed wall time.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+__all__ = [
+    "PHASES",
+    "PhaseStats",
+    "Profiler",
+    "phase",
+    "profile",
+]
+
+PHASES = (
+    "schema_generation",
+    "ref_resolution",
+    "dedupe",
+    "validation",
+    "serialization",
+)
+
+_ACTIVE: contextvars.ContextVar[Optional["Profiler"]] = contextvars.ContextVar(
+    "oapi_builder_profiler", default=None
+)
+_STACK: contextvars.ContextVar[Tuple["_Span", ...]] = contextvars.ContextVar(
+    "oapi_builder_spans", default=()
+)
+
+
+class PhaseStats:
+    """Accumulated measurements of one phase or one component of a phase."""
+
+    __slots__ = ("calls", "wall", "self_wall", "allocated")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall = 0.0
+        self.self_wall = 0.0
+        self.allocated = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "wall_ms": round(self.wall * 1000, 3),
+            "self_ms": round(self.self_wall * 1000, 3),
+            "allocated_bytes": self.allocated,
+        }
+
+
+class _Span:
+    __slots__ = (
+        "profiler",
+        "name",
+        "component",
+        "start",
+        "memory",
+        "child",
+        "outer",
+        "token",
+    )
+
+    def __init__(self, profiler: "Profiler", name: str, component: Optional[str]):
+        self.profiler = profiler
+        self.name = name
+        self.component = component
+
+    def __enter__(self) -> "_Span":
+        stack = _STACK.get()
+        # Only the outermost span of a phase counts towards its wall time.
+        self.outer = all(span.name != self.name for span in stack)
+        self.token = _STACK.set(stack + (self,))
+        self.child = 0.0
+        self.memory = self.profiler._memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        allocated = max(profiler._memory() - self.memory, 0)
+        _STACK.reset(self.token)
+        stack = _STACK.get()
+        if stack:
+            stack[-1].child += elapsed
+        own = elapsed - self.child
+        for stats, inclusive in profiler._targets(self):
+            stats.calls += 1
+            stats.self_wall += own
+            if inclusive:
+                stats.wall += elapsed
+                stats.allocated += allocated
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def phase(name: str, component: Optional[str] = None) -> Any:
+    """A context manager measuring one span of phase ``name``.
+
+    ``component`` names the model, operation or reference the span works
+    on.  Does nothing unless a :class:`Profiler` is active.
+    """
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        return _NO_SPAN
+    return _Span(profiler, name, component)
+
+
+class Profiler:
+    """Collects :func:`phase` spans while active; see :func:`profile`."""
+
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        self.phases: Dict[str, PhaseStats] = {}
+        self.components: Dict[Tuple[str, str], PhaseStats] = {}
+        self.wall = 0.0
+
+    def _memory(self) -> int:
+        if not self.trace_allocations:
+            return 0
+        return tracemalloc.get_traced_memory()[0]
+
+    def _targets(self, span: _Span) -> Iterator[Tuple[PhaseStats, bool]]:
+        stats = self.phases.get(span.name)
+        if stats is None:
+            stats = self.phases[span.name] = PhaseStats()
+        yield stats, span.outer
+        if span.component is not None:
+            key = (span.name, span.component)
+            stats = self.components.get(key)
+            if stats is None:
+                stats = self.components[key] = PhaseStats()
+            yield stats, True
+
+    def report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Return the measurements as plain data.
+
+        Components are sorted by self time, slowest first; ``top`` keeps only
+        the slowest ones.
+        """
+        ranked = sorted(
+            self.components.items(), key=lambda item: item[1].self_wall, reverse=True
+        )
+        if top is not None:
+            ranked = ranked[:top]
+        return {
+            "wall_ms": round(self.wall * 1000, 3),
+            "allocations_traced": self.trace_allocations,
+            "phases": {
+                name: stats.to_dict()
+                for name, stats in sorted(
+                    self.phases.items(), key=lambda item: _phase_order(item[0])
+                )
+            },
+            "components": [
+                {"phase": name, "component": component, **stats.to_dict()}
+                for (name, component), stats in ranked
+            ],
+        }
+
+    def report_json(self, indent: Optional[int] = 2, top: Optional[int] = None) -> str:
+        return json.dumps(self.report(top), indent=indent)
+
+    def summary(self, top: int = 10) -> str:
+        """Return a human-readable table of phases and the slowest components."""
+        lines = [f"Profiled {self.wall * 1000:.1f} ms"]
+        header = f"{'phase':<20} {'calls':>8} {'wall ms':>10} {'self ms':>10}"
+        if self.trace_allocations:
+            header += f" {'alloc KiB':>10}"
+        lines.append(header)
+        report = self.report(top)
+        for name, stats in report["phases"].items():
+            lines.append(_summary_row(name, stats, self.trace_allocations, 20))
+        if report["components"]:
+            lines.append("")
+            lines.append(f"Slowest components (by self time, top {top}):")
+            for entry in report["components"]:
+                label = f"{entry['phase']}: {entry['component']}"
+                lines.append(_summary_row(label, entry, self.trace_allocations, 48))
+        return "\n".join(lines)
+
+
+def _phase_order(name: str) -> Tuple[int, str]:
+    return (PHASES.index(name) if name in PHASES else len(PHASES), name)
+
+
+def _summary_row(
+    label: str, stats: Dict[str, Any], allocations: bool, width: int
+) -> str:
+    if len(label) > width:
+        label = label[: width - 3] + "..."
+    row = (
+        f"{label:<{width}} {stats['calls']:>8} "
+        f"{stats['wall_ms']:>10.2f} {stats['self_ms']:>10.2f}"
+    )
+    if allocations:
+        row += f" {stats['allocated_bytes'] / 1024:>10.1f}"
+    return row
+
+
+@contextlib.contextmanager
+def profile(trace_allocations: bool = False) -> Iterator[Profiler]:
+    """Profile the instrumented work done inside the ``with`` block."""
+    profiler = Profiler(trace_allocations)
+    started_tracing = trace_allocations and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _ACTIVE.set(profiler)
+    # Spans of an enclosing profiler are not parents of this one's.
+    stack_token = _STACK.set(())
+    start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        profiler.wall += time.perf_counter() - start
+        _STACK.reset(stack_token)
+        _ACTIVE.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,279 @@
+"""Memoized, cycle-aware ``$ref`` resolution.
+
+:class:`RefResolver` keeps two caches keyed by ``(document URI, JSON
+pointer)``:
+
+* the raw value a pointer designates (:meth:`RefResolver.lookup`), and
+* the fully dereferenced form of that value (:meth:`RefResolver.dereference`).
+
+Each target is dereferenced at most once, so recursive and heavily shared
+schemas cost time proportional to the number of distinct targets rather than
+the number of paths through the reference graph.  Dependencies between
+cached entries are recorded, which lets :meth:`RefResolver.invalidate` drop
+exactly the entries affected by an edit.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from oapi_builder.errors import RefCycleError, RefResolutionError
+from oapi_builder.model import to_plain
+from oapi_builder.pointer import resolve_pointer, split_ref
+from oapi_builder.profiling import phase
+
+__all__ = ["RefResolver", "load_document"]
+
+Key = Tuple[str, str]
+
+
+def load_document(uri: str) -> Any:
+    """Load a JSON or YAML document from a local path or ``file://`` URI.
+
+    YAML support requires PyYAML.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme not in ("", "file") and len(parsed.scheme) > 1:
+        raise RefResolutionError(f"Cannot load remote document {uri!r}", uri)
+    path = unquote(parsed.path) if parsed.scheme == "file" else uri
+    with open(path, "rb") as fp:
+        data = fp.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:  # pragma: no cover - depends on the environment
+            raise RefResolutionError(
+                f"PyYAML is required to load {uri!r}", uri
+            ) from None
+        return yaml.safe_load(data)
+    return json.loads(data)
+
+
+class RefResolver:
+    """Resolve ``$ref``s against a root document and any documents it links.
+
+    :param root: the document that relative references start from.
+    :param base_uri: the URI of ``root``; external references are resolved
+        relative to it.
+    :param loader: callable returning the parsed document for a URI, used
+        for documents that were not registered with :meth:`add_document`.
+    """
+
+    def __init__(
+        self,
+        root: Any = None,
+        base_uri: str = "",
+        loader: Optional[Callable[[str], Any]] = load_document,
+    ):
+        self.base_uri = base_uri
+        self._loader = loader
+        self._documents: Dict[str, Any] = {}
+        self._lookups: Dict[Key, Any] = {}
+        self._derefs: Dict[Key, Any] = {}
+        # target -> every target its dereferenced form embeds, transitively
+        self._embeds: Dict[Key, FrozenSet[Key]] = {}
+        # targets whose dereferenced form keeps a cycle-closing reference
+        self._cycles: Dict[Key, Tuple[Key, ...]] = {}
+        self._loaded: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if root is not None:
+            self.add_document(base_uri, root)
+
+    def add_document(self, uri: str, doc: Any) -> None:
+        """Register (or replace) the document at ``uri``."""
+        self._loaded.discard(uri)
+        self.invalidate(uri)
+        self._documents[uri] = to_plain(doc)
+
+    def document(self, uri: str) -> Any:
+        """Return the document at ``uri``, loading it if necessary."""
+        try:
+            return self._documents[uri]
+        except KeyError:
+            pass
+        if self._loader is None:
+            raise RefResolutionError(f"Unknown document {uri!r}", uri)
+        try:
+            doc = self._loader(uri)
+        except (OSError, ValueError) as err:
+            raise RefResolutionError(f"Cannot load {uri!r}: {err}", uri) from err
+        self._documents[uri] = doc
+        self._loaded.add(uri)
+        return doc
+
+    def lookup(self, uri: str, pointer: str) -> Any:
+        """Return the raw value at ``pointer`` inside the document at ``uri``."""
+        key = (uri, pointer)
+        try:
+            value = self._lookups[key]
+        except KeyError:
+            self.misses += 1
+            value = self._lookups[key] = resolve_pointer(self.document(uri), pointer)
+        else:
+            self.hits += 1
+        return value
+
+    def resolve(self, ref: str, base_uri: Optional[str] = None) -> Tuple[str, Any]:
+        """Follow ``ref`` (and any chain of bare references) to its target.
+
+        Returns the URI of the document the target lives in and the target
+        itself; nested references inside the target are left untouched.
+        Raises :class:`RefCycleError` if the chain loops.
+        """
+        uri = self.base_uri if base_uri is None else base_uri
+        seen: Dict[Key, None] = {}
+        while True:
+            key = split_ref(ref, uri)
+            if key in seen:
+                raise RefCycleError([*seen, key][list(seen).index(key) :])
+            seen[key] = None
+            uri = key[0]
+            target = self.lookup(*key)
+            if not isinstance(target, Mapping) or not isinstance(
+                target.get("$ref"), str
+            ):
+                return uri, target
+            ref = target["$ref"]
+
+    def dereference(
+        self, node: Any, base_uri: Optional[str] = None, on_cycle: str = "ref"
+    ) -> Any:
+        """Return ``node`` with every ``$ref`` replaced by its target.
+
+        Recursive references cannot be inlined; with ``on_cycle="ref"`` the
+        reference closing the loop is kept (made absolute when it points into
+        another document), with ``on_cycle="error"`` a :class:`RefCycleError`
+        is raised instead.  A loop made only of bare references (``A`` is
+        ``{"$ref": B}`` and ``B`` is ``{"$ref": A}``) designates no value at
+        all and raises :class:`RefCycleError` in both modes.  Dereferenced
+        targets are shared, not copied, so the result must be treated as
+        read-only.
+        """
+        if on_cycle not in ("ref", "error"):
+            raise ValueError("on_cycle must be 'ref' or 'error'")
+        uri = self.base_uri if base_uri is None else base_uri
+        with phase("ref_resolution"):
+            return self._deref(to_plain(node), uri, {}, on_cycle)
+
+    def dereference_ref(
+        self, ref: str, base_uri: Optional[str] = None, on_cycle: str = "ref"
+    ) -> Any:
+        """Shorthand for dereferencing ``{"$ref": ref}``."""
+        return self.dereference({"$ref": ref}, base_uri, on_cycle)
+
+    def _deref(
+        self, node: Any, uri: str, stack: Dict[Key, Set[Key]], on_cycle: str
+    ) -> Any:
+        if isinstance(node, Mapping):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self._deref_ref(ref, uri, stack, on_cycle)
+            return {
+                key: self._deref(value, uri, stack, on_cycle)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [self._deref(value, uri, stack, on_cycle) for value in node]
+        return node
+
+    def _deref_ref(
+        self, ref: str, uri: str, stack: Dict[Key, Set[Key]], on_cycle: str
+    ) -> Any:
+        # ``stack`` maps each target being built to the set of targets its
+        # dereferenced form embeds so far; the innermost one is last.
+        key = split_ref(ref, uri)
+        frame = next(reversed(stack.values())) if stack else None
+        if key in self._derefs:
+            self.hits += 1
+            if on_cycle == "error" and key in self._cycles:
+                raise RefCycleError(self._cycles[key])
+            if frame is not None:
+                frame.add(key)
+                frame.update(self._embeds[key])
+            return self._derefs[key]
+        if key in stack:
+            cycle = [*stack, key][list(stack).index(key) :]
+            if on_cycle == "error" or all(
+                self._is_bare_ref(self.lookup(*pending)) for pending in cycle
+            ):
+                # A loop of bare references has no value to keep a ref to.
+                raise RefCycleError(cycle)
+            for pending in list(stack)[list(stack).index(key) :]:
+                self._cycles.setdefault(pending, tuple(cycle))
+            if frame is not None:
+                frame.add(key)
+            prefix = "" if key[0] == self.base_uri else key[0]
+            return {"$ref": f"{prefix}#{key[1]}"}
+        self.misses += 1
+        embeds: Set[Key] = set()
+        stack[key] = embeds
+        try:
+            with phase("ref_resolution", f"{key[0]}#{key[1]}"):
+                value = self._deref(self.lookup(*key), key[0], stack, on_cycle)
+        finally:
+            del stack[key]
+        self._derefs[key] = value
+        self._embeds[key] = frozenset(embeds)
+        if key not in self._cycles:
+            for embedded in embeds:
+                if embedded in self._cycles:
+                    self._cycles[key] = self._cycles[embedded]
+                    break
+        if frame is not None:
+            frame.add(key)
+            frame.update(embeds)
+        return value
+
+    @staticmethod
+    def _is_bare_ref(value: Any) -> bool:
+        return isinstance(value, Mapping) and isinstance(value.get("$ref"), str)
+
+    def invalidate(
+        self, uri: Optional[str] = None, pointer: Optional[str] = None
+    ) -> None:
+        """Drop cached results.
+
+        With no arguments everything is cleared.  With ``uri`` only the
+        entries for that document are dropped (and a document that was loaded
+        on demand is re-read on next use); adding ``pointer`` narrows this to
+        entries that contain or are contained in that location.  Cached
+        dereferenced values that embed a dropped entry are dropped as well.
+        """
+        if uri is None:
+            for loaded in self._loaded:
+                self._documents.pop(loaded, None)
+            self._loaded.clear()
+            self._lookups.clear()
+            self._derefs.clear()
+            self._embeds.clear()
+            self._cycles.clear()
+            return
+        if pointer is None and uri in self._loaded:
+            self._loaded.discard(uri)
+            self._documents.pop(uri, None)
+
+        def overlaps(key: Key) -> bool:
+            if key[0] != uri:
+                return False
+            if pointer is None:
+                return True
+            other = key[1]
+            return (
+                other == pointer
+                or other.startswith(pointer + "/")
+                or pointer.startswith(other + "/")
+            )
+
+        for key in [key for key in self._lookups if overlaps(key)]:
+            del self._lookups[key]
+        stale = {key for key in self._derefs if overlaps(key)}
+        stale.update(
+            key for key, embeds in self._embeds.items() if not stale.isdisjoint(embeds)
+        )
+        for key in stale:
+            self._derefs.pop(key, None)
+            self._embeds.pop(key, None)
+            self._cycles.pop(key, None)
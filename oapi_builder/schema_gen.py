@@ -0,0 +1,367 @@
+"""Generate Schema objects from Python type annotations.
+
+:class:`SchemaGenerator` understands builtin scalars, ``datetime``/``UUID``/
+``Decimal``, containers and ``typing`` constructs (``Optional``, ``Union``,
+``Literal``, ``Annotated``, ``NewType``, ...) as well as named model types:
+dataclasses, attrs classes, ``TypedDict``, ``NamedTuple`` and ``Enum``.
+Named types become entries of :attr:`SchemaGenerator.components` and are
+referenced with ``$ref``; parameterized generic models such as ``Page[Item]``
+get their own component.
+
+Every type is analysed exactly once per generator: ``get_type_hints`` runs
+once per model class and the schema of any annotation (``List[Item]``,
+``Optional[Dict[str, int]]``, ...) is memoized, so models referenced from
+thousands of operations cost nothing after the first reference.  Returned
+schemas are shared between callers and must be treated as read-only.
+
+With a :class:`~oapi_builder.cache.BuildCache`, the schema of a model passed
+to :meth:`SchemaGenerator.schema_for` is stored together with the components
+generated for it, keyed by the fingerprint of the model (which covers the
+models it refers to), so later builds restore them without analysing the
+types again.
+"""
+from __future__ import annotations
+
+import collections.abc
+import dataclasses
+import datetime
+import decimal
+import enum
+import re
+import types
+import typing
+import uuid
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+try:
+    import attr
+except ImportError:  # pragma: no cover - depends on the environment
+    attr = None
+
+from oapi_builder.cache import BuildCache
+from oapi_builder.dedupe import SCHEMA_REF_PREFIX
+from oapi_builder.profiling import phase
+
+__all__ = ["SchemaGenerator"]
+
+_SCALARS: Dict[Any, Dict[str, Any]] = {
+    bool: {"type": "boolean"},
+    int: {"type": "integer"},
+    float: {"type": "number"},
+    str: {"type": "string"},
+    bytes: {"type": "string", "format": "byte"},
+    decimal.Decimal: {"type": "number"},
+    datetime.datetime: {"type": "string", "format": "date-time"},
+    datetime.date: {"type": "string", "format": "date"},
+    datetime.time: {"type": "string", "format": "time"},
+    datetime.timedelta: {"type": "string", "format": "duration"},
+    uuid.UUID: {"type": "string", "format": "uuid"},
+}
+_NONE_TYPE = type(None)
+_UNION_TYPES = (typing.Union, getattr(types, "UnionType", typing.Union))
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+TypeVarMap = Tuple[Tuple[Any, Any], ...]
+
+
+def _is_typeddict(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(
+        tp, "__total__"
+    )
+
+
+def _is_namedtuple(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, tuple) and hasattr(tp, "_fields")
+
+
+def _is_attrs(tp: Any) -> bool:
+    return attr is not None and isinstance(tp, type) and attr.has(tp)
+
+
+def _is_model(tp: Any) -> bool:
+    return isinstance(tp, type) and (
+        dataclasses.is_dataclass(tp)
+        or _is_attrs(tp)
+        or _is_typeddict(tp)
+        or _is_namedtuple(tp)
+        or issubclass(tp, enum.Enum)
+    )
+
+
+def _type_name(tp: Any) -> str:
+    origin = typing.get_origin(tp)
+    if origin is not None:
+        args = "_".join(_type_name(arg) for arg in typing.get_args(tp))
+        return f"{_type_name(origin)}_{args}" if args else _type_name(origin)
+    if tp is _NONE_TYPE:
+        return "None"
+    return getattr(tp, "__name__", None) or str(tp)
+
+
+def _extend(schema: Dict[str, Any], keywords: Mapping[str, Any]) -> Dict[str, Any]:
+    # Siblings of ``$ref`` are ignored in OpenAPI 3.0, so wrap references.
+    if "$ref" in schema:
+        return {"allOf": [schema], **keywords}
+    return {**schema, **keywords}
+
+
+class SchemaGenerator:
+    """Builds and memoizes schemas for Python types.
+
+    :param ref_prefix: prefix for references to generated components.
+    :param name_for: returns the preferred component name of a model type;
+        clashes between different types get a numeric suffix.
+    :param cache: optional persistent cache for the schemas of models passed
+        to :meth:`schema_for` and the components generated along with them.
+    """
+
+    def __init__(
+        self,
+        ref_prefix: str = SCHEMA_REF_PREFIX,
+        name_for: Callable[[Any], str] = _type_name,
+        cache: Optional[BuildCache] = None,
+    ):
+        self.ref_prefix = ref_prefix
+        self.name_for = name_for
+        self.cache = cache
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[Any, str] = {}
+        # Component names of types restored from the cache, by ``repr``.
+        self._restored: Dict[str, str] = {}
+        self._memo: Dict[Any, Dict[str, Any]] = {}
+        self.analysed = 0
+
+    def schema_for(self, tp: Any) -> Dict[str, Any]:
+        """Return the schema of ``tp``; model types come back as ``$ref``s."""
+        with phase("schema_generation"):
+            if self.cache is not None and (
+                _is_model(tp) or _is_model(typing.get_origin(tp))
+            ):
+                return self._cached_schema(tp)
+            return self._schema(tp, ())
+
+    def component_name(self, tp: Any) -> str:
+        """Return the component name of model type ``tp``, generating it."""
+        self.schema_for(tp)
+        return self._names[tp]
+
+    def _cached_schema(self, tp: Any) -> Dict[str, Any]:
+        try:
+            return self._memo[tp]
+        except (KeyError, TypeError):
+            pass
+        built = []
+
+        def build() -> Dict[str, Any]:
+            start = len(self.components)
+            schema = self._schema(tp, ())
+            added = list(self.components)[start:]
+            built.append(schema)
+            return {
+                "schema": schema,
+                "components": {name: self.components[name] for name in added},
+                "names": {
+                    repr(key): name
+                    for key, name in self._names.items()
+                    if name in added
+                },
+            }
+
+        # Component names depend on the names already taken.
+        naming = getattr(self.name_for, "__qualname__", type(self.name_for).__name__)
+        entry = self.cache.get_or_build(
+            tp, build, self.ref_prefix, naming, sorted(self.components)
+        )
+        if built:
+            return built[0]
+        self.components.update(entry["components"])
+        self._restored.update(entry["names"])
+        schema = self._memo[tp] = entry["schema"]
+        return schema
+
+    def _schema(self, tp: Any, typevars: TypeVarMap) -> Dict[str, Any]:
+        key = (tp, typevars) if typevars else tp
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable annotation metadata
+            return self._analyse(tp, dict(typevars))
+        schema = self._memo[key] = self._analyse(tp, dict(typevars))
+        return schema
+
+    def _register(self, tp: Any, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        name = self._names.get(tp)
+        if name is None and self._restored:
+            name = self._restored.get(repr(tp))
+            if name is not None:
+                self._names[tp] = name
+        if name is None:
+            base = _INVALID_NAME_CHARS.sub("_", self.name_for(tp)) or "Model"
+            name, suffix = base, 1
+            while name in self.components:
+                suffix += 1
+                name = f"{base}{suffix}"
+            self._names[tp] = name
+            # Reserve the name first so recursive references resolve to it.
+            self.components[name] = {}
+            with phase("schema_generation", name):
+                self.components[name].update(build())
+        return {"$ref": self.ref_prefix + name}
+
+    def _analyse(self, tp: Any, typevars: Dict[Any, Any]) -> Dict[str, Any]:
+        self.analysed += 1
+        if isinstance(tp, typing.TypeVar):
+            if tp in typevars:
+                return self._schema(typevars[tp], ())
+            bound = tp.__bound__
+            return self._schema(bound, ()) if bound is not None else {}
+        if tp is typing.Any or tp is object:
+            return {}
+        if tp is None or tp is _NONE_TYPE:
+            return {"nullable": True}
+        if isinstance(tp, str):
+            raise TypeError(f"Unresolved forward reference {tp!r}")
+        supertype = getattr(tp, "__supertype__", None)
+        if supertype is not None:  # NewType
+            return self._schema(supertype, tuple(typevars.items()))
+        if isinstance(tp, type) and tp in _SCALARS:
+            return _SCALARS[tp]
+
+        origin = typing.get_origin(tp)
+        if origin is not None:
+            return self._analyse_generic(tp, origin, typevars)
+        if isinstance(tp, type):
+            if issubclass(tp, enum.Enum):
+                return self._register(tp, lambda: self._enum_schema(tp))
+            if _is_model(tp):
+                return self._register(tp, lambda: self._model_schema(tp, {}))
+            for scalar, schema in _SCALARS.items():
+                if issubclass(tp, scalar):
+                    return schema
+            if issubclass(tp, collections.abc.Mapping):
+                return {"type": "object"}
+            if issubclass(tp, collections.abc.Iterable):
+                return {"type": "array", "items": {}}
+        raise TypeError(f"Cannot generate a schema for {tp!r}")
+
+    def _analyse_generic(
+        self, tp: Any, origin: Any, typevars: Dict[Any, Any]
+    ) -> Dict[str, Any]:
+        args = typing.get_args(tp)
+        scope = tuple(typevars.items())
+        if origin is typing.Annotated:
+            schema = self._schema(args[0], scope)
+            for meta in args[1:]:
+                if isinstance(meta, Mapping):
+                    schema = _extend(schema, meta)
+            return schema
+        if origin is typing.Literal:
+            types = {type(value) for value in args}
+            schema: Dict[str, Any] = {"enum": list(args)}
+            if len(types) == 1 and next(iter(types)) in _SCALARS:
+                schema = {**_SCALARS[next(iter(types))], **schema}
+            return schema
+        if origin in _UNION_TYPES:
+            members = [arg for arg in args if arg is not _NONE_TYPE]
+            if len(members) == 1:
+                schema = self._schema(members[0], scope)
+            else:
+                schema = {"anyOf": [self._schema(arg, scope) for arg in members]}
+            if len(members) < len(args):
+                schema = _extend(schema, {"nullable": True})
+            return schema
+        if origin is tuple:
+            if len(args) == 2 and args[1] is Ellipsis:
+                return {"type": "array", "items": self._schema(args[0], scope)}
+            items = [self._schema(arg, scope) for arg in args]
+            return {
+                "type": "array",
+                "items": {"anyOf": items} if len(items) > 1 else items[0],
+                "minItems": len(items),
+                "maxItems": len(items),
+            }
+        if isinstance(origin, type):
+            if _is_model(origin):
+                # Bind the enclosing type variables first (``Page[T]`` inside
+                # ``Wrapper[int]`` is ``Page[int]``) so that every binding
+                # gets a component of its own.
+                free = getattr(tp, "__parameters__", ())
+                if free and any(param in typevars for param in free):
+                    tp = tp[tuple(typevars.get(param, param) for param in free)]
+                    args = typing.get_args(tp)
+                params = getattr(origin, "__parameters__", ())
+                bound = dict(zip(params, args))
+                return self._register(tp, lambda: self._model_schema(origin, bound))
+            if issubclass(origin, collections.abc.Mapping):
+                value = args[1] if len(args) == 2 else typing.Any
+                return {
+                    "type": "object",
+                    "additionalProperties": self._schema(value, scope),
+                }
+            if issubclass(origin, collections.abc.Iterable):
+                item = args[0] if args else typing.Any
+                schema = {"type": "array", "items": self._schema(item, scope)}
+                if issubclass(origin, collections.abc.Set):
+                    schema["uniqueItems"] = True
+                return schema
+        raise TypeError(f"Cannot generate a schema for {tp!r}")
+
+    def _enum_schema(self, tp: Any) -> Dict[str, Any]:
+        values = [member.value for member in tp]
+        schema: Dict[str, Any] = {"title": tp.__name__, "enum": values}
+        types = {type(value) for value in values}
+        if len(types) == 1 and next(iter(types)) in _SCALARS:
+            schema = {**_SCALARS[next(iter(types))], **schema}
+        return schema
+
+    def _model_schema(self, tp: Any, typevars: Dict[Any, Any]) -> Dict[str, Any]:
+        hints = typing.get_type_hints(tp, include_extras=True)
+        required = []
+        metadata: Dict[str, Mapping[str, Any]] = {}
+        if dataclasses.is_dataclass(tp):
+            names = []
+            for field in dataclasses.fields(tp):
+                names.append(field.name)
+                # ``init=False`` fields are set after construction, so
+                # clients never have to provide them.
+                if (
+                    field.init
+                    and field.default is dataclasses.MISSING
+                    and field.default_factory is dataclasses.MISSING
+                ):
+                    required.append(field.name)
+                if "openapi" in field.metadata:
+                    metadata[field.name] = field.metadata["openapi"]
+        elif _is_attrs(tp):
+            names = []
+            for field in attr.fields(tp):
+                names.append(field.name)
+                # ``attr.ib(type=...)`` declares a type without an annotation.
+                if field.name not in hints and field.type is not None:
+                    hints[field.name] = field.type
+                if field.init and field.default is attr.NOTHING:
+                    required.append(field.name)
+                if "openapi" in field.metadata:
+                    metadata[field.name] = field.metadata["openapi"]
+        elif _is_typeddict(tp):
+            names = list(hints)
+            required_keys = getattr(tp, "__required_keys__", None)
+            if required_keys is None:
+                required_keys = names if tp.__total__ else ()
+            required = [name for name in names if name in required_keys]
+        else:  # NamedTuple
+            names = list(tp._fields)
+            required = [name for name in names if name not in tp._field_defaults]
+
+        scope = tuple(typevars.items())
+        properties = {}
+        for name in names:
+            schema = self._schema(hints.get(name, typing.Any), scope)
+            if name in metadata:
+                schema = _extend(schema, metadata[name])
+            properties[name] = schema
+        schema = {"type": "object", "properties": properties}
+        if required:
+            schema["required"] = required
+        return schema
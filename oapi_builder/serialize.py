@@ -0,0 +1,259 @@
+"""Streaming JSON and YAML serialization of OpenAPI documents.
+
+The serializer walks the top levels of a document (the document itself, its
+``paths`` / ``components`` maps and their entries) lazily and only encodes
+the fragments below that depth in one go, so peak memory is bounded by the
+largest single operation or component rather than by the whole document.
+
+Nodes may be plain mappings and sequences or any object exposing an
+``oapi_items()`` method that yields ``(key, value)`` pairs; the latter are
+expanded on demand and never materialized as a whole.
+"""
+from __future__ import annotations
+
+import io
+import json
+import math
+import re
+from typing import Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+from oapi_builder import encoding
+from oapi_builder.profiling import phase
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_STREAM_DEPTH",
+    "dump_json",
+    "dump_yaml",
+    "iter_json",
+    "iter_yaml",
+]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Levels below the root that are streamed entry by entry; deeper values are
+# encoded as a single fragment.  Three levels covers
+# ``paths -> path item -> operation`` and ``components -> kind -> component``.
+DEFAULT_STREAM_DEPTH = 3
+
+
+def _is_mapping(node: Any) -> bool:
+    return isinstance(node, Mapping) or hasattr(node, "oapi_items")
+
+
+def _items(node: Any) -> Iterable[Tuple[str, Any]]:
+    if isinstance(node, Mapping):
+        return node.items()
+    return node.oapi_items()
+
+
+def _is_sequence(node: Any) -> bool:
+    return isinstance(node, (list, tuple))
+
+
+def _encode_fragment(node: Any, indent: Optional[int]) -> str:
+    if indent is None or indent == 2:
+        return encoding.dumps_str(node, indent=indent is not None)
+    return encoding._json_dumps(node, indent)
+
+
+def _iter_json_node(
+    node: Any, indent: Optional[int], level: int, stream_depth: int
+) -> Iterator[str]:
+    if level >= stream_depth or not (_is_mapping(node) or _is_sequence(node)):
+        fragment = _encode_fragment(node, indent)
+        if indent is not None and level:
+            fragment = fragment.replace("\n", "\n" + " " * (indent * level))
+        yield fragment
+        return
+
+    if indent is None:
+        item_sep, key_sep, inner, outer = ",", ":", "", ""
+    else:
+        inner = "\n" + " " * (indent * (level + 1))
+        outer = "\n" + " " * (indent * level)
+        item_sep, key_sep = "," + inner, ": "
+
+    if _is_sequence(node):
+        if not node:
+            yield "[]"
+            return
+        yield "[" + inner
+        for idx, value in enumerate(node):
+            if idx:
+                yield item_sep
+            yield from _iter_json_node(value, indent, level + 1, stream_depth)
+        yield outer + "]"
+        return
+
+    first = True
+    for key, value in _items(node):
+        if first:
+            yield "{" + inner
+            first = False
+        else:
+            yield item_sep
+        yield json.dumps(encoding.key_str(key), ensure_ascii=False) + key_sep
+        yield from _iter_json_node(value, indent, level + 1, stream_depth)
+    yield "{}" if first else outer + "}"
+
+
+def iter_json(
+    doc: Any,
+    indent: Optional[int] = None,
+    stream_depth: int = DEFAULT_STREAM_DEPTH,
+) -> Iterator[str]:
+    """Yield the JSON encoding of ``doc`` as a sequence of text chunks.
+
+    With ``indent=None`` the output is compact (no whitespace between tokens).
+    Fragments are encoded with the configured :mod:`oapi_builder.encoding`
+    backend, so the output is identical whichever backend is active.
+    """
+    yield from _iter_json_node(doc, indent, 0, stream_depth)
+
+
+_PLAIN_SCALAR = re.compile(r"[A-Za-z_][A-Za-z0-9_./-]*(?: [A-Za-z0-9_./-]+)*\Z")
+# A JSON escape; groups match when it is a surrogate pair.
+_JSON_ESCAPE = re.compile(r"\\(?:u(d[89ab][0-9a-f]{2})\\u(d[c-f][0-9a-f]{2})|.)")
+_YAML_RESERVED = frozenset(
+    ["true", "false", "yes", "no", "on", "off", "y", "n", "null", "nan", "inf"]
+)
+
+
+def _yaml_scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ".nan"
+        if math.isinf(value):
+            return ".inf" if value > 0 else "-.inf"
+        text = repr(value)
+        if "e" in text and "." not in text:
+            # YAML 1.1 loaders only read exponent floats with a dot in them.
+            text = text.replace("e", ".0e", 1)
+        return text
+    value = str(value)
+    if _PLAIN_SCALAR.match(value) and value.lower() not in _YAML_RESERVED:
+        return value
+    # ASCII-only escapes keep non-printable characters out of the stream;
+    # characters outside the BMP use YAML's \U escape, not a surrogate pair.
+    text = json.dumps(value)
+    return _JSON_ESCAPE.sub(_astral_escape, text) if "\\ud" in text else text
+
+
+def _astral_escape(match: "re.Match[str]") -> str:
+    if match.group(1) is None:
+        return match.group(0)
+    high, low = int(match.group(1), 16), int(match.group(2), 16)
+    return f"\\U{0x10000 + ((high - 0xD800) << 10) + (low - 0xDC00):08x}"
+
+
+def _iter_yaml_block(node: Any, level: int) -> Iterator[str]:
+    """Yield ``node`` as a YAML block whose lines are indented by ``level``."""
+    pad = "  " * level
+    if _is_sequence(node):
+        for value in node:
+            if (_is_mapping(value) or _is_sequence(value)) and _has_entries(value):
+                # The first line of the nested block shares the dash's line.
+                chunks = _iter_yaml_block(value, level + 1)
+                first = next(chunks)
+                yield pad + "- " + first[len(pad) + 2 :]
+                yield from chunks
+            else:
+                yield pad + "- " + _yaml_inline(value) + "\n"
+        return
+    for key, value in _items(node):
+        prefix = pad + _yaml_scalar(key) + ":"
+        if (_is_mapping(value) or _is_sequence(value)) and _has_entries(value):
+            yield prefix + "\n"
+            yield from _iter_yaml_block(value, level + 1)
+        else:
+            yield prefix + " " + _yaml_inline(value) + "\n"
+
+
+def _has_entries(node: Any) -> bool:
+    if _is_sequence(node) or isinstance(node, Mapping):
+        return bool(node)
+    for _ in node.oapi_items():
+        return True
+    return False
+
+
+def _yaml_inline(value: Any) -> str:
+    if _is_sequence(value):
+        return "[]"
+    if _is_mapping(value):
+        return "{}"
+    return _yaml_scalar(value)
+
+
+def iter_yaml(doc: Any) -> Iterator[str]:
+    """Yield the block-style YAML encoding of ``doc`` as text chunks."""
+    if (_is_mapping(doc) or _is_sequence(doc)) and _has_entries(doc):
+        yield from _iter_yaml_block(doc, 0)
+    else:
+        yield _yaml_inline(doc) + "\n"
+
+
+class _Sink:
+    """Buffers text chunks and flushes them to a file or socket."""
+
+    def __init__(self, fp: Any, chunk_size: int):
+        self._chunk_size = chunk_size
+        self._buffer: list = []
+        self._size = 0
+        if hasattr(fp, "sendall"):
+            self._text = False
+            self._write = fp.sendall
+        else:
+            self._text = isinstance(fp, io.TextIOBase)
+            self._write = fp.write
+
+    def write(self, chunk: str) -> None:
+        self._buffer.append(chunk)
+        self._size += len(chunk)
+        if self._size >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._size = 0
+        self._write(data if self._text else data.encode("utf-8"))
+
+
+def _dump(chunks: Iterable[str], fp: Any, chunk_size: int) -> None:
+    sink = _Sink(fp, chunk_size)
+    for chunk in chunks:
+        sink.write(chunk)
+    sink.flush()
+
+
+def dump_json(
+    doc: Any,
+    fp: Any,
+    indent: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream_depth: int = DEFAULT_STREAM_DEPTH,
+) -> None:
+    """Write ``doc`` as JSON to ``fp`` without materializing the full output.
+
+    ``fp`` may be a text file, a binary file or a socket (anything with
+    ``sendall``); bytes are written UTF-8 encoded.
+    """
+    with phase("serialization"):
+        _dump(iter_json(doc, indent=indent, stream_depth=stream_depth), fp, chunk_size)
+
+
+def dump_yaml(doc: Any, fp: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Write ``doc`` as block-style YAML to ``fp``; see :func:`dump_json`."""
+    with phase("serialization"):
+        _dump(iter_yaml(doc), fp, chunk_size)
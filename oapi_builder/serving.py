@@ -0,0 +1,134 @@
+"""Serve rendered specs with precompressed bodies and conditional requests.
+
+A :class:`RenderedSpec` holds everything a response needs, computed once: the
+rendered bytes, a gzip-compressed copy and a strong ETag for each.  Answering
+a request is then a header comparison and a choice between two prebuilt
+byte strings; ``If-None-Match`` polls that match get a body-less ``304``
+without anything being rendered or compressed.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from oapi_builder.batch import render
+
+__all__ = ["RenderedSpec"]
+
+CONTENT_TYPES = {"json": "application/json", "yaml": "application/yaml"}
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def _entity_tags(header: str) -> List[str]:
+    """Split an ``If-None-Match`` value into opaque tags (weak prefix dropped)."""
+    tags = []
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        if part:
+            tags.append(part)
+    return tags
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    """Whether an ``Accept-Encoding`` value allows gzip (``q`` > 0)."""
+    if not header:
+        return False
+    wildcard = None
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return bool(wildcard)
+
+
+class RenderedSpec:
+    """A rendered document with its gzip variant and ETags.
+
+    :param body: the rendered document.
+    :param cache_control: ``Cache-Control`` sent with every response; the
+        default makes clients revalidate with ``If-None-Match`` each time.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        content_type: str = "application/json",
+        cache_control: Optional[str] = "no-cache",
+        compresslevel: int = 9,
+    ):
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        # mtime=0 keeps the compressed bytes (and their ETag) reproducible.
+        self.gzip_body = gzip.compress(body, compresslevel=compresslevel, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self._tags = {self.etag, self.gzip_etag}
+
+    @classmethod
+    def from_document(
+        cls,
+        doc: Any,
+        fmt: str = "json",
+        indent: bool = False,
+        canonical: bool = False,
+        **options: Any,
+    ) -> "RenderedSpec":
+        """Render ``doc`` once and wrap the result.
+
+        With ``canonical`` equal documents get identical bytes and ETags
+        however they were built; see :func:`~oapi_builder.batch.render`.
+        """
+        body = render(doc, fmt, indent, canonical)
+        return cls(body, CONTENT_TYPES[fmt], **options)
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` value matches this representation."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag in self._tags for tag in _entity_tags(if_none_match))
+
+    def respond(
+        self,
+        if_none_match: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+        head: bool = False,
+    ) -> Response:
+        """Return ``(status, headers, body)`` for a GET (or HEAD) request."""
+        compressed = _accepts_gzip(accept_encoding)
+        etag = self.gzip_etag if compressed else self.etag
+        headers = {"etag": etag, "vary": "accept-encoding"}
+        if self.cache_control:
+            headers["cache-control"] = self.cache_control
+        if self.not_modified(if_none_match):
+            return 304, headers, b""
+        body = self.gzip_body if compressed else self.body
+        headers["content-type"] = self.content_type
+        headers["content-length"] = str(len(body))
+        if compressed:
+            headers["content-encoding"] = "gzip"
+        return 200, headers, b"" if head else body
+
+    def __repr__(self) -> str:
+        return (
+            f"<RenderedSpec {self.etag} {len(self.body)} bytes, "
+            f"{len(self.gzip_body)} gzipped>"
+        )
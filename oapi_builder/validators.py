@@ -0,0 +1,795 @@
+"""Compile schemas into validator functions.
+
+:class:`SchemaCompiler` turns a schema into a tree of Python closures once;
+validating a value then just calls those closures, without looking at the
+schema dict again.  Keywords are grouped by the JSON type they apply to, so a
+string is never run through object or array checks, patterns are compiled
+once, ``enum`` and ``uniqueItems`` use hashed lookups, and ``oneOf``/``anyOf``
+with a ``discriminator`` dispatch straight to the matching branch.
+
+Compiled checks are cached by the structural hash of their schema, so equal
+schemas (the same model inlined in many operations) share one compiled
+function, and ``$ref`` targets are compiled once per compiler.  Schemas must
+not be mutated after they have been compiled.
+
+The OpenAPI 3.0 dialect is assumed (``nullable``, boolean
+``exclusiveMinimum``/``exclusiveMaximum``), with the numeric exclusive bounds,
+``const``, ``prefixItems`` and type lists of 3.1 accepted as well.  Of the
+``format`` values only ``date``, ``date-time``, ``uuid``, ``ipv4`` and
+``ipv6`` are checked; ``readOnly``/``writeOnly`` are not enforced.
+"""
+from __future__ import annotations
+
+import ipaddress
+import math
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from oapi_builder.errors import OapiBuilderError
+from oapi_builder.hashing import StructuralHasher
+from oapi_builder.model import to_plain
+from oapi_builder.pointer import escape_token, split_ref
+from oapi_builder.profiling import phase
+from oapi_builder.resolver import RefResolver
+from oapi_builder.walk import discriminator_ref
+
+__all__ = [
+    "SchemaCompiler",
+    "ValidationError",
+    "ValidationIssue",
+    "Validator",
+]
+
+Check = Callable[[Any, str, List["ValidationIssue"]], None]
+
+
+class ValidationIssue:
+    """One reason a value failed validation.
+
+    :ivar path: JSON pointer of the offending part of the value.
+    :ivar keyword: the schema keyword that failed.
+    """
+
+    __slots__ = ("path", "keyword", "message")
+
+    def __init__(self, path: str, keyword: str, message: str):
+        self.path = path
+        self.keyword = keyword
+        self.message = message
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"path": self.path, "keyword": self.keyword, "message": self.message}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ValidationIssue):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"<ValidationIssue {self.path or '/'} {self.keyword}: {self.message}>"
+
+
+class ValidationError(OapiBuilderError, ValueError):
+    """A value does not match its schema; ``issues`` lists every problem."""
+
+    def __init__(self, issues: List[ValidationIssue]):
+        self.issues = issues
+        lines = [f"{len(issues)} validation issue(s):"]
+        lines.extend(f"  {issue.path or '/'}: {issue.message}" for issue in issues)
+        super().__init__("\n".join(lines))
+
+
+class Validator:
+    """A compiled schema.
+
+    :ivar name: what the schema describes (``"POST /pets request"``), when
+        known; used to label profiling output.
+    """
+
+    __slots__ = ("schema", "name", "_check")
+
+    def __init__(self, schema: Any, check: Check, name: Optional[str] = None):
+        self.schema = schema
+        self.name = name
+        self._check = check
+
+    def errors(self, value: Any) -> List[ValidationIssue]:
+        """Return every issue with ``value``; empty when it is valid."""
+        issues: List[ValidationIssue] = []
+        with phase("validation", self.name):
+            self._check(value, "", issues)
+        return issues
+
+    __call__ = errors
+
+    def is_valid(self, value: Any) -> bool:
+        return not self.errors(value)
+
+    def validate(self, value: Any) -> None:
+        """Raise :class:`ValidationError` unless ``value`` is valid."""
+        issues = self.errors(value)
+        if issues:
+            raise ValidationError(issues)
+
+    def __repr__(self) -> str:
+        return f"<Validator {self.name or self.schema!r}>"
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, int):
+        return not isinstance(value, bool)
+    return isinstance(value, float) and value.is_integer()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "null": lambda value: value is None,
+}
+
+_DATE = r"\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])"
+_TIME = r"(?:[01]\d|2[0-3]):[0-5]\d:(?:[0-5]\d|60)(?:\.\d+)?(?:[Zz]|[+-]\d\d:\d\d)"
+_FORMAT_PATTERNS = {
+    "date": re.compile(f"{_DATE}$"),
+    "date-time": re.compile(f"{_DATE}[Tt ]{_TIME}$"),
+    "uuid": re.compile(r"[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$"),
+}
+
+
+def _is_ip(version: int) -> Callable[[str], bool]:
+    def check(value: str) -> bool:
+        try:
+            return ipaddress.ip_address(value).version == version
+        except ValueError:
+            return False
+
+    return check
+
+
+_FORMATS: Dict[str, Callable[[str], bool]] = {
+    name: (lambda pattern: lambda value: pattern.match(value) is not None)(pattern)
+    for name, pattern in _FORMAT_PATTERNS.items()
+}
+_FORMATS["ipv4"] = _is_ip(4)
+_FORMATS["ipv6"] = _is_ip(6)
+
+
+def _freeze(value: Any) -> Any:
+    """A hashable form of a JSON value under JSON equality (1 == 1.0 != True)."""
+    if isinstance(value, bool):
+        return ("b", value)
+    if isinstance(value, (int, float)):
+        return ("n", value)
+    if isinstance(value, str):
+        return ("s", value)
+    if isinstance(value, Mapping):
+        return ("o", frozenset((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("a", tuple(_freeze(item) for item in value))
+    return ("z", value)
+
+
+def _accept(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+    pass
+
+
+def _reject(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+    issues.append(ValidationIssue(path, "false", "no value is allowed here"))
+
+
+def _run_all(checks: Tuple[Check, ...]) -> Check:
+    if not checks:
+        return _accept
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+        for step in checks:
+            step(value, path, issues)
+
+    return check
+
+
+class SchemaCompiler:
+    """Compiles schemas into :class:`Validator` objects, caching the results.
+
+    :param document: the document ``$ref``s point into; ignored when a
+        ``resolver`` is given.
+    :param base_uri: the URI references are resolved against.
+    """
+
+    def __init__(
+        self,
+        document: Any = None,
+        resolver: Optional[RefResolver] = None,
+        base_uri: str = "",
+    ):
+        if resolver is None:
+            resolver = RefResolver(document, base_uri=base_uri)
+        self.resolver = resolver
+        self.base_uri = base_uri
+        self._hasher = StructuralHasher()
+        self._checks: Dict[Tuple[bytes, str], Check] = {}
+        self._refs: Dict[Tuple[str, str], Check] = {}
+        self._validators: Dict[Any, Validator] = {}
+        self.compiled = 0
+        self.hits = 0
+
+    def compile(
+        self, schema: Any, base_uri: Optional[str] = None, name: Optional[str] = None
+    ) -> Validator:
+        """Return the validator of ``schema``.
+
+        Raises :class:`~oapi_builder.errors.RefCycleError` if it refers to a
+        loop of bare references.
+        """
+        uri = self.base_uri if base_uri is None else base_uri
+        schema = to_plain(schema)
+        with phase("validation", "compile"):
+            check = self._compile(schema, uri)
+        return Validator(schema, check, name)
+
+    def _operation(self, path: str, method: str) -> Mapping[str, Any]:
+        doc = self.resolver.document(self.base_uri)
+        try:
+            return doc["paths"][path][method.lower()]
+        except (KeyError, TypeError):
+            raise KeyError(f"No operation {method.upper()} {path}") from None
+
+    def _media_validator(self, owner: Any, media_type: str, name: str) -> Validator:
+        key = (name, media_type)
+        cached = self._validators.get(key)
+        if cached is not None:
+            return cached
+        uri = self.base_uri
+        if isinstance(owner, Mapping) and isinstance(owner.get("$ref"), str):
+            uri, owner = self.resolver.resolve(owner["$ref"], uri)
+        content = (owner or {}).get("content") or {}
+        media = content.get(media_type)
+        if media is None:
+            raise KeyError(f"No {media_type!r} content for {name}")
+        validator = self.compile(media.get("schema", {}), uri, name)
+        self._validators[key] = validator
+        return validator
+
+    def request_validator(
+        self, path: str, method: str, media_type: str = "application/json"
+    ) -> Validator:
+        """Return the validator of an operation's request body."""
+        operation = self._operation(path, method)
+        name = f"{method.upper()} {path} request"
+        return self._media_validator(operation.get("requestBody"), media_type, name)
+
+    def response_validator(
+        self,
+        path: str,
+        method: str,
+        status: Any = 200,
+        media_type: str = "application/json",
+    ) -> Validator:
+        """Return the validator of an operation's response body.
+
+        ``status`` is matched exactly, then by range (``"2XX"``), then
+        against ``default``.
+        """
+        responses = self._operation(path, method).get("responses") or {}
+        status = str(status)
+        for candidate in (status, f"{status[:1]}XX", f"{status[:1]}xx", "default"):
+            if candidate in responses:
+                break
+        else:
+            raise KeyError(f"No {status} response for {method.upper()} {path}")
+        name = f"{method.upper()} {path} {candidate} response"
+        return self._media_validator(responses[candidate], media_type, name)
+
+    def _compile(self, schema: Any, uri: str) -> Check:
+        if schema is True:
+            return _accept
+        if schema is False:
+            return _reject
+        if not isinstance(schema, Mapping):
+            raise TypeError(f"A schema must be a mapping or boolean, not {schema!r}")
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            return self._compile_ref(ref, uri)
+        key = (self._hasher(schema), uri)
+        check = self._checks.get(key)
+        if check is not None:
+            self.hits += 1
+            return check
+        self.compiled += 1
+        check = self._checks[key] = self._build(schema, uri)
+        return check
+
+    def _compile_ref(self, ref: str, uri: str) -> Check:
+        key = split_ref(ref, uri)
+        check = self._refs.get(key)
+        if check is not None:
+            return check
+        # Register a trampoline first so recursive schemas compile.
+        target: List[Check] = []
+
+        def check(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+            target[0](value, path, issues)
+
+        self._refs[key] = check
+        # Follow chains of bare refs up front: a loop of them has no schema
+        # to compile, only trampolines calling each other forever.  Whatever
+        # fails, drop the trampoline so later compiles fail again instead of
+        # returning a check with nothing to call.
+        try:
+            target_uri, schema = self.resolver.resolve(ref, uri)
+            target.append(self._compile(schema, target_uri))
+        except BaseException:
+            self._refs.pop(key, None)
+            raise
+        return check
+
+    def _build(self, schema: Mapping[str, Any], uri: str) -> Check:
+        general: List[Check] = []
+        typed: Dict[str, List[Check]] = {
+            kind: [] for kind in ("string", "number", "object", "array")
+        }
+
+        types = schema.get("type")
+        nullable = schema.get("nullable") is True
+        type_check = None
+        if types is not None:
+            names = [types] if isinstance(types, str) else list(types)
+            if nullable and "null" not in names:
+                names.append("null")
+            try:
+                predicates = tuple(_TYPE_CHECKS[name] for name in names)
+            except KeyError as err:
+                raise ValueError(f"Unknown schema type {err.args[0]!r}") from None
+            message = f"expected {' or '.join(names)}"
+
+            def type_check(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> bool:
+                for predicate in predicates:
+                    if predicate(value):
+                        return True
+                issues.append(ValidationIssue(path, "type", message))
+                return False
+
+        self._build_general(schema, uri, general)
+        self._build_string(schema, typed["string"])
+        self._build_number(schema, typed["number"])
+        self._build_array(schema, uri, typed["array"])
+        self._build_object(schema, uri, typed["object"])
+
+        has_typed = any(typed.values())
+        if type_check is None and not general and not has_typed:
+            return _accept
+        run_general = _run_all(tuple(general))
+        run_string = _run_all(tuple(typed["string"]))
+        run_number = _run_all(tuple(typed["number"]))
+        run_array = _run_all(tuple(typed["array"]))
+        run_object = _run_all(tuple(typed["object"]))
+
+        def check(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+            if value is None and nullable:
+                return
+            if type_check is not None and not type_check(value, path, issues):
+                return
+            run_general(value, path, issues)
+            if not has_typed:
+                return
+            if isinstance(value, str):
+                run_string(value, path, issues)
+            elif isinstance(value, dict):
+                run_object(value, path, issues)
+            elif isinstance(value, (list, tuple)):
+                run_array(value, path, issues)
+            elif _is_number(value):
+                run_number(value, path, issues)
+
+        return check
+
+    def _build_general(
+        self, schema: Mapping[str, Any], uri: str, checks: List[Check]
+    ) -> None:
+        if "enum" in schema:
+            allowed = frozenset(_freeze(item) for item in schema["enum"])
+            message = f"must be one of {schema['enum']!r}"
+
+            def check_enum(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if _freeze(value) not in allowed:
+                    issues.append(ValidationIssue(path, "enum", message))
+
+            checks.append(check_enum)
+        if "const" in schema:
+            expected = _freeze(schema["const"])
+            message = f"must be {schema['const']!r}"
+
+            def check_const(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if _freeze(value) != expected:
+                    issues.append(ValidationIssue(path, "const", message))
+
+            checks.append(check_const)
+
+        for sub in schema.get("allOf") or ():
+            checks.append(self._compile(sub, uri))
+
+        discriminated = self._build_discriminator(schema, uri)
+        if discriminated is not None:
+            checks.append(discriminated)
+        else:
+            for keyword in ("anyOf", "oneOf"):
+                if schema.get(keyword):
+                    subs = tuple(self._compile(sub, uri) for sub in schema[keyword])
+                    checks.append(_combinator(keyword, subs))
+
+        if "not" in schema:
+            negated = self._compile(schema["not"], uri)
+
+            def check_not(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+                scratch: List[ValidationIssue] = []
+                negated(value, path, scratch)
+                if not scratch:
+                    issues.append(
+                        ValidationIssue(path, "not", "must not match the schema")
+                    )
+
+            checks.append(check_not)
+
+    def _build_discriminator(
+        self, schema: Mapping[str, Any], uri: str
+    ) -> Optional[Check]:
+        discriminator = schema.get("discriminator")
+        keyword = "oneOf" if schema.get("oneOf") else "anyOf"
+        branches = schema.get(keyword)
+        if not isinstance(discriminator, Mapping) or not branches:
+            return None
+        if not all(
+            isinstance(sub, Mapping) and isinstance(sub.get("$ref"), str)
+            for sub in branches
+        ):
+            return None
+        prop = discriminator.get("propertyName")
+        targets: Dict[Any, Check] = {}
+        for sub in branches:
+            name = sub["$ref"].rsplit("/", 1)[-1]
+            targets[name] = self._compile(sub, uri)
+        for value, ref in (discriminator.get("mapping") or {}).items():
+            targets[value] = self._compile({"$ref": discriminator_ref(ref)}, uri)
+        prop_path = "/" + escape_token(prop)
+        message = f"{prop!r} must be one of {sorted(targets)!r}"
+
+        def check(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+            if not isinstance(value, dict):
+                return
+            if prop not in value:
+                issues.append(
+                    ValidationIssue(path, "discriminator", f"missing {prop!r}")
+                )
+                return
+            tag = value[prop]
+            target = targets.get(tag) if isinstance(tag, str) else None
+            if target is None:
+                issues.append(
+                    ValidationIssue(path + prop_path, "discriminator", message)
+                )
+            else:
+                target(value, path, issues)
+
+        return check
+
+    def _build_string(self, schema: Mapping[str, Any], checks: List[Check]) -> None:
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        if min_length is not None or max_length is not None:
+            low = min_length or 0
+            high = math.inf if max_length is None else max_length
+
+            def check_length(
+                value: str, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                length = len(value)
+                if length < low:
+                    issues.append(
+                        ValidationIssue(path, "minLength", f"shorter than {low}")
+                    )
+                elif length > high:
+                    issues.append(
+                        ValidationIssue(path, "maxLength", f"longer than {high}")
+                    )
+
+            checks.append(check_length)
+        if "pattern" in schema:
+            search = re.compile(schema["pattern"]).search
+            message = f"does not match {schema['pattern']!r}"
+
+            def check_pattern(
+                value: str, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if search(value) is None:
+                    issues.append(ValidationIssue(path, "pattern", message))
+
+            checks.append(check_pattern)
+        matches = _FORMATS.get(schema.get("format"))
+        if matches is not None:
+            message = f"is not a valid {schema['format']}"
+
+            def check_format(
+                value: str, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if not matches(value):
+                    issues.append(ValidationIssue(path, "format", message))
+
+            checks.append(check_format)
+
+    def _build_number(self, schema: Mapping[str, Any], checks: List[Check]) -> None:
+        bounds: List[Tuple[str, Callable[[Any], bool], str]] = []
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+        exclusive_min = schema.get("exclusiveMinimum")
+        exclusive_max = schema.get("exclusiveMaximum")
+        if minimum is not None:
+            if exclusive_min is True:
+                bounds.append(
+                    ("minimum", lambda v: v > minimum, f"must be > {minimum}")
+                )
+            else:
+                bounds.append(
+                    ("minimum", lambda v: v >= minimum, f"must be >= {minimum}")
+                )
+        if maximum is not None:
+            if exclusive_max is True:
+                bounds.append(
+                    ("maximum", lambda v: v < maximum, f"must be < {maximum}")
+                )
+            else:
+                bounds.append(
+                    ("maximum", lambda v: v <= maximum, f"must be <= {maximum}")
+                )
+        if _is_number(exclusive_min):
+            bounds.append(
+                (
+                    "exclusiveMinimum",
+                    lambda v: v > exclusive_min,
+                    f"must be > {exclusive_min}",
+                )
+            )
+        if _is_number(exclusive_max):
+            bounds.append(
+                (
+                    "exclusiveMaximum",
+                    lambda v: v < exclusive_max,
+                    f"must be < {exclusive_max}",
+                )
+            )
+        multiple_of = schema.get("multipleOf")
+        if multiple_of is not None:
+            if isinstance(multiple_of, int):
+                is_multiple = lambda v: (  # noqa: E731
+                    v % multiple_of == 0
+                    if isinstance(v, int)
+                    else _float_multiple(v, multiple_of)
+                )
+            else:
+                is_multiple = lambda v: _float_multiple(v, multiple_of)  # noqa: E731
+            bounds.append(
+                ("multipleOf", is_multiple, f"must be a multiple of {multiple_of}")
+            )
+        if not bounds:
+            return
+        frozen = tuple(bounds)
+
+        def check_bounds(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+            for keyword, ok, message in frozen:
+                if not ok(value):
+                    issues.append(ValidationIssue(path, keyword, message))
+
+        checks.append(check_bounds)
+
+    def _build_array(
+        self, schema: Mapping[str, Any], uri: str, checks: List[Check]
+    ) -> None:
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        if min_items is not None or max_items is not None:
+            low = min_items or 0
+            high = math.inf if max_items is None else max_items
+
+            def check_size(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if len(value) < low:
+                    issues.append(
+                        ValidationIssue(path, "minItems", f"fewer than {low} items")
+                    )
+                elif len(value) > high:
+                    issues.append(
+                        ValidationIssue(path, "maxItems", f"more than {high} items")
+                    )
+
+            checks.append(check_size)
+        if schema.get("uniqueItems") is True:
+
+            def check_unique(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if len({_freeze(item) for item in value}) != len(value):
+                    issues.append(
+                        ValidationIssue(path, "uniqueItems", "items are not unique")
+                    )
+
+            checks.append(check_unique)
+
+        prefix = tuple(
+            self._compile(sub, uri) for sub in schema.get("prefixItems") or ()
+        )
+        items = schema.get("items")
+        if isinstance(items, list):  # draft 4 tuple form
+            prefix, items = tuple(self._compile(sub, uri) for sub in items), None
+        rest = self._compile(items, uri) if items is not None else None
+        if rest is _accept:
+            rest = None
+        if prefix or rest is not None:
+            start = len(prefix)
+
+            def check_items(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                for idx, (item, sub) in enumerate(zip(value, prefix)):
+                    sub(item, f"{path}/{idx}", issues)
+                if rest is not None:
+                    for idx in range(start, len(value)):
+                        rest(value[idx], f"{path}/{idx}", issues)
+
+            checks.append(check_items)
+        if "contains" in schema:
+            contains = self._compile(schema["contains"], uri)
+
+            def check_contains(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                for item in value:
+                    scratch: List[ValidationIssue] = []
+                    contains(item, path, scratch)
+                    if not scratch:
+                        return
+                issues.append(
+                    ValidationIssue(path, "contains", "no item matches the schema")
+                )
+
+            checks.append(check_contains)
+
+    def _build_object(
+        self, schema: Mapping[str, Any], uri: str, checks: List[Check]
+    ) -> None:
+        required = tuple(schema.get("required") or ())
+        if required:
+
+            def check_required(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                for name in required:
+                    if name not in value:
+                        issues.append(
+                            ValidationIssue(
+                                path, "required", f"missing required property {name!r}"
+                            )
+                        )
+
+            checks.append(check_required)
+
+        min_props = schema.get("minProperties")
+        max_props = schema.get("maxProperties")
+        if min_props is not None or max_props is not None:
+            low = min_props or 0
+            high = math.inf if max_props is None else max_props
+
+            def check_count(
+                value: Any, path: str, issues: List[ValidationIssue]
+            ) -> None:
+                if len(value) < low:
+                    issues.append(
+                        ValidationIssue(
+                            path, "minProperties", f"fewer than {low} properties"
+                        )
+                    )
+                elif len(value) > high:
+                    issues.append(
+                        ValidationIssue(
+                            path, "maxProperties", f"more than {high} properties"
+                        )
+                    )
+
+            checks.append(check_count)
+
+        properties: Dict[str, Tuple[Check, str]] = {}
+        for name, sub in (schema.get("properties") or {}).items():
+            compiled = self._compile(sub, uri)
+            if compiled is not _accept:
+                properties[name] = (compiled, "/" + escape_token(name))
+        patterns = tuple(
+            (re.compile(pattern).search, self._compile(sub, uri))
+            for pattern, sub in (schema.get("patternProperties") or {}).items()
+        )
+        additional = schema.get("additionalProperties", True)
+        declared = frozenset(schema.get("properties") or ())
+        extra: Optional[Check] = None
+        if additional is not True:
+            extra = self._compile(additional, uri)
+            if extra is _accept:
+                extra = None
+        if not properties and not patterns and extra is None:
+            return
+
+        def check_properties(
+            value: Any, path: str, issues: List[ValidationIssue]
+        ) -> None:
+            for name, item in value.items():
+                entry = properties.get(name)
+                if entry is not None:
+                    entry[0](item, path + entry[1], issues)
+                matched = False
+                for search, sub in patterns:
+                    if search(name) is not None:
+                        matched = True
+                        sub(item, f"{path}/{escape_token(name)}", issues)
+                if extra is not None and not matched and name not in declared:
+                    if extra is _reject:
+                        issues.append(
+                            ValidationIssue(
+                                f"{path}/{escape_token(name)}",
+                                "additionalProperties",
+                                f"unexpected property {name!r}",
+                            )
+                        )
+                    else:
+                        extra(item, f"{path}/{escape_token(name)}", issues)
+
+        checks.append(check_properties)
+
+
+def _float_multiple(value: float, divisor: float) -> bool:
+    quotient = value / divisor
+    return math.isclose(quotient, round(quotient), rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _combinator(keyword: str, subs: Tuple[Check, ...]) -> Check:
+    if keyword == "anyOf":
+
+        def check_any(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+            for sub in subs:
+                scratch: List[ValidationIssue] = []
+                sub(value, path, scratch)
+                if not scratch:
+                    return
+            issues.append(
+                ValidationIssue(path, "anyOf", "does not match any allowed schema")
+            )
+
+        return check_any
+
+    def check_one(value: Any, path: str, issues: List[ValidationIssue]) -> None:
+        matches = 0
+        for sub in subs:
+            scratch: List[ValidationIssue] = []
+            sub(value, path, scratch)
+            if not scratch:
+                matches += 1
+        if matches != 1:
+            message = (
+                "does not match any allowed schema"
+                if not matches
+                else f"matches {matches} schemas, expected exactly one"
+            )
+            issues.append(ValidationIssue(path, "oneOf", message))
+
+    return check_one
@@ -0,0 +1,189 @@
+"""Helpers for locating schemas inside plain OpenAPI documents.
+
+Schemas are reported as ``(container, key, location)`` triples so that passes
+can replace them in place with ``container[key] = ...``; ``location`` is the
+tuple of keys leading to the schema from the document root.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator, Mapping, Tuple
+
+from oapi_builder.model import HTTP_METHODS
+from oapi_builder.pointer import escape_token
+
+__all__ = [
+    "SchemaSlot",
+    "discriminator_ref",
+    "iter_document_schemas",
+    "iter_operations",
+    "iter_refs",
+    "iter_subschemas",
+]
+
+SchemaSlot = Tuple[Any, Any, Tuple[Any, ...]]
+
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+_SCHEMA_MAPS = ("properties", "patternProperties", "definitions", "$defs")
+_SCHEMA_LISTS = ("allOf", "oneOf", "anyOf", "prefixItems")
+_SCHEMA_VALUES = ("items", "additionalProperties", "not", "contains")
+
+
+def iter_subschemas(
+    schema: Any, location: Tuple[Any, ...] = ()
+) -> Iterator[SchemaSlot]:
+    """Yield the direct subschemas of ``schema``."""
+    if not isinstance(schema, Mapping):
+        return
+    for keyword in _SCHEMA_MAPS:
+        children = schema.get(keyword)
+        if isinstance(children, Mapping):
+            for name, child in children.items():
+                if isinstance(child, Mapping):
+                    yield children, name, location + (keyword, name)
+    for keyword in _SCHEMA_LISTS:
+        children = schema.get(keyword)
+        if isinstance(children, list):
+            for idx, child in enumerate(children):
+                if isinstance(child, Mapping):
+                    yield children, idx, location + (keyword, idx)
+    for keyword in _SCHEMA_VALUES:
+        child = schema.get(keyword)
+        if isinstance(child, Mapping):
+            yield schema, keyword, location + (keyword,)
+
+
+def _iter_content(content: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    if isinstance(content, Mapping):
+        for media_type, media in content.items():
+            if isinstance(media, Mapping) and isinstance(media.get("schema"), Mapping):
+                yield media, "schema", location + (media_type, "schema")
+
+
+def _iter_parameter(param: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    if not isinstance(param, Mapping) or "$ref" in param:
+        return
+    if isinstance(param.get("schema"), Mapping):
+        yield param, "schema", location + ("schema",)
+    yield from _iter_content(param.get("content"), location + ("content",))
+
+
+def _iter_headers(headers: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    if isinstance(headers, Mapping):
+        for name, header in headers.items():
+            yield from _iter_parameter(header, location + (name,))
+
+
+def _iter_response(response: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    if not isinstance(response, Mapping) or "$ref" in response:
+        return
+    yield from _iter_headers(response.get("headers"), location + ("headers",))
+    yield from _iter_content(response.get("content"), location + ("content",))
+
+
+def _iter_request_body(body: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    if isinstance(body, Mapping) and "$ref" not in body:
+        yield from _iter_content(body.get("content"), location + ("content",))
+
+
+def iter_operations(doc: Mapping[str, Any]) -> Iterator[Tuple[str, str, Any]]:
+    """Yield ``(path, method, operation)`` for every operation in ``doc``."""
+    paths = doc.get("paths")
+    if not isinstance(paths, Mapping):
+        return
+    for path, item in paths.items():
+        if not isinstance(item, Mapping):
+            continue
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if isinstance(operation, Mapping):
+                yield path, method, operation
+
+
+def _iter_operation(operation: Any, location: Tuple[Any, ...]) -> Iterator[SchemaSlot]:
+    for idx, param in enumerate(operation.get("parameters") or ()):
+        yield from _iter_parameter(param, location + ("parameters", idx))
+    yield from _iter_request_body(
+        operation.get("requestBody"), location + ("requestBody",)
+    )
+    responses = operation.get("responses")
+    if isinstance(responses, Mapping):
+        for status, response in responses.items():
+            yield from _iter_response(response, location + ("responses", status))
+
+
+def iter_document_schemas(
+    doc: Mapping[str, Any], include_components: bool = True
+) -> Iterator[SchemaSlot]:
+    """Yield every top-level schema position in ``doc``.
+
+    Positions are the schemas attached to parameters, headers, request bodies
+    and responses, plus (with ``include_components``) the entries of
+    ``components/schemas``.  Nested subschemas are not included; use
+    :func:`iter_subschemas` to descend.
+    """
+    components = doc.get("components")
+    if isinstance(components, Mapping):
+        loc = ("components",)
+        schemas = components.get("schemas")
+        if include_components and isinstance(schemas, Mapping):
+            for name, schema in schemas.items():
+                if isinstance(schema, Mapping):
+                    yield schemas, name, loc + ("schemas", name)
+        for name, param in (components.get("parameters") or {}).items():
+            yield from _iter_parameter(param, loc + ("parameters", name))
+        yield from _iter_headers(components.get("headers"), loc + ("headers",))
+        for name, body in (components.get("requestBodies") or {}).items():
+            yield from _iter_request_body(body, loc + ("requestBodies", name))
+        for name, response in (components.get("responses") or {}).items():
+            yield from _iter_response(response, loc + ("responses", name))
+
+    paths = doc.get("paths")
+    if isinstance(paths, Mapping):
+        for path, item in paths.items():
+            if not isinstance(item, Mapping):
+                continue
+            for idx, param in enumerate(item.get("parameters") or ()):
+                yield from _iter_parameter(param, ("paths", path, "parameters", idx))
+    for path, method, operation in iter_operations(doc):
+        yield from _iter_operation(operation, ("paths", path, method))
+
+
+def discriminator_ref(target: str) -> str:
+    """Return the ``$ref`` a discriminator ``mapping`` value stands for.
+
+    Values are either references or bare schema names; ``Cat`` stands for
+    ``#/components/schemas/Cat``.
+    """
+    if "#" in target or "/" in target:
+        return target
+    return "#/components/schemas/" + escape_token(target)
+
+
+def iter_refs(node: Any, mappings: bool = False) -> Iterator[str]:
+    """Yield every ``$ref`` string found anywhere inside ``node``.
+
+    With ``mappings``, the targets of discriminator ``mapping``s are yielded
+    too, as references (see :func:`discriminator_ref`).
+    """
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        # Exact type checks first: ABC isinstance checks dominate otherwise.
+        cls = type(value)
+        if cls in _SCALAR_TYPES:
+            continue
+        if cls is dict or (cls is not list and isinstance(value, Mapping)):
+            ref = value.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            if mappings:
+                discriminator = value.get("discriminator")
+                if isinstance(discriminator, Mapping):
+                    mapping = discriminator.get("mapping")
+                    if isinstance(mapping, Mapping):
+                        for target in mapping.values():
+                            if isinstance(target, str):
+                                yield discriminator_ref(target)
+            stack.extend(value.values())
+        elif cls is list or isinstance(value, list):
+            stack.extend(value)
@@ -0,0 +1,111 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from oapi_builder.aio import SpecEndpoint, aiter_json, build_async, render_async
+from oapi_builder.profiling import profile
+
+DOC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {f"/items/{n}": {"get": {"responses": {}}} for n in range(50)},
+}
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_build_and_render_off_the_loop():
+    async def build_coroutine():
+        return DOC
+
+    assert _run(build_async(dict, DOC)) == DOC
+    assert _run(build_async(build_coroutine)) is DOC
+    assert json.loads(_run(render_async(DOC))) == DOC
+    with pytest.raises(ValueError):
+        _run(render_async(DOC, "xml"))
+
+
+def test_offloaded_work_is_profiled():
+    async def main():
+        with profile() as profiler:
+            await render_async(DOC)
+            await SpecEndpoint(lambda: DOC).body()
+        return profiler
+
+    profiler = _run(main())
+    assert profiler.phases["serialization"].calls == 2
+
+
+def test_aiter_json_streams_chunks():
+    chunks = _run(_collect(aiter_json(DOC, chunk_size=256)))
+    assert len(chunks) > 1
+    assert json.loads(b"".join(chunks)) == DOC
+
+
+def test_endpoint_builds_once_for_concurrent_requests():
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return DOC
+
+    endpoint = SpecEndpoint(build)
+
+    async def main():
+        return await asyncio.gather(*(endpoint.body() for _ in range(5)))
+
+    bodies = _run(main())
+    assert len(set(bodies)) == 1
+    assert calls == [1]
+    assert endpoint.builds == 1 and endpoint.cached
+    endpoint.invalidate()
+    assert not endpoint.cached
+    _run(endpoint.body())
+    assert endpoint.builds == 2
+
+
+def _asgi(endpoint, method="GET", headers=()):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "headers": list(headers)}
+    _run(endpoint(scope, None, send))
+    start, body = sent
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def test_asgi_application():
+    endpoint = SpecEndpoint(lambda: DOC)
+    status, headers, body = _asgi(endpoint, headers=[(b"Accept-Encoding", b"gzip")])
+    assert status == 200
+    assert headers[b"content-encoding"] == b"gzip"
+    assert json.loads(gzip.decompress(body)) == DOC
+    etag = headers[b"etag"]
+    status, _, body = _asgi(endpoint, headers=[(b"if-none-match", etag)])
+    assert (status, body) == (304, b"")
+    status, _, body = _asgi(endpoint, method="HEAD")
+    assert (status, body) == (200, b"")
+    with pytest.raises(RuntimeError):
+        _run(endpoint({"type": "websocket"}, None, None))
+
+
+def test_canonical_rendering():
+    reordered = dict(reversed(list(DOC.items())))
+    assert _run(render_async(reordered, canonical=True)) == _run(
+        render_async(DOC, canonical=True)
+    )
+    assert _run(render_async(reordered)) != _run(render_async(DOC))
+    first = _run(SpecEndpoint(lambda: DOC, canonical=True).rendered())
+    second = _run(SpecEndpoint(lambda: reordered, canonical=True).rendered())
+    assert first.etag == second.etag
@@ -0,0 +1,57 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+
+from oapi_builder.batch import BatchBuildError, build_many, render
+
+
+def build(definition):
+    if definition.get("fail"):
+        raise RuntimeError(f"cannot build {definition['title']}")
+    return {
+        "openapi": "3.0.3",
+        "paths": {},
+        "info": {"version": "1", "title": definition["title"]},
+    }
+
+
+DEFINITIONS = {name: {"title": name} for name in ("c", "a", "b")}
+
+
+def test_results_are_ordered_by_name():
+    results = build_many(DEFINITIONS, build, max_workers=2)
+    assert list(results) == ["a", "b", "c"]
+    assert json.loads(results["b"])["info"]["title"] == "b"
+
+
+def test_failures_are_collected():
+    definitions = dict(DEFINITIONS, d={"title": "d", "fail": True})
+    with pytest.raises(BatchBuildError) as info:
+        build_many(definitions, build, executor=ThreadPoolExecutor(2))
+    (failure,) = info.value.failures
+    assert failure.name == "d"
+    assert failure.error == "RuntimeError: cannot build d"
+    assert "Traceback" in failure.traceback
+    assert list(info.value.results) == ["a", "b", "c"]
+
+
+def test_outputs_are_written(tmp_path):
+    build_many(DEFINITIONS, build, fmt="yaml", max_workers=1, output_dir=str(tmp_path))
+    loaded = yaml.safe_load((tmp_path / "a.yaml").read_text())
+    assert loaded["info"]["title"] == "a"
+
+
+def test_canonical_rendering_ignores_insertion_order():
+    doc = build({"title": "x"})
+    assert render(doc) != render(dict(reversed(list(doc.items()))))
+    assert render(doc, canonical=True) == render(
+        dict(reversed(list(doc.items()))), canonical=True
+    )
+    assert render(doc, canonical=True).startswith(b'{"openapi":"3.0.3","info":')
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        build_many(DEFINITIONS, build, fmt="xml")
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks"))
+
+import bench_suite  # noqa: E402
+from synthetic import SCENARIOS  # noqa: E402
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_every_phase_runs_on_a_small_spec(scenario):
+    phases = dict(bench_suite._phases(scenario, 5))
+    assert list(phases) == ["build", "resolve", "validate", "render"]
+    assert phases["validate"]() > 0  # raises if an example payload is invalid
+    assert phases["render"]().startswith(b"{")
+    phases["build"]()
+    phases["resolve"]()
+
+
+def test_compare_counts_regressions_beyond_tolerance(capsys):
+    baselines = {"flat/5": {"build": {"seconds": 1.0, "peak_mb": 0}}}
+    results = {
+        "flat/5": {
+            "build": {"seconds": 1.2, "peak_mb": 9.0},
+            "render": {"seconds": 9.0, "peak_mb": 9.0},
+        },
+        "deep/5": {"build": {"seconds": 9.0, "peak_mb": 9.0}},
+    }
+    assert bench_suite.compare(results, baselines, 0.25) == 0
+    assert bench_suite.compare(results, baselines, 0.1) == 1
+    assert "REGRESSION flat/5 build seconds" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from oapi_builder.bulk import iter_validate_jsonl, validate_jsonl, validate_many
+from oapi_builder.validators import SchemaCompiler
+
+SCHEMA = {
+    "type": "object",
+    "required": ["id"],
+    "properties": {"id": {"type": "integer"}},
+}
+
+
+@pytest.fixture
+def validator():
+    return SchemaCompiler().compile(SCHEMA)
+
+
+def test_validate_many_reuses_repeated_objects(validator):
+    good, bad = {"id": 1}, {"id": "x"}
+    report = validate_many(validator, [good, bad, good, bad, {}, 3])
+    assert report.total == 6
+    assert sorted(report.errors) == [1, 3, 4, 5]
+    assert report.reused == 2
+    assert not report.valid
+    assert report.to_dict()["invalid"] == 4
+
+
+def test_validate_many_without_cache(validator):
+    good = {"id": 1}
+    report = validate_many(validator, [good, good], cache_size=0)
+    assert report.valid
+    assert report.reused == 0
+
+
+LINES = b'{"id": 1}\n\n{"id": "x"}\n{"id": 1}\nnot json\n{"id": "x"}\n'
+
+
+def test_validate_jsonl_reuses_identical_lines(validator, tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_bytes(LINES)
+    report = validate_jsonl(validator, str(path))
+    assert report.total == 5
+    assert sorted(report.errors) == [3, 5, 6]
+    assert report.errors[5][0].keyword == "json"
+    assert report.reused == 2
+    assert validate_jsonl(validator, io.BytesIO(LINES)).to_dict() == report.to_dict()
+
+
+def test_iter_validate_jsonl_is_lazy(validator):
+    results = iter_validate_jsonl(validator, io.BytesIO(LINES))
+    first = next(results)
+    assert (first.index, first.valid) == (1, True)
+    assert [result.index for result in results] == [3, 4, 5, 6]
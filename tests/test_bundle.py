@@ -0,0 +1,136 @@
+import json
+
+import pytest
+import yaml
+
+from oapi_builder import encoding
+from oapi_builder.bundle import Bundler
+from oapi_builder.errors import RefCycleError
+
+ERROR_REF = "common.yaml#/components/schemas/Error"
+
+
+def _write(path, doc):
+    if path.suffix == ".yaml":
+        path.write_text(yaml.safe_dump(doc))
+    else:
+        path.write_text(json.dumps(doc))
+
+
+@pytest.fixture
+def spec(tmp_path):
+    _write(
+        tmp_path / "common.yaml",
+        {
+            "components": {
+                "schemas": {
+                    "Error": {
+                        "type": "object",
+                        "properties": {
+                            "detail": {"$ref": "#/components/schemas/Detail"}
+                        },
+                    },
+                    "Detail": {"type": "string"},
+                    "Node": {
+                        "properties": {"next": {"$ref": "#/components/schemas/Node"}}
+                    },
+                }
+            }
+        },
+    )
+    _write(tmp_path / "pet.json", {"type": "object"})
+    _write(
+        tmp_path / "root.yaml",
+        {
+            "openapi": "3.0.3",
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "responses": {
+                            200: {
+                                "description": "ok",
+                                "content": {
+                                    "application/json": {"schema": {"$ref": "pet.json"}}
+                                },
+                            },
+                            "default": {
+                                "description": "error",
+                                "content": {
+                                    "application/json": {"schema": {"$ref": ERROR_REF}}
+                                },
+                            },
+                        }
+                    }
+                },
+                "/nodes": {"$ref": "#/x-shared"},
+            },
+            "components": {"schemas": {"Error": {"type": "string"}}},
+        },
+    )
+    return tmp_path / "root.yaml"
+
+
+def _response_schema(doc, status):
+    return doc["paths"]["/pets"]["get"]["responses"][status]["content"][
+        "application/json"
+    ]["schema"]
+
+
+def test_hoist_moves_external_targets_into_components(spec):
+    doc = Bundler().bundle(str(spec))
+    schemas = doc["components"]["schemas"]
+    assert _response_schema(doc, 200) == {"$ref": "#/components/schemas/pet"}
+    assert _response_schema(doc, "default") == {"$ref": "#/components/schemas/Error2"}
+    assert schemas["Error"] == {"type": "string"}
+    assert schemas["Error2"]["properties"]["detail"] == {
+        "$ref": "#/components/schemas/Detail"
+    }
+    assert schemas["Detail"] == {"type": "string"}
+    assert doc["paths"]["/nodes"] == {"$ref": "#/x-shared"}
+
+
+def test_inline_copies_targets_in_place(spec):
+    doc = Bundler().bundle(str(spec), mode="inline")
+    assert _response_schema(doc, 200) == {"type": "object"}
+    assert _response_schema(doc, "default")["properties"]["detail"] == {
+        "type": "string"
+    }
+
+
+def test_every_file_is_parsed_once_per_bundler(spec):
+    bundler = Bundler()
+    bundler.bundle(str(spec))
+    bundler.bundle(str(spec), mode="inline")
+    assert bundler.parses == 3
+    bundler.clear()
+    bundler.bundle(str(spec))
+    assert bundler.parses == 6
+
+
+def test_integer_status_codes_render_with_every_backend(spec):
+    doc = Bundler().bundle(str(spec))
+    rendered = {encoding.dumps(doc, backend=backend) for backend in encoding.BACKENDS}
+    assert len(rendered) == 1
+    assert b'"200":' in rendered.pop()
+
+
+def test_recursive_targets_are_hoisted_even_when_inlining(tmp_path):
+    _write(tmp_path / "node.json", {"properties": {"next": {"$ref": "node.json"}}})
+    schema = {"schema": {"$ref": "node.json"}}
+    _write(
+        tmp_path / "root.json", {"paths": {}, "components": {"headers": {"X": schema}}}
+    )
+    doc = Bundler().bundle(str(tmp_path / "root.json"), mode="inline")
+    assert doc["components"]["headers"]["X"]["schema"] == {
+        "properties": {"next": {"$ref": "#/components/schemas/node"}}
+    }
+    assert doc["components"]["schemas"]["node"] == {
+        "properties": {"next": {"$ref": "#/components/schemas/node"}}
+    }
+
+
+def test_recursive_targets_of_unknown_kind_raise(tmp_path):
+    _write(tmp_path / "node.json", {"properties": {"next": {"$ref": "node.json"}}})
+    _write(tmp_path / "root.json", {"paths": {}, "x-node": {"$ref": "node.json"}})
+    with pytest.raises(RefCycleError):
+        Bundler().bundle(str(tmp_path / "root.json"))
@@ -0,0 +1,90 @@
+import os
+
+from oapi_builder.cache import BuildCache, fingerprint
+
+
+class Base:
+    name = "base"
+
+
+class Pet(Base):
+    kind = "pet"
+
+
+class Other(Base):
+    kind = "other"
+
+
+def handler():
+    return {"type": "string"}
+
+
+def test_fingerprint_is_stable_and_depends_on_source_and_extra():
+    assert fingerprint(Pet) == fingerprint(Pet)
+    assert fingerprint(Pet) != fingerprint(Other)
+    assert fingerprint(Pet, {"strict": True}) != fingerprint(Pet, {"strict": False})
+    assert fingerprint(handler) != fingerprint(Pet)
+
+
+def test_fingerprint_of_dynamic_functions():
+    namespace = {}
+    exec("def made(x: int) -> int:\n    return x", namespace)
+    exec("def other(x: str) -> int:\n    return 1", namespace)
+    assert fingerprint(namespace["made"]) != fingerprint(namespace["other"])
+
+
+def _models(source):
+    namespace = {"__name__": "models"}
+    exec(
+        "import dataclasses\n"
+        "from typing import Annotated, List\n" + source + "\n"
+        "@dataclasses.dataclass\n"
+        "class Pet:\n"
+        "    name: Name\n"
+        "    tags: List[Tag]\n",
+        namespace,
+    )
+    return namespace["Pet"]
+
+
+def test_fingerprint_follows_referenced_types():
+    tag = "@dataclasses.dataclass\nclass Tag:\n    label: {}\n"
+    alias = "Name = Annotated[str, {{'maxLength': {}}}]\n"
+    pet = _models(alias.format(3) + tag.format("str"))
+    assert fingerprint(pet) == fingerprint(_models(alias.format(3) + tag.format("str")))
+    assert fingerprint(pet) != fingerprint(_models(alias.format(3) + tag.format("int")))
+    assert fingerprint(pet) != fingerprint(_models(alias.format(5) + tag.format("str")))
+
+
+def test_get_or_build_builds_once(tmp_path):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"type": "object", "properties": {"name": {"type": "string"}}}
+
+    first = BuildCache(str(tmp_path))
+    value = first.get_or_build(Pet, build)
+    second = BuildCache(str(tmp_path))
+    assert second.get_or_build(Pet, build) == value
+    assert calls == [1]
+    assert (first.misses, second.hits) == (1, 1)
+
+
+def test_get_or_render_returns_bytes(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    data = cache.get_or_render(handler, handler)
+    assert data == b'{"type":"string"}'
+    assert cache.get_or_render(handler, lambda: None) == data
+
+
+def test_entries_are_sharded_and_clearable(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    cache.store("schema", "abcdef", [1])
+    assert os.path.exists(tmp_path / "schema" / "ab" / "abcdef")
+    assert cache.load("schema", "abcdef") == [1]
+    assert not [
+        name for name in os.listdir(tmp_path / "schema" / "ab") if ".tmp" in name
+    ]
+    cache.clear("schema")
+    assert cache.load("schema", "abcdef") is None
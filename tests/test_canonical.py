@@ -0,0 +1,82 @@
+from oapi_builder import encoding
+from oapi_builder.canonical import canonicalize, status_sort_key
+from oapi_builder.model import Document
+
+
+def _doc():
+    return {
+        "x-b": 1,
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "properties": {"z": {"type": "string"}, "a": {"type": "integer"}},
+                    "x-order": 1,
+                    "type": "object",
+                    "example": {"b": 1, "a": 2},
+                },
+                "Cat": {"type": "object"},
+            }
+        },
+        "paths": {
+            "/pets/{id}": {
+                "post": {"operationId": "p"},
+                "get": {
+                    "responses": {
+                        "default": {"description": "d"},
+                        "4XX": {"description": "c"},
+                        "404": {"description": "b"},
+                        200: {"description": "a"},
+                    },
+                    "summary": "s",
+                },
+            },
+            "/pets/mine": {},
+        },
+        "info": {"version": "1", "title": "Pets"},
+        "x-a": 2,
+        "openapi": "3.0.3",
+    }
+
+
+def test_key_order():
+    doc = canonicalize(_doc())
+    assert list(doc) == ["openapi", "info", "paths", "components", "x-a", "x-b"]
+    assert list(doc["info"]) == ["title", "version"]
+    assert list(doc["paths"]) == ["/pets/mine", "/pets/{id}"]
+    item = doc["paths"]["/pets/{id}"]
+    assert list(item) == ["get", "post"]
+    assert list(item["get"]) == ["summary", "responses"]
+    assert list(item["get"]["responses"]) == [200, "404", "4XX", "default"]
+    schemas = doc["components"]["schemas"]
+    assert list(schemas) == ["Cat", "Pet"]
+    assert list(schemas["Pet"]) == ["type", "properties", "example", "x-order"]
+    assert list(schemas["Pet"]["properties"]) == ["z", "a"]
+    assert list(schemas["Pet"]["example"]) == ["a", "b"]
+
+
+def test_equal_documents_render_identically():
+    original = _doc()
+    reordered = dict(reversed(list(original.items())))
+    assert encoding.dumps(canonicalize(original)) == encoding.dumps(
+        canonicalize(reordered)
+    )
+    assert canonicalize(original) == original
+
+
+def test_node_trees_match_plain_documents():
+    plain = _doc()
+    plain["paths"]["/pets/{id}"]["get"]["responses"] = {"200": {"description": "a"}}
+    tree = Document.from_dict(plain)
+    assert encoding.dumps(canonicalize(tree)) == encoding.dumps(canonicalize(plain))
+
+
+def test_status_sort_key():
+    codes = ["default", "5XX", "404", 200, "2xx", "201"]
+    assert sorted(codes, key=status_sort_key) == [
+        200,
+        "201",
+        "404",
+        "2xx",
+        "5XX",
+        "default",
+    ]
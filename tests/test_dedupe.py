@@ -0,0 +1,122 @@
+import copy
+
+from oapi_builder.dedupe import dedupe_schemas
+from oapi_builder.hashing import StructuralHasher, structural_hash
+
+ADDRESS = {
+    "type": "object",
+    "properties": {"street": {"type": "string"}, "city": {"type": "string"}},
+}
+
+
+def _json(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def _doc(*schemas, components=None):
+    paths = {
+        f"/r{idx}": {"get": {"responses": {"200": _json(schema)}}}
+        for idx, schema in enumerate(schemas)
+    }
+    doc = {"openapi": "3.0.3", "paths": paths}
+    if components:
+        doc["components"] = {"schemas": components}
+    return doc
+
+
+def _schema(doc, idx):
+    return doc["paths"][f"/r{idx}"]["get"]["responses"]["200"]["content"][
+        "application/json"
+    ]["schema"]
+
+
+def test_structural_hash_ignores_key_order_but_not_list_order():
+    assert structural_hash({"a": 1, "b": [1, 2]}) == structural_hash(
+        {"b": [1, 2], "a": 1}
+    )
+    assert structural_hash([1, 2]) != structural_hash([2, 1])
+
+
+def test_structural_hash_keeps_scalar_types_apart():
+    digests = {structural_hash(value) for value in (1, 1.0, True, "1", None)}
+    assert len(digests) == 5
+
+
+def test_hasher_memoizes_by_identity_until_forgotten():
+    hasher = StructuralHasher()
+    value = {"a": 1}
+    before = hasher.hash(value)
+    value["a"] = 2
+    assert hasher.hash(value) == before
+    hasher.forget(value)
+    assert hasher.hash(value) != before
+
+
+def test_repeated_schemas_are_hoisted():
+    doc = dedupe_schemas(_doc(copy.deepcopy(ADDRESS), copy.deepcopy(ADDRESS)))
+    (name,) = doc["components"]["schemas"]
+    assert doc["components"]["schemas"][name] == ADDRESS
+    assert (
+        _schema(doc, 0) == _schema(doc, 1) == {"$ref": f"#/components/schemas/{name}"}
+    )
+
+
+def test_single_occurrences_and_scalars_stay_inline():
+    doc = dedupe_schemas(
+        _doc(copy.deepcopy(ADDRESS), {"type": "string"}, {"type": "string"})
+    )
+    assert _schema(doc, 0) == ADDRESS
+    assert _schema(doc, 1) == {"type": "string"}
+    assert "components" not in doc
+
+
+def test_documents_without_duplicates_are_left_unchanged():
+    doc = _doc(copy.deepcopy(ADDRESS))
+    doc["components"] = {"parameters": {}}
+    before = copy.deepcopy(doc)
+    assert dedupe_schemas(doc) == before
+
+
+def test_inline_copies_of_components_reuse_them():
+    doc = dedupe_schemas(
+        _doc(copy.deepcopy(ADDRESS), components={"Address": copy.deepcopy(ADDRESS)})
+    )
+    assert _schema(doc, 0) == {"$ref": "#/components/schemas/Address"}
+    assert list(doc["components"]["schemas"]) == ["Address"]
+
+
+def test_inline_copies_of_scalar_components_stay_inline():
+    status = {"type": "string", "enum": ["on", "off"]}
+    doc = dedupe_schemas(
+        _doc(copy.deepcopy(status), components={"Status": copy.deepcopy(status)})
+    )
+    assert _schema(doc, 0) == status
+    doc = dedupe_schemas(
+        _doc(copy.deepcopy(status), components={"Status": copy.deepcopy(status)}),
+        is_candidate=lambda schema: "$ref" not in schema,
+    )
+    assert _schema(doc, 0) == {"$ref": "#/components/schemas/Status"}
+
+
+def test_schemas_nested_in_one_repeated_envelope_are_not_hoisted():
+    envelope = {"type": "object", "properties": {"address": copy.deepcopy(ADDRESS)}}
+    doc = dedupe_schemas(_doc(copy.deepcopy(envelope), copy.deepcopy(envelope)))
+    schemas = doc["components"]["schemas"]
+    assert len(schemas) == 1
+    (hoisted,) = schemas.values()
+    assert hoisted["properties"]["address"] == ADDRESS
+
+
+def test_names_come_from_titles_and_clashes_get_suffixes():
+    titled = dict(ADDRESS, title="Address")
+    doc = dedupe_schemas(
+        _doc(copy.deepcopy(titled), copy.deepcopy(titled)),
+    )
+    assert list(doc["components"]["schemas"]) == ["Address"]
+    doc = _doc(
+        copy.deepcopy(titled),
+        copy.deepcopy(titled),
+        components={"Address": {"type": "string"}},
+    )
+    dedupe_schemas(doc)
+    assert _schema(doc, 0) == {"$ref": "#/components/schemas/Address2"}
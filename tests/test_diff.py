@@ -0,0 +1,152 @@
+from oapi_builder.diff import Change, diff_documents
+
+R = "#/components/schemas/"
+
+
+def _doc():
+    return {
+        "openapi": "3.0.3",
+        "paths": {
+            "/pets": {
+                "parameters": [{"name": "limit", "in": "query"}],
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {
+                                "application/json": {"schema": {"$ref": R + "Pet"}}
+                            },
+                        }
+                    }
+                },
+                "post": {
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "string", "maxLength": 10}
+                            }
+                        }
+                    },
+                    "responses": {"201": {"description": "created"}},
+                },
+            }
+        },
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "type": "object",
+                    "required": ["name"],
+                    "properties": {
+                        "name": {"type": "string"},
+                        "kind": {"enum": ["cat", "dog"]},
+                    },
+                }
+            }
+        },
+    }
+
+
+def _changes(old, new):
+    return [
+        (change.kind, change.action, change.location, change.breaking)
+        for change in diff_documents(old, new)
+    ]
+
+
+def test_identical_documents():
+    diff = diff_documents(_doc(), _doc())
+    assert not diff
+    assert len(diff) == 0
+    assert diff.to_dict() == {"breaking": False, "changes": []}
+
+
+def test_operations_added_and_removed():
+    new = _doc()
+    new["paths"]["/pets"]["delete"] = new["paths"]["/pets"].pop("post")
+    assert _changes(_doc(), new) == [
+        ("operation", "removed", "/paths/~1pets/post", True),
+        ("operation", "added", "/paths/~1pets/delete", False),
+    ]
+
+
+def test_parameters():
+    new = _doc()
+    new["paths"]["/pets"]["parameters"][0]["required"] = True
+    new["paths"]["/pets"]["get"]["parameters"] = [
+        {"name": "sort", "in": "query"},
+        {"name": "X-Id", "in": "header", "required": True},
+    ]
+    assert _changes(_doc(), new) == [
+        ("parameter", "changed", "/paths/~1pets/parameters/0", True),
+        ("parameter", "added", "/paths/~1pets/get/parameters/0", False),
+        ("parameter", "added", "/paths/~1pets/get/parameters/1", True),
+        # path item parameters are compared for each operation
+        ("parameter", "changed", "/paths/~1pets/parameters/0", True),
+    ]
+    assert _changes(new, _doc())[:3] == [
+        ("parameter", "removed", "/paths/~1pets/get/parameters/0", True),
+        ("parameter", "removed", "/paths/~1pets/get/parameters/1", True),
+        ("parameter", "changed", "/paths/~1pets/parameters/0", False),
+    ]
+
+
+def test_schema_direction_decides_breaking():
+    widened = _doc()
+    body = widened["paths"]["/pets"]["post"]["requestBody"]
+    body["content"]["application/json"]["schema"]["maxLength"] = 20
+    (change,) = diff_documents(_doc(), widened)
+    assert change.location.endswith("/requestBody/content/application~1json/schema")
+    assert change.detail == "maxLength 10 -> 20"
+    assert not change.breaking
+    (change,) = diff_documents(widened, _doc())
+    assert change.breaking
+
+
+def test_component_schemas_are_judged_both_ways():
+    new = _doc()
+    pet = new["components"]["schemas"]["Pet"]
+    pet["properties"]["kind"]["enum"].append("bird")
+    pet["properties"]["age"] = {"type": "integer"}
+    diff = diff_documents(_doc(), new)
+    assert [(change.location, change.breaking) for change in diff] == [
+        ("/components/schemas/Pet/properties/kind", True),
+        ("/components/schemas/Pet/properties/age", False),
+    ]
+    assert diff.is_breaking
+    assert diff.breaking == [diff.changes[0]]
+
+
+def test_renamed_component_compares_targets():
+    new = _doc()
+    schemas = new["components"]["schemas"]
+    schemas["Animal"] = schemas.pop("Pet")
+    response = new["paths"]["/pets"]["get"]["responses"]["200"]
+    response["content"]["application/json"]["schema"] = {"$ref": R + "Animal"}
+    changes = diff_documents(_doc(), new).changes
+    assert changes[0] == Change(
+        "schema",
+        "changed",
+        "/paths/~1pets/get/responses/200/content/application~1json/schema",
+        False,
+        f"$ref {R}Pet -> {R}Animal",
+    )
+    assert _changes(_doc(), new)[1:] == [
+        ("schema", "removed", "/components/schemas/Pet", True),
+        ("schema", "added", "/components/schemas/Animal", False),
+    ]
+
+
+def test_responses():
+    new = _doc()
+    responses = new["paths"]["/pets"]["post"]["responses"]
+    responses["400"] = responses.pop("201")
+    assert _changes(_doc(), new) == [
+        ("response", "removed", "/paths/~1pets/post/responses/201", True),
+        ("response", "added", "/paths/~1pets/post/responses/400", False),
+    ]
+
+
+def test_change_repr_and_dict():
+    change = Change("operation", "added", "/paths/~1a/get", False)
+    assert repr(change) == "<Change added operation /paths/~1a/get (non-breaking)>"
+    assert change.to_dict()["kind"] == "operation"
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from oapi_builder import encoding
+from oapi_builder.model import Operation, Response
+from oapi_builder.serialize import iter_json
+
+pytestmark = pytest.mark.skipif(encoding.orjson is None, reason="needs orjson")
+
+VALUES = [
+    {"a": 1, "b": [True, False, None], "c": {"d": 'é ☃ 😀 \n " \\'}},
+    {"numbers": [0, -1, 2**63 - 1, 0.1, 1.5, -2.25, 1e16, 1e-05, 1e-07, 123.456]},
+    {"inf": float("inf"), "nan": float("nan"), "ninf": float("-inf")},
+    {200: {"description": "ok"}, 404: {}, True: 1, None: [], "default": {}},
+    [],
+    {},
+    "text",
+]
+
+
+@pytest.mark.parametrize("indent", [False, True])
+@pytest.mark.parametrize("value", VALUES)
+def test_backends_are_byte_identical(value, indent):
+    assert encoding.dumps(value, indent, backend="orjson") == encoding.dumps(
+        value, indent, backend="json"
+    )
+
+
+def test_non_string_keys_become_strings():
+    data = encoding.dumps({200: {"description": "ok"}}, backend="orjson")
+    assert json.loads(data) == {"200": {"description": "ok"}}
+    assert [encoding.key_str(key) for key in (200, True, None, "x")] == [
+        "200",
+        "true",
+        "null",
+        "x",
+    ]
+
+
+def test_integer_status_codes_of_nodes():
+    operation = Operation(responses={200: Response(description="ok")})
+    for backend in encoding.BACKENDS:
+        assert encoding.dumps(operation, backend=backend) == (
+            b'{"responses":{"200":{"description":"ok"}}}'
+        )
+    doc = {"paths": {"/": {"get": operation}}}
+    assert "".join(iter_json(doc)).encode() == encoding.dumps(doc)
+
+
+def test_wide_integers_fall_back_to_the_stdlib():
+    value = {"big": 2**70}
+    assert encoding.dumps(value, backend="orjson") == b'{"big":1180591620717411303424}'
+    assert encoding.loads(b"[1180591620717411303424]", backend="orjson") == [2**70]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        encoding.dumps({}, backend="ujson")
@@ -0,0 +1,161 @@
+from oapi_builder.graph import ReferenceGraph, component_refs, prune_unused
+
+R = "#/components/schemas/"
+
+
+def _json(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def _doc():
+    return {
+        "openapi": "3.0.3",
+        "security": [{"apiKey": []}],
+        "paths": {
+            "/pets": {
+                "parameters": [{"$ref": "#/components/parameters/Limit"}],
+                "get": {
+                    "responses": {"200": _json({"$ref": R + "Pet"})},
+                    "security": [{"oauth": ["read"]}],
+                },
+            }
+        },
+        "components": {
+            "parameters": {"Limit": {"name": "limit", "in": "query"}},
+            "schemas": {
+                "Pet": {
+                    "oneOf": [{"$ref": R + "Cat"}, {"$ref": R + "Dog"}],
+                    "discriminator": {
+                        "propertyName": "kind",
+                        "mapping": {
+                            "cat": "Cat",
+                            "dog": R + "Dog",
+                            "bird": "Bird",
+                            "fish": "./fish.json#/Fish",
+                        },
+                    },
+                },
+                "Cat": {"type": "object"},
+                "Dog": {
+                    "type": "object",
+                    "properties": {"owner": {"$ref": R + "Owner"}},
+                },
+                "Bird": {"type": "object"},
+                "Owner": {"type": "object"},
+                "Unused": {"items": {"$ref": R + "AlsoUnused"}},
+                "AlsoUnused": {"type": "string"},
+            },
+            "securitySchemes": {
+                "apiKey": {"type": "apiKey", "name": "k", "in": "header"},
+                "oauth": {"type": "oauth2", "flows": {}},
+                "basic": {"type": "http", "scheme": "basic"},
+            },
+        },
+    }
+
+
+def test_edges_include_discriminator_mappings():
+    graph = ReferenceGraph(_doc())
+    assert graph.edges[("schemas", "Pet")] == (
+        ("schemas", "Cat"),
+        ("schemas", "Dog"),
+        ("schemas", "Bird"),
+    )
+    assert component_refs(_doc()["components"]["schemas"]["Pet"]) == (
+        ("schemas", "Cat"),
+        ("schemas", "Dog"),
+        ("schemas", "Bird"),
+    )
+
+
+def test_operations_include_path_parameters_and_security():
+    graph = ReferenceGraph(_doc())
+    assert graph.operations[("/pets", "get")] == (
+        ("parameters", "Limit"),
+        ("schemas", "Pet"),
+        ("securitySchemes", "oauth"),
+    )
+    assert graph.roots == (("securitySchemes", "apiKey"),)
+
+
+def test_reachable_and_unused():
+    graph = ReferenceGraph(_doc())
+    assert graph.unused() == {
+        ("schemas", "Unused"),
+        ("schemas", "AlsoUnused"),
+        ("securitySchemes", "basic"),
+    }
+    assert ("schemas", "Owner") in graph.reachable([("/pets", "get")])
+    assert graph.reachable([]) == {("securitySchemes", "apiKey")}
+
+
+def test_prune_keeps_mapping_targets():
+    doc = _doc()
+    pruned = prune_unused(doc)
+    assert list(pruned["components"]["schemas"]) == [
+        "Pet",
+        "Cat",
+        "Dog",
+        "Bird",
+        "Owner",
+    ]
+    assert list(pruned["components"]["securitySchemes"]) == ["apiKey", "oauth"]
+    assert pruned["paths"] is doc["paths"]
+    assert "Unused" in doc["components"]["schemas"]
+
+
+def test_prune_by_kind_and_sharing():
+    doc = _doc()
+    pruned = prune_unused(doc, kinds=["securitySchemes"])
+    assert pruned["components"]["schemas"] is doc["components"]["schemas"]
+    assert "basic" not in pruned["components"]["securitySchemes"]
+    clean = prune_unused(pruned, kinds=["securitySchemes"])
+    assert clean is pruned
+
+
+def _cyclic_doc():
+    return {
+        "paths": {"/a": {"get": {"responses": {"200": _json({"$ref": R + "A"})}}}},
+        "components": {
+            "schemas": {
+                "A": {"properties": {"b": {"$ref": R + "B"}, "x": {"$ref": R + "X"}}},
+                "B": {"items": {"$ref": R + "A"}},
+                "X": {"type": "string"},
+                "Self": {"properties": {"next": {"$ref": R + "Self"}}},
+                "Missing": {"items": {"$ref": R + "Gone"}},
+            }
+        },
+    }
+
+
+def test_strongly_connected_components_in_dependency_order():
+    graph = ReferenceGraph(_cyclic_doc())
+    groups = graph.strongly_connected()
+    assert groups == [
+        (("schemas", "X"),),
+        (("schemas", "A"), ("schemas", "B")),
+        (("schemas", "Self"),),
+        (("schemas", "Missing"),),
+    ]
+    assert graph.strongly_connected() is groups
+    assert graph.cyclic() == {("schemas", "A"), ("schemas", "B"), ("schemas", "Self")}
+    assert graph.topological_order() == [key for group in groups for key in group]
+
+
+def test_topological_order_puts_targets_first():
+    graph = ReferenceGraph(_doc())
+    order = graph.topological_order()
+    assert sorted(order) == sorted(graph.edges)
+    for key, targets in graph.edges.items():
+        for target in targets:
+            if target in graph.edges and target not in graph.cyclic():
+                assert order.index(target) < order.index(key)
+
+
+def test_to_dict():
+    data = ReferenceGraph(_cyclic_doc()).to_dict()
+    assert sorted(data["components"][R + "A"]) == [R + "B", R + "X"]
+    assert data["components"][R + "Missing"] == []
+    assert data["operations"] == {"GET /a": [R + "A"]}
+    assert data["cycles"] == [[R + "A", R + "B"], [R + "Self"]]
+    assert data["order"][:3] == [R + "X", R + "A", R + "B"]
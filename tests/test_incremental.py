@@ -0,0 +1,66 @@
+from oapi_builder import encoding
+from oapi_builder.incremental import IncrementalDocument
+from oapi_builder.model import Operation, Response
+
+
+def _doc(paths=20):
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Pets", "version": "1"},
+        "paths": {
+            f"/p{idx}": {"get": {"responses": {"200": {"description": f"ok {idx}"}}}}
+            for idx in range(paths)
+        },
+        "components": {"schemas": {"Pet": {"type": "object"}}},
+    }
+
+
+def test_first_render_matches_dumps():
+    doc = IncrementalDocument(_doc())
+    assert doc.render() == encoding.dumps(doc.doc)
+
+
+def test_edits_re_encode_only_changed_fragments():
+    doc = IncrementalDocument(_doc())
+    doc.render()
+    doc.encoded = 0
+    doc.set_operation("/p3", "POST", Operation(responses={201: Response()}))
+    doc.set_component("schemas", "Tag", {"type": "string"})
+    assert doc.changed == {
+        ("paths", "/p3", "post"),
+        ("components", "schemas", "Tag"),
+    }
+    assert doc.render() == encoding.dumps(doc.doc)
+    assert doc.encoded == 2
+    assert doc.changed == set()
+
+
+def test_removals_and_in_place_edits():
+    doc = IncrementalDocument(_doc())
+    doc.render()
+    doc.remove_path("/p1")
+    doc.remove_component("schemas", "Pet")
+    doc.doc["paths"]["/p2"]["get"]["summary"] = "edited"
+    doc.touch("paths", "/p2", "get")
+    doc.delete(("paths", "/missing"))
+    assert doc.render() == encoding.dumps(doc.doc)
+    assert "/p1" not in doc.doc["paths"]
+    assert b"edited" in doc.render()
+
+
+def test_direct_changes_are_picked_up_after_touch():
+    doc = IncrementalDocument(_doc())
+    doc.render()
+    doc.doc["info"] = {"title": "Replaced", "version": "2"}
+    doc.doc["paths"]["/p4"] = {"get": {"responses": {}}}
+    doc.touch("info")
+    doc.touch("paths", "/p4")
+    doc.encoded = 0
+    assert doc.render() == encoding.dumps(doc.doc)
+    # The two fields of the new info object and the new operation.
+    assert doc.encoded == 3
+
+
+def test_integer_keys_render_like_dumps():
+    doc = IncrementalDocument({"paths": {"/": {"get": {"responses": {200: {}}}}}})
+    assert doc.render() == b'{"paths":{"/":{"get":{"responses":{"200":{}}}}}}'
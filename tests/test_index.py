@@ -0,0 +1,109 @@
+import pytest
+
+from oapi_builder.graph import ReferenceGraph
+from oapi_builder.index import SpecIndex
+
+R = "#/components/schemas/"
+
+
+def _json(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def _doc():
+    return {
+        "openapi": "3.0.3",
+        "security": [{"oauth": ["read"]}],
+        "tags": [{"name": "billing"}, {"name": "pets"}, "loose"],
+        "paths": {
+            "/billing/invoices": {
+                "get": {
+                    "tags": ["billing"],
+                    "x-audience": ["partner", "internal"],
+                    "responses": {"200": _json({"$ref": R + "Invoice"})},
+                },
+                "post": {
+                    "tags": ["billing"],
+                    "security": [{"oauth": ["write"]}],
+                    "responses": {"201": {}},
+                },
+            },
+            "/billingx": {"get": {"security": [{}], "responses": {}}},
+            "/pets": {
+                "summary": "Pets",
+                "get": {
+                    "tags": ["pets"],
+                    "x-audience": "partner",
+                    "security": [{"apiKey": []}],
+                    "responses": {"200": _json({"$ref": R + "Pet"})},
+                },
+            },
+        },
+        "components": {
+            "schemas": {
+                "Invoice": {"type": "object"},
+                "Pet": {
+                    "oneOf": [{"$ref": R + "Cat"}],
+                    "discriminator": {
+                        "propertyName": "kind",
+                        "mapping": {"cat": "Cat", "dog": "Dog"},
+                    },
+                },
+                "Cat": {"type": "object"},
+                "Dog": {"type": "object"},
+                "Unused": {"type": "object"},
+            },
+            "securitySchemes": {
+                "oauth": {"type": "oauth2", "flows": {}},
+                "apiKey": {"type": "apiKey", "in": "header", "name": "k"},
+            },
+        },
+    }
+
+
+INVOICES_GET = ("/billing/invoices", "get")
+INVOICES_POST = ("/billing/invoices", "post")
+BILLINGX = ("/billingx", "get")
+PETS = ("/pets", "get")
+
+
+@pytest.fixture
+def index():
+    return SpecIndex(_doc())
+
+
+def test_select(index):
+    assert index.select() == [INVOICES_GET, INVOICES_POST, BILLINGX, PETS]
+    assert index.select(tag="billing") == [INVOICES_GET, INVOICES_POST]
+    assert index.select(path_prefix="/billing/") == [INVOICES_GET, INVOICES_POST]
+    assert index.select(extension=("x-audience", "partner")) == [INVOICES_GET, PETS]
+    assert index.select(scope="read") == [INVOICES_GET]
+    assert index.select(scheme="oauth", scope="write") == [INVOICES_POST]
+    assert index.select(scheme="apiKey") == [PETS]
+    assert index.select(public=True) == [BILLINGX]
+    assert index.select(public=False, tag="billing") == [INVOICES_GET, INVOICES_POST]
+    assert index.select(tag="billing", scope="write") == [INVOICES_POST]
+    assert index.select(tag="missing") == []
+
+
+def test_view_keeps_used_components_and_tags(index):
+    view = index.view(tag="billing", scope="read")
+    assert list(view["paths"]) == ["/billing/invoices"]
+    assert list(view["paths"]["/billing/invoices"]) == ["get"]
+    assert view["components"]["schemas"] == {"Invoice": {"type": "object"}}
+    assert list(view["components"]["securitySchemes"]) == ["oauth"]
+    assert view["tags"] == [{"name": "billing"}, "loose"]
+
+
+def test_view_keeps_discriminator_mapping_targets(index):
+    view = index.view(tag="pets")
+    assert list(view["components"]["schemas"]) == ["Pet", "Cat", "Dog"]
+    assert list(view["components"]["securitySchemes"]) == ["oauth", "apiKey"]
+    assert view["paths"]["/pets"] is index.doc["paths"]["/pets"]
+
+
+def test_index_from_an_existing_graph():
+    graph = ReferenceGraph(_doc())
+    assert SpecIndex(graph=graph).graph is graph
+    with pytest.raises(TypeError):
+        SpecIndex()
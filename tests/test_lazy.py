@@ -0,0 +1,100 @@
+import pytest
+
+from oapi_builder.lazy import ComponentLibrary, LazyComponents
+
+R = "#/components/schemas/"
+
+
+def _library(calls):
+    library = ComponentLibrary()
+
+    def schema(name, value):
+        def build():
+            calls.append(name)
+            return value
+
+        library.register("schemas", name, build)
+
+    schema(
+        "Pet",
+        {
+            "oneOf": [{"$ref": R + "Cat"}],
+            "discriminator": {
+                "propertyName": "kind",
+                "mapping": {"cat": "Cat", "dog": R + "Dog"},
+            },
+        },
+    )
+    schema("Cat", {"type": "object"})
+    schema("Dog", {"properties": {"owner": {"$ref": R + "Owner"}}})
+    schema("Owner", {"type": "object"})
+    schema("Error", {"type": "object"})
+    library.add("securitySchemes", "oauth", {"type": "oauth2", "flows": {}})
+    library.add("securitySchemes", "apiKey", {"type": "apiKey"})
+    library.add("securitySchemes", "unused", {"type": "http"})
+    return library
+
+
+def _doc():
+    schema = {"$ref": R + "Pet"}
+    return {
+        "openapi": "3.0.3",
+        "security": [{"apiKey": []}],
+        "paths": {
+            "/pets": {
+                "get": {
+                    "security": [{"oauth": ["read"]}],
+                    "responses": {
+                        "200": {"content": {"application/json": {"schema": schema}}}
+                    },
+                }
+            }
+        },
+    }
+
+
+def test_lazy_components_build_on_first_access():
+    calls = []
+    components = LazyComponents()
+    components.register("A", lambda: calls.append("A") or {"type": "string"})
+    components["B"] = {"type": "integer"}
+    assert list(components) == ["A", "B"]
+    assert not components.is_materialized("A")
+    assert components["A"] == {"type": "string"}
+    assert components["A"] == {"type": "string"}
+    assert calls == ["A"]
+    assert components.materialized() == ["A", "B"]
+    del components["A"]
+    assert "A" not in components
+
+
+def test_materialize_follows_refs_mappings_and_security():
+    calls = []
+    doc = _library(calls).materialize(_doc())
+    components = doc["components"]
+    assert sorted(components["schemas"]) == ["Cat", "Dog", "Owner", "Pet"]
+    assert sorted(components["securitySchemes"]) == ["apiKey", "oauth"]
+    assert "Error" not in calls
+
+
+def test_materialize_keeps_existing_components():
+    doc = _doc()
+    doc["components"] = {"schemas": {"Pet": {"type": "string"}}}
+    calls = []
+    _library(calls).materialize(doc)
+    assert doc["components"]["schemas"] == {"Pet": {"type": "string"}}
+    assert calls == []
+
+
+def test_materialized_components_are_copies():
+    library = _library([])
+    first = library.materialize(_doc())
+    second = library.materialize(_doc())
+    first["components"]["schemas"]["Cat"]["type"] = "string"
+    assert second["components"]["schemas"]["Cat"] == {"type": "object"}
+    assert library.get("schemas", "Cat") == {"type": "object"}
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        ComponentLibrary().register("widgets", "A", dict)
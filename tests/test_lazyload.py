@@ -0,0 +1,113 @@
+import builtins
+import io
+import json
+
+import pytest
+
+from oapi_builder import lazyload
+from oapi_builder.errors import RefResolutionError
+from oapi_builder.lazyload import LazyObject, LazySpec, SpecSyntaxError
+
+DOC = {
+    "openapi": "3.0.3",
+    "info": {"title": 'Pets é "quoted" {braces}', "version": "1"},
+    "paths": {
+        "/pets": {"get": {"tags": ["a", "[b]"], "responses": {"200": {}}}},
+        "/pets/{id}": {"get": {"parameters": [{"name": "id", "in": "path"}]}},
+    },
+    "components": {"schemas": {"Pet": {"type": "object", "nullable": True}}},
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(DOC, indent=2))
+    return str(path)
+
+
+def _written(spec):
+    out = io.BytesIO()
+    spec.write(out)
+    return json.loads(out.getvalue())
+
+
+def test_get_parses_only_the_requested_value(path):
+    with LazySpec(path) as spec:
+        assert spec.get("/info/title") == DOC["info"]["title"]
+        assert spec.get("/paths/~1pets~1{id}/get/parameters/0/name") == "id"
+        assert spec.get("/components") == DOC["components"]
+        assert isinstance(spec["paths"], LazyObject)
+        assert sorted(spec["paths"]) == ["/pets", "/pets/{id}"]
+        with pytest.raises(RefResolutionError):
+            spec.get("/paths/missing")
+
+
+def test_object_ends_are_found_lazily(path):
+    with LazySpec(path) as spec:
+        spec.get("/openapi")
+        assert spec.root._end is None
+        paths = spec["paths"]
+        assert paths._end is None
+        assert spec.root.raw() == open(path, "rb").read().strip()
+        assert paths.load() == DOC["paths"]
+
+
+def test_patch_and_delete_round_trip(path):
+    with LazySpec(path) as spec:
+        spec.patch("/info/title", "Renamed")
+        spec.patch("/paths/~1pets/get/summary", "List pets")
+        spec.patch("/paths/~1pets/get/responses/404", {"description": "gone"})
+        spec.delete("/components/schemas/Pet/nullable")
+        spec.delete("/paths/~1pets~1{id}")
+        written = _written(spec)
+        assert spec.get("/info/title") == "Renamed"
+    expected = json.loads(json.dumps(DOC))
+    expected["info"]["title"] = "Renamed"
+    expected["paths"]["/pets"]["get"]["summary"] = "List pets"
+    expected["paths"]["/pets"]["get"]["responses"]["404"] = {"description": "gone"}
+    del expected["components"]["schemas"]["Pet"]["nullable"]
+    del expected["paths"]["/pets/{id}"]
+    assert written == expected
+
+
+def test_unpatched_write_is_byte_identical(path):
+    with LazySpec(path) as spec:
+        out = io.BytesIO()
+        spec.write(out)
+    assert out.getvalue() == open(path, "rb").read().strip()
+
+
+def test_patch_inside_patched_value(path):
+    with LazySpec(path) as spec:
+        spec.patch("/x-extra", {"a": 1})
+        spec.patch("/x-extra/b", 2)
+        assert _written(spec)["x-extra"] == {"a": 1, "b": 2}
+
+
+def test_invalid_patches(path):
+    with LazySpec(path) as spec:
+        with pytest.raises(ValueError):
+            spec.patch("", {})
+        with pytest.raises(TypeError):
+            spec.patch("/openapi/x", 1)
+        with pytest.raises(KeyError):
+            spec.delete("/nope")
+
+
+@pytest.mark.parametrize("text", ["", "[1, 2]", '{"a": 1'])
+def test_bad_documents_raise_and_close_the_file(tmp_path, monkeypatch, text):
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        fp = builtins.open(*args, **kwargs)
+        opened.append(fp)
+        return fp
+
+    monkeypatch.setattr(lazyload, "open", tracking_open, raising=False)
+    path = tmp_path / "bad.json"
+    path.write_text(text)
+    with pytest.raises(SpecSyntaxError):
+        with LazySpec(str(path)) as spec:
+            list(spec.root)
+    assert opened and all(fp.closed for fp in opened)
@@ -0,0 +1,170 @@
+import pytest
+
+from oapi_builder.merge import MergeConflictError, merge_documents
+
+R = "#/components/schemas/"
+
+
+def _json(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def _service(error_type, scheme):
+    return {
+        "openapi": "3.0.3",
+        "security": [{"auth": []}],
+        "paths": {
+            "/items": {
+                "get": {
+                    "operationId": "list",
+                    "responses": {"200": _json({"$ref": R + "Item"})},
+                },
+                "post": {
+                    "operationId": "create",
+                    "security": [{"auth": ["write"]}],
+                    "requestBody": _json({"$ref": R + "Item"}),
+                    "responses": {"default": _json({"$ref": R + "Error"})},
+                },
+            }
+        },
+        "components": {
+            "schemas": {
+                "Item": {
+                    "oneOf": [{"$ref": R + "Error"}, {"$ref": R + "Shared"}],
+                    "discriminator": {
+                        "propertyName": "kind",
+                        "mapping": {"error": "Error", "shared": R + "Shared"},
+                    },
+                    "properties": {"security": {"$ref": R + "Error"}},
+                },
+                "Error": {"type": error_type},
+                "Shared": {"type": "object"},
+            },
+            "securitySchemes": {"auth": scheme},
+        },
+        "tags": [{"name": "items"}],
+    }
+
+
+@pytest.fixture
+def merged():
+    return merge_documents(
+        {
+            "store": _service("object", {"type": "http", "scheme": "basic"}),
+            "admin": _service("string", {"type": "apiKey", "in": "header"}),
+        },
+        prefixes={"store": "/store", "admin": "/admin/"},
+    )
+
+
+def test_paths_are_prefixed(merged):
+    assert list(merged["paths"]) == ["/store/items", "/admin/items"]
+    assert merged["tags"] == [{"name": "items"}]
+
+
+def test_clashing_components_are_renamed_and_identical_ones_kept_once(merged):
+    schemas = merged["components"]["schemas"]
+    assert sorted(schemas) == [
+        "Error",
+        "Item",
+        "Shared",
+        "admin_Error",
+        "admin_Item",
+    ]
+    admin_item = schemas["admin_Item"]
+    assert admin_item["oneOf"] == [
+        {"$ref": R + "admin_Error"},
+        {"$ref": R + "Shared"},
+    ]
+    assert admin_item["properties"]["security"] == {"$ref": R + "admin_Error"}
+    assert admin_item["discriminator"]["mapping"] == {
+        "error": R + "admin_Error",
+        "shared": R + "Shared",
+    }
+    assert schemas["Item"]["discriminator"]["mapping"] == {
+        "error": "Error",
+        "shared": R + "Shared",
+    }
+    post = merged["paths"]["/admin/items"]["post"]
+    assert post["requestBody"] == _json({"$ref": R + "admin_Item"})
+
+
+def test_security_requirements_follow_renamed_schemes(merged):
+    assert sorted(merged["components"]["securitySchemes"]) == ["admin_auth", "auth"]
+    assert "security" not in merged
+    store, admin = merged["paths"]["/store/items"], merged["paths"]["/admin/items"]
+    assert store["get"]["security"] == [{"auth": []}]
+    assert admin["get"]["security"] == [{"admin_auth": []}]
+    assert admin["post"]["security"] == [{"admin_auth": ["write"]}]
+    assert admin["post"]["operationId"] == "admin_create"
+
+
+def test_shared_security_stays_top_level():
+    scheme = {"type": "http", "scheme": "basic"}
+    merged = merge_documents(
+        {"a": _service("object", scheme), "b": _service("object", scheme)},
+        prefixes={"b": "/b"},
+    )
+    assert merged["security"] == [{"auth": []}]
+    assert sorted(merged["components"]["schemas"]) == ["Error", "Item", "Shared"]
+    assert "security" not in merged["paths"]["/b/items"]["get"]
+
+
+def test_dedupe_is_undone_when_a_mapping_target_differs():
+    def service(cat_type):
+        return {
+            "paths": {},
+            "components": {
+                "schemas": {
+                    "Pet": {
+                        "discriminator": {
+                            "propertyName": "kind",
+                            "mapping": {"cat": "Cat"},
+                        }
+                    },
+                    "Cat": {"type": cat_type},
+                }
+            },
+        }
+
+    merged = merge_documents({"a": service("object"), "b": service("string")})
+    schemas = merged["components"]["schemas"]
+    assert sorted(schemas) == ["Cat", "Pet", "b_Cat", "b_Pet"]
+    assert schemas["b_Pet"]["discriminator"]["mapping"] == {"cat": R + "b_Cat"}
+    assert schemas["Pet"]["discriminator"]["mapping"] == {"cat": "Cat"}
+
+
+def test_callback_security_is_renamed():
+    def service(scheme_type):
+        callback = {"{$url}": {"post": {"security": [{"auth": []}]}}}
+        return {
+            "paths": {"/hooks": {"post": {"callbacks": {"done": callback}}}},
+            "components": {"securitySchemes": {"auth": {"type": scheme_type}}},
+        }
+
+    merged = merge_documents(
+        {"a": service("http"), "b": service("apiKey")}, prefixes={"b": "/b"}
+    )
+    callback = merged["paths"]["/b/hooks"]["post"]["callbacks"]["done"]
+    assert callback["{$url}"]["post"]["security"] == [{"b_auth": []}]
+
+
+def test_conflicts():
+    with pytest.raises(MergeConflictError):
+        merge_documents(
+            {
+                "a": _service("object", {"type": "http"}),
+                "b": _service("string", {"type": "http"}),
+            },
+            prefixes={"b": "/b"},
+            conflicts="error",
+        )
+    with pytest.raises(MergeConflictError):
+        merge_documents(
+            {
+                "a": _service("object", {"type": "http"}),
+                "b": _service("object", {"type": "http"}),
+            }
+        )
+    with pytest.raises(ValueError):
+        merge_documents({}, conflicts="skip")
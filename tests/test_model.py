@@ -0,0 +1,126 @@
+import sys
+
+from oapi_builder.model import (
+    Document,
+    Info,
+    Operation,
+    Parameter,
+    PathItem,
+    Reference,
+    Response,
+    Schema,
+    to_plain,
+)
+
+PLAIN = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1.0", "x-logo": "logo.png"},
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "parameters": [{"name": "limit", "in": "query", "required": False}],
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {"$ref": "#/components/schemas/Pet"},
+                                }
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": {"type": "string", "minLength": 1}},
+                "additionalProperties": False,
+            }
+        }
+    },
+}
+
+
+def test_from_dict_to_dict_round_trip():
+    doc = Document.from_dict(PLAIN)
+    assert isinstance(doc.paths["/pets"], PathItem)
+    assert isinstance(doc.paths["/pets"].get.parameters[0], Parameter)
+    items = doc.paths["/pets"].get.responses["200"].content["application/json"]
+    assert isinstance(items.schema.items, Reference)
+    assert doc.to_dict() == PLAIN
+
+
+def test_unknown_keys_round_trip_verbatim():
+    plain = {
+        "type": "object",
+        "foo_bar": 1,
+        "additional_properties": False,
+        "minLength": 2,
+        "x-snake_case": True,
+    }
+    schema = Schema.from_dict(plain)
+    assert schema.additional_properties is None
+    assert schema.extra == {
+        "foo_bar": 1,
+        "additional_properties": False,
+        "minLength": 2,
+        "x-snake_case": True,
+    }
+    assert schema.to_dict() == plain
+
+
+def test_fields_use_camel_case_and_rare_keywords_go_to_extra():
+    schema = Schema(type="string", min_length=1, additional_properties=False)
+    schema["x-internal"] = True
+    assert schema.extra == {"minLength": 1, "x-internal": True}
+    assert schema.to_dict() == {
+        "type": "string",
+        "additionalProperties": False,
+        "minLength": 1,
+        "x-internal": True,
+    }
+    assert Parameter(name="id", in_="path").to_dict() == {"name": "id", "in": "path"}
+
+
+def test_nodes_without_extras_do_not_allocate_a_dict():
+    assert Schema(type="string").extra is None
+    assert not hasattr(Schema(), "__dict__")
+
+
+def test_repeated_strings_are_interned():
+    first = Schema.from_dict({"type": "".join(["str", "ing"])})
+    second = Schema.from_dict({"type": "".join(["stri", "ng"])})
+    assert first.type is second.type is sys.intern("string")
+    key = "".join(["na", "me"])
+    schema = Schema(properties={key: Schema()})
+    assert next(iter(schema.properties)) is sys.intern("name")
+
+
+def test_equality_and_repr():
+    assert Info(title="a", version="1") == Info(title="a", version="1")
+    assert Info(title="a", version="1") != Info(title="a", version="2")
+    assert repr(Info(title="a")) == "Info(title='a')"
+
+
+def test_document_defaults_openapi_version():
+    assert Document().to_dict() == {"openapi": "3.0.3"}
+
+
+def test_to_plain_shares_plain_values():
+    plain = {"a": [1, {"b": 2}]}
+    assert to_plain(plain) is plain
+    mixed = {"op": Operation(responses={"204": Response(description="none")})}
+    assert to_plain(mixed) == {"op": {"responses": {"204": {"description": "none"}}}}
+
+
+def test_path_item_operations():
+    item = PathItem(get=Operation(), delete=Operation())
+    assert [method for method, _ in item.operations()] == ["get", "delete"]
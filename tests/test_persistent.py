@@ -0,0 +1,157 @@
+import copy
+
+import pytest
+
+from oapi_builder.errors import RefResolutionError
+from oapi_builder.persistent import (
+    assoc,
+    dissoc,
+    filter_operations,
+    prune,
+    public_view,
+    strip_extensions,
+    tenant_view,
+)
+
+SHARED = {"type": "string"}
+R = "#/components/schemas/"
+
+
+def _doc():
+    return {
+        "openapi": "3.0.3",
+        "x-owner": "team",
+        "paths": {
+            "/pets": {
+                "get": {"x-tenants": ["a"], "responses": {"200": {}}},
+                "post": {"responses": {"201": {}}},
+            },
+            "/admin": {"x-internal": True, "get": {"responses": {}}},
+            "/audit": {"delete": {"x-internal": True, "responses": {}}},
+        },
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "type": "object",
+                    "required": ["name", "secret"],
+                    "properties": {
+                        "name": SHARED,
+                        "secret": {"type": "string", "x-internal": True},
+                    },
+                },
+                "Name": SHARED,
+                "Tags": {"type": "array", "items": [SHARED, {"x-internal": 1}]},
+            }
+        },
+    }
+
+
+def test_assoc_and_dissoc_copy_only_the_path():
+    doc = _doc()
+    before = copy.deepcopy(doc)
+    changed = assoc(doc, ("components", "schemas", "Pet", "type"), "string")
+    assert changed["components"]["schemas"]["Pet"]["type"] == "string"
+    assert changed["paths"] is doc["paths"]
+    assert changed["components"]["schemas"]["Name"] is SHARED
+    assert assoc(doc, ("openapi",), "3.0.3") is doc
+    added = assoc(doc, ("info", "title"), "Pets")
+    assert added["info"] == {"title": "Pets"}
+    removed = dissoc(doc, ("paths", "/pets", "get"))
+    assert list(removed["paths"]["/pets"]) == ["post"]
+    assert dissoc(doc, ("paths", "/missing", "get")) is doc
+    assert dissoc(doc, ("components", "schemas", "Tags", "items", 1)) is not doc
+    with pytest.raises(ValueError):
+        dissoc(doc, ())
+    assert doc == before
+
+
+def test_public_view_shares_untouched_subtrees():
+    doc = _doc()
+    before = copy.deepcopy(doc)
+    view = public_view(doc)
+    assert list(view["paths"]) == ["/pets"]
+    assert view["paths"]["/pets"] is doc["paths"]["/pets"]
+    pet = view["components"]["schemas"]["Pet"]
+    assert pet["required"] == ["name"]
+    assert list(pet["properties"]) == ["name"]
+    assert view["components"]["schemas"]["Tags"]["items"] == [SHARED]
+    assert view["components"]["schemas"]["Name"] is SHARED
+    assert doc == before
+
+
+def test_tenant_view():
+    doc = _doc()
+    assert "get" in tenant_view(doc, "a")["paths"]["/pets"]
+    hidden = tenant_view(doc, "b")
+    assert list(hidden["paths"]["/pets"]) == ["post"]
+    assert "x-tenants" not in tenant_view(doc, "a")["paths"]["/pets"]["get"]
+
+
+def test_views_keep_integer_status_codes():
+    responses = {200: {"description": "ok"}, "default": {"description": "error"}}
+    doc = {"paths": {"/pets": {"get": {"x-tenants": ["a"], "responses": responses}}}}
+    assert public_view(doc)["paths"]["/pets"]["get"]["responses"] is responses
+    assert tenant_view(doc, "a")["paths"]["/pets"]["get"]["responses"] is responses
+
+
+def _referencing_doc():
+    def get(name, **extra):
+        schema = {"$ref": R + name}
+        content = {"application/json": {"schema": schema}}
+        return {"get": {"responses": {"200": {"content": content}}, **extra}}
+
+    return {
+        "paths": {
+            "/pets": get("Pet"),
+            "/admin": get("Audit", **{"x-internal": True}),
+        },
+        "components": {
+            "schemas": {
+                "Pet": {"properties": {"owner": {"$ref": R + "Owner"}}},
+                "Owner": {"type": "object"},
+                "Audit": {"properties": {"by": {"$ref": R + "Actor"}}},
+                "Actor": {"type": "object"},
+                "Spare": {"type": "object"},
+            }
+        },
+    }
+
+
+def test_public_view_drops_components_only_removed_content_used():
+    doc = _referencing_doc()
+    view = public_view(doc)
+    assert list(view["components"]["schemas"]) == ["Pet", "Owner", "Spare"]
+    assert view["components"]["schemas"]["Pet"] is doc["components"]["schemas"]["Pet"]
+
+
+def test_public_view_refuses_dangling_references():
+    doc = _referencing_doc()
+    doc["components"]["schemas"]["Owner"]["x-internal"] = True
+    with pytest.raises(RefResolutionError, match="schemas/Owner"):
+        public_view(doc)
+
+
+def test_strip_extensions():
+    doc = _doc()
+    assert "x-owner" not in strip_extensions(doc)
+    only = strip_extensions(doc, ["x-owner"])
+    assert "x-owner" not in only
+    assert only["paths"] is doc["paths"]
+    assert strip_extensions({"openapi": "3.0.3"}) == {"openapi": "3.0.3"}
+
+
+def test_filter_operations():
+    doc = _doc()
+    reads = filter_operations(doc, lambda path, method, operation: method == "get")
+    assert list(reads["paths"]) == ["/pets", "/admin"]
+    assert list(reads["paths"]["/pets"]) == ["get"]
+    assert reads["paths"]["/admin"] is doc["paths"]["/admin"]
+    assert filter_operations(doc, lambda *args: True) is doc
+
+
+def test_prune_rewrites_shared_objects_once():
+    doc = _doc()
+    pruned = prune(doc, drop_key=lambda key: key == "type")
+    schemas = pruned["components"]["schemas"]
+    assert schemas["Name"] == {}
+    assert schemas["Name"] is schemas["Pet"]["properties"]["name"]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+
+from oapi_builder.batch import render
+from oapi_builder.profiling import phase, profile
+from oapi_builder.validators import SchemaCompiler
+
+
+def test_spans_do_nothing_without_a_profiler():
+    with phase("dedupe") as span:
+        assert span is None
+
+
+def test_nested_spans_split_self_time():
+    with profile() as profiler:
+        with phase("schema_generation", "Pet"):
+            time.sleep(0.01)
+            with phase("ref_resolution", "#/Owner"):
+                time.sleep(0.01)
+            with phase("schema_generation", "Owner"):
+                time.sleep(0.01)
+    generation = profiler.phases["schema_generation"]
+    resolution = profiler.phases["ref_resolution"]
+    assert generation.calls == 2
+    # the nested span of the same phase is not counted twice in wall time
+    assert generation.wall <= profiler.wall
+    assert generation.self_wall >= 0.02
+    assert resolution.self_wall >= 0.01
+    assert profiler.components[("schema_generation", "Pet")].calls == 1
+
+
+def test_library_passes_are_instrumented():
+    with profile() as profiler:
+        validator = SchemaCompiler().compile({"type": "string"}, name="name")
+        validator.errors("x")
+        render({"a": 1}, "yaml")
+    report = profiler.report()
+    assert list(report["phases"]) == ["validation", "serialization"]
+    components = {entry["component"] for entry in report["components"]}
+    assert {"compile", "name"} <= components
+    assert len(profiler.report(top=1)["components"]) == 1
+    assert json.loads(profiler.report_json())["phases"]["validation"]["calls"] == 2
+
+
+def test_summary_and_allocations():
+    tracing = tracemalloc.is_tracing()
+    with profile(trace_allocations=True) as profiler:
+        with phase("dedupe", "x" * 100):
+            kept = [bytearray(1 << 16)]
+    assert tracemalloc.is_tracing() == tracing
+    assert profiler.phases["dedupe"].allocated > 60000
+    summary = profiler.summary()
+    assert "alloc KiB" in summary
+    assert "dedupe: xxx" in summary and "..." in summary
+    del kept
+
+
+def test_profiles_are_scoped_to_their_context():
+    def other():
+        with phase("dedupe"):
+            pass
+
+    with profile() as profiler:
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+    assert profiler.phases == {}
+
+
+def test_concurrent_tasks_keep_their_own_span_stacks():
+    async def work(name):
+        with phase("dedupe", name):
+            await asyncio.sleep(0.01)
+            with phase("validation", name):
+                await asyncio.sleep(0)
+
+    async def main():
+        with profile() as profiler:
+            await asyncio.gather(work("a"), work("b"))
+        return profiler
+
+    profiler = asyncio.run(main())
+    # Both spans are outermost in their own task.
+    assert profiler.phases["dedupe"].calls == 2
+    assert profiler.phases["dedupe"].wall >= 0.02
+    assert profiler.components[("validation", "a")].calls == 1
+    assert profiler.components[("validation", "b")].calls == 1
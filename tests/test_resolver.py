@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from oapi_builder.errors import RefCycleError, RefResolutionError
+from oapi_builder.pointer import join_pointer, resolve_pointer, split_pointer
+from oapi_builder.resolver import RefResolver
+
+R = "#/components/schemas/"
+
+
+def _doc(**schemas):
+    return {"openapi": "3.0.3", "components": {"schemas": schemas}}
+
+
+def test_pointers_escape_and_unescape():
+    pointer = join_pointer(["paths", "/pets/{id}", "a~b"])
+    assert pointer == "/paths/~1pets~1{id}/a~0b"
+    assert split_pointer(pointer) == ["paths", "/pets/{id}", "a~b"]
+    assert resolve_pointer({"a": [{"b": 1}]}, "/a/0/b") == 1
+    with pytest.raises(RefResolutionError):
+        resolve_pointer({"a": []}, "/a/1")
+
+
+def test_dereference_inlines_and_shares_targets():
+    resolver = RefResolver(
+        _doc(
+            Name={"type": "string"},
+            Pet={"properties": {"a": {"$ref": R + "Name"}, "b": {"$ref": R + "Name"}}},
+        )
+    )
+    pet = resolver.dereference_ref(R + "Pet")
+    assert pet == {"properties": {"a": {"type": "string"}, "b": {"type": "string"}}}
+    assert pet["properties"]["a"] is pet["properties"]["b"]
+    assert resolver.dereference_ref(R + "Pet") is pet
+
+
+def test_recursive_schemas_keep_the_closing_ref():
+    resolver = RefResolver(_doc(Node={"properties": {"next": {"$ref": R + "Node"}}}))
+    assert resolver.dereference_ref(R + "Node") == {
+        "properties": {"next": {"$ref": R + "Node"}}
+    }
+    with pytest.raises(RefCycleError) as info:
+        resolver.dereference_ref(R + "Node", on_cycle="error")
+    assert info.value.cycle == (("", "/components/schemas/Node"),) * 2
+
+
+def test_mutual_recursion_through_a_bare_ref_keeps_a_ref():
+    resolver = RefResolver(_doc(A={"$ref": R + "B"}, B={"items": {"$ref": R + "A"}}))
+    assert resolver.dereference_ref(R + "A") == {"items": {"$ref": R + "A"}}
+
+
+@pytest.mark.parametrize("on_cycle", ["ref", "error"])
+def test_loops_of_bare_refs_always_raise(on_cycle):
+    resolver = RefResolver(_doc(A={"$ref": R + "B"}, B={"$ref": R + "A"}))
+    for _ in range(2):
+        with pytest.raises(RefCycleError) as info:
+            resolver.dereference_ref(R + "A", on_cycle=on_cycle)
+        assert [pointer for _, pointer in info.value.cycle] == [
+            "/components/schemas/A",
+            "/components/schemas/B",
+            "/components/schemas/A",
+        ]
+    with pytest.raises(RefCycleError):
+        resolver.resolve(R + "A")
+
+
+def test_resolve_follows_chains_of_bare_refs():
+    resolver = RefResolver(_doc(A={"$ref": R + "B"}, B={"type": "integer"}))
+    assert resolver.resolve(R + "A") == ("", {"type": "integer"})
+
+
+def test_external_documents_are_loaded_once(tmp_path):
+    (tmp_path / "common.json").write_text(json.dumps(_doc(Error={"type": "object"})))
+    loads = []
+
+    def loader(uri):
+        loads.append(uri)
+        return json.loads(open(uri).read())
+
+    root = str(tmp_path / "root.json")
+    resolver = RefResolver({}, base_uri=root, loader=loader)
+    ref = "common.json" + R + "Error"
+    assert resolver.dereference_ref(ref) == {"type": "object"}
+    assert resolver.dereference({"a": {"$ref": ref}, "b": {"$ref": ref}}) == {
+        "a": {"type": "object"},
+        "b": {"type": "object"},
+    }
+    assert loads == [str(tmp_path / "common.json")]
+
+
+def test_invalidate_drops_entries_that_embed_an_edit():
+    doc = _doc(Name={"type": "string"}, Pet={"items": {"$ref": R + "Name"}})
+    resolver = RefResolver(doc)
+    assert resolver.dereference_ref(R + "Pet") == {"items": {"type": "string"}}
+    doc["components"]["schemas"]["Name"] = {"type": "integer"}
+    resolver.invalidate("", "/components/schemas/Name")
+    assert resolver.dereference_ref(R + "Pet") == {"items": {"type": "integer"}}
+
+
+def test_missing_targets():
+    with pytest.raises(RefResolutionError):
+        RefResolver(_doc()).dereference_ref(R + "Missing")
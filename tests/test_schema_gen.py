@@ -0,0 +1,259 @@
+import dataclasses
+import datetime
+import enum
+import uuid
+from typing import (
+    Annotated,
+    Dict,
+    FrozenSet,
+    Generic,
+    List,
+    Literal,
+    NamedTuple,
+    NewType,
+    Optional,
+    Tuple,
+    TypedDict,
+    TypeVar,
+    Union,
+)
+
+import pytest
+
+from oapi_builder.cache import BuildCache
+from oapi_builder.schema_gen import SchemaGenerator
+
+try:
+    import attr
+except ImportError:  # pragma: no cover - depends on the environment
+    attr = None
+
+T = TypeVar("T")
+R = "#/components/schemas/"
+UserId = NewType("UserId", int)
+
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclasses.dataclass
+class Pet:
+    name: str
+    tags: List[str]
+    color: Optional[Color] = None
+    born: datetime.date = dataclasses.field(
+        default=datetime.date(2020, 1, 1), metadata={"openapi": {"readOnly": True}}
+    )
+
+
+@dataclasses.dataclass
+class Tree:
+    value: int
+    children: List["Tree"]
+
+
+class Point(NamedTuple):
+    x: float
+    y: float = 0.0
+
+
+class Movie(TypedDict, total=False):
+    title: str
+
+
+@dataclasses.dataclass
+class Page(Generic[T]):
+    items: List[T]
+    total: int
+
+
+@dataclasses.dataclass
+class Wrapper(Generic[T]):
+    page: Page[T]
+    pages: List[Page[List[T]]]
+
+
+@pytest.mark.parametrize(
+    "tp, schema",
+    [
+        (int, {"type": "integer"}),
+        (bool, {"type": "boolean"}),
+        (uuid.UUID, {"type": "string", "format": "uuid"}),
+        (UserId, {"type": "integer"}),
+        (List[int], {"type": "array", "items": {"type": "integer"}}),
+        (
+            FrozenSet[str],
+            {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+        ),
+        (
+            Dict[str, float],
+            {"type": "object", "additionalProperties": {"type": "number"}},
+        ),
+        (Optional[str], {"type": "string", "nullable": True}),
+        (
+            Union[int, str],
+            {"anyOf": [{"type": "integer"}, {"type": "string"}]},
+        ),
+        (Literal["a", "b"], {"type": "string", "enum": ["a", "b"]}),
+        (Annotated[int, {"minimum": 0}], {"type": "integer", "minimum": 0}),
+        (
+            Tuple[int, str],
+            {
+                "type": "array",
+                "items": {"anyOf": [{"type": "integer"}, {"type": "string"}]},
+                "minItems": 2,
+                "maxItems": 2,
+            },
+        ),
+    ],
+)
+def test_annotations(tp, schema):
+    assert SchemaGenerator().schema_for(tp) == schema
+
+
+def test_dataclass_component():
+    gen = SchemaGenerator()
+    assert gen.schema_for(Pet) == {"$ref": R + "Pet"}
+    assert gen.components["Pet"] == {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "color": {"allOf": [{"$ref": R + "Color"}], "nullable": True},
+            "born": {"type": "string", "format": "date", "readOnly": True},
+        },
+        "required": ["name", "tags"],
+    }
+    assert gen.components["Color"] == {
+        "type": "string",
+        "title": "Color",
+        "enum": ["red", "blue"],
+    }
+
+
+def test_recursive_models_refer_to_themselves():
+    gen = SchemaGenerator()
+    gen.schema_for(Tree)
+    assert gen.components["Tree"]["properties"]["children"] == {
+        "type": "array",
+        "items": {"$ref": R + "Tree"},
+    }
+
+
+def test_named_tuples_and_typed_dicts():
+    gen = SchemaGenerator()
+    gen.schema_for(Point)
+    gen.schema_for(Movie)
+    assert gen.components["Point"]["required"] == ["x"]
+    assert "required" not in gen.components["Movie"]
+
+
+@pytest.mark.skipif(attr is None, reason="needs attrs")
+def test_attrs_classes():
+    @attr.s(auto_attribs=True)
+    class Owner:
+        name: str
+        age: int = 0
+
+    gen = SchemaGenerator()
+    gen.schema_for(Owner)
+    assert gen.components["Owner"]["required"] == ["name"]
+
+
+@pytest.mark.skipif(attr is None, reason="needs attrs")
+def test_attrs_fields_declared_without_annotations():
+    @attr.s
+    class Owner:
+        name = attr.ib(type=str)
+        pets = attr.ib(type=List[Pet], factory=list)
+        extra = attr.ib(default=None)
+
+    gen = SchemaGenerator()
+    gen.schema_for(Owner)
+    assert gen.components["Owner"] == {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "pets": {"type": "array", "items": {"$ref": R + "Pet"}},
+            "extra": {},
+        },
+        "required": ["name"],
+    }
+
+
+def test_dataclass_fields_outside_init_are_optional():
+    @dataclasses.dataclass
+    class Order:
+        quantity: int
+        total: float = dataclasses.field(init=False)
+
+        def __post_init__(self):
+            self.total = self.quantity * 1.5
+
+    gen = SchemaGenerator()
+    gen.schema_for(Order)
+    assert list(gen.components["Order"]["properties"]) == ["quantity", "total"]
+    assert gen.components["Order"]["required"] == ["quantity"]
+
+
+def test_types_are_analysed_once():
+    gen = SchemaGenerator()
+    first = gen.schema_for(List[Pet])
+    analysed = gen.analysed
+    assert gen.schema_for(List[Pet]) is first
+    assert gen.analysed == analysed
+
+
+def test_each_generic_binding_gets_its_own_component():
+    gen = SchemaGenerator()
+    assert gen.schema_for(Wrapper[int]) == {"$ref": R + "Wrapper_int"}
+    assert gen.schema_for(Wrapper[str]) == {"$ref": R + "Wrapper_str"}
+    assert gen.components["Wrapper_int"]["properties"]["page"] == {
+        "$ref": R + "Page_int"
+    }
+    assert gen.components["Wrapper_str"]["properties"]["page"] == {
+        "$ref": R + "Page_str"
+    }
+    assert gen.components["Page_int"]["properties"]["items"]["items"] == {
+        "type": "integer"
+    }
+    assert gen.components["Page_str"]["properties"]["items"]["items"] == {
+        "type": "string"
+    }
+    assert gen.components["Page_list_str"]["properties"]["items"]["items"] == {
+        "type": "array",
+        "items": {"type": "string"},
+    }
+    assert gen.schema_for(Page[int]) == {"$ref": R + "Page_int"}
+
+
+def test_name_clashes_get_suffixes():
+    def make():
+        @dataclasses.dataclass
+        class Pet:
+            other: int
+
+        return Pet
+
+    gen = SchemaGenerator()
+    gen.schema_for(Pet)
+    assert gen.component_name(make()) == "Pet2"
+
+
+def test_models_are_restored_from_the_cache(tmp_path):
+    first = SchemaGenerator(cache=BuildCache(str(tmp_path)))
+    ref = first.schema_for(Wrapper[int])
+    second = SchemaGenerator(cache=BuildCache(str(tmp_path)))
+    assert second.schema_for(Wrapper[int]) == ref
+    assert second.components == first.components
+    assert second.analysed == 0 and second.cache.hits == 1
+    # Restored components keep their names when referenced again.
+    assert second.schema_for(Page[int]) == {"$ref": R + "Page_int"}
+    assert list(second.components) == list(first.components)
+
+
+def test_unsupported_types():
+    with pytest.raises(TypeError):
+        SchemaGenerator().schema_for(complex)
@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+import yaml
+
+from oapi_builder import encoding
+from oapi_builder.serialize import dump_json, dump_yaml, iter_json, iter_yaml
+
+DOC = {
+    "openapi": "3.0.3",
+    "info": {"title": 'Pets "API" é', "version": "1.0"},
+    "paths": {
+        "/pets/{id}": {
+            "get": {
+                "tags": ["pets", "yes", "null", "on"],
+                "parameters": [{"name": "id", "in": "path", "required": True}],
+                "responses": {"200": {"description": "ok"}, "default": {}},
+            }
+        },
+        "/empty": {},
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "properties": {"name": {"type": "string", "example": "Rex 😀"}},
+                "example": {"score": 1.5, "ratio": 1e-05, "big": 1e20, "none": None},
+                "enum": [[], {}, "", "- x", "a: b", "#c", "12", "1.5", "~"],
+            }
+        }
+    },
+}
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_matches_json_dumps(indent):
+    text = "".join(iter_json(DOC, indent=indent))
+    assert json.loads(text) == DOC
+    expected = encoding.dumps_str(DOC, indent=indent is not None)
+    assert text == expected
+
+
+@pytest.mark.parametrize("stream_depth", [0, 1, 3, 10])
+def test_stream_depth_does_not_change_output(stream_depth):
+    text = "".join(iter_json(DOC, indent=2, stream_depth=stream_depth))
+    assert text == "".join(iter_json(DOC, indent=2))
+
+
+def test_iter_yaml_round_trips_through_safe_load():
+    assert yaml.safe_load("".join(iter_yaml(DOC))) == DOC
+
+
+@pytest.mark.parametrize(
+    "value",
+    [1e-05, 1e20, -2.5e-300, 0.1, 3.0, "😀", "\\ud83d", "\x7f\x85 ", "\t"],
+)
+def test_yaml_scalars_round_trip(value):
+    text = "".join(iter_yaml({"value": value}))
+    assert text.isascii()
+    assert yaml.safe_load(text) == {"value": value}
+
+
+def test_yaml_scalars_that_are_not_finite():
+    loaded = yaml.safe_load("".join(iter_yaml([float("inf"), float("-inf")])))
+    assert loaded == [float("inf"), float("-inf")]
+
+
+def test_dump_json_to_text_and_binary_files():
+    text, binary = io.StringIO(), io.BytesIO()
+    dump_json(DOC, text, indent=2, chunk_size=16)
+    dump_json(DOC, binary, indent=2, chunk_size=16)
+    assert binary.getvalue() == text.getvalue().encode("utf-8")
+    assert json.loads(text.getvalue()) == DOC
+
+
+def test_dump_yaml_to_socket_like_object():
+    class Socket:
+        def __init__(self):
+            self.data = b""
+
+        def sendall(self, data):
+            self.data += data
+
+    sock = Socket()
+    dump_yaml(DOC, sock)
+    assert yaml.safe_load(sock.data.decode("utf-8")) == DOC
+
+
+def test_nodes_with_oapi_items_are_expanded():
+    class Lazy:
+        def oapi_items(self):
+            yield "type", "string"
+
+    doc = {"components": {"schemas": {"Name": Lazy()}}}
+    expected = {"components": {"schemas": {"Name": {"type": "string"}}}}
+    assert json.loads("".join(iter_json(doc))) == expected
+    assert yaml.safe_load("".join(iter_yaml(doc))) == expected
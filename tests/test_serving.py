@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+import yaml
+
+from oapi_builder.serving import RenderedSpec
+
+DOC = {"openapi": "3.0.3", "info": {"title": "Pets", "version": "1"}, "paths": {}}
+
+
+@pytest.fixture
+def spec():
+    return RenderedSpec.from_document(DOC)
+
+
+def test_plain_and_gzip_responses(spec):
+    status, headers, body = spec.respond()
+    assert (status, body) == (200, spec.body)
+    assert headers["etag"] == spec.etag
+    assert headers["content-length"] == str(len(spec.body))
+    assert headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in headers
+    status, headers, body = spec.respond(accept_encoding="br, gzip;q=0.5")
+    assert gzip.decompress(body) == spec.body
+    assert headers["etag"] == spec.gzip_etag
+    assert headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize(
+    "header, compressed",
+    [
+        (None, False),
+        ("identity", False),
+        ("gzip;q=0", False),
+        ("x-gzip", True),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=bad", False),
+    ],
+)
+def test_accept_encoding(spec, header, compressed):
+    headers = spec.respond(accept_encoding=header)[1]
+    assert ("content-encoding" in headers) is compressed
+
+
+def test_conditional_requests(spec):
+    assert spec.respond(spec.etag)[0] == 304
+    assert spec.respond(f'W/{spec.gzip_etag}, "other"')[0] == 304
+    assert spec.respond("*") == (304, spec.respond("*")[1], b"")
+    assert spec.respond('"other"')[0] == 200
+    assert spec.respond(head=True)[2] == b""
+
+
+def test_etags_are_reproducible():
+    first = RenderedSpec.from_document(DOC, cache_control=None)
+    second = RenderedSpec.from_document(dict(DOC))
+    assert first.etag == second.etag
+    assert first.gzip_body == second.gzip_body
+    assert "cache-control" not in first.respond()[1]
+
+
+def test_canonical_and_yaml_rendering():
+    reordered = dict(reversed(list(DOC.items())))
+    assert (
+        RenderedSpec.from_document(reordered).etag
+        != RenderedSpec.from_document(DOC).etag
+    )
+    assert (
+        RenderedSpec.from_document(reordered, canonical=True).etag
+        == RenderedSpec.from_document(DOC, canonical=True).etag
+    )
+    rendered = RenderedSpec.from_document(DOC, "yaml")
+    assert rendered.content_type == "application/yaml"
+    assert yaml.safe_load(rendered.body) == DOC
@@ -0,0 +1,155 @@
+import pytest
+
+from oapi_builder.errors import RefCycleError, RefResolutionError
+from oapi_builder.validators import SchemaCompiler, ValidationError, ValidationIssue
+
+R = "#/components/schemas/"
+
+DOC = {
+    "openapi": "3.0.3",
+    "paths": {
+        "/pets": {
+            "post": {
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"$ref": R + "Pet"}}}
+                },
+                "responses": {
+                    "2XX": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {"$ref": R + "Pet"},
+                                }
+                            }
+                        }
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "oneOf": [{"$ref": R + "Cat"}, {"$ref": R + "Dog"}],
+                "discriminator": {"propertyName": "kind", "mapping": {"kitty": "Cat"}},
+            },
+            "Cat": {
+                "type": "object",
+                "required": ["kind", "name"],
+                "properties": {
+                    "kind": {"type": "string"},
+                    "name": {"type": "string", "minLength": 1},
+                    "lives": {"type": "integer", "maximum": 9},
+                },
+            },
+            "Dog": {
+                "type": "object",
+                "required": ["kind"],
+                "properties": {"kind": {"type": "string"}},
+            },
+            "Tree": {
+                "type": "object",
+                "properties": {
+                    "children": {"type": "array", "items": {"$ref": R + "Tree"}}
+                },
+            },
+            "Alias": {"$ref": R + "Tree"},
+            "Loop": {"$ref": R + "Loop2"},
+            "Loop2": {"$ref": R + "Loop"},
+        }
+    },
+}
+
+
+def test_keywords():
+    validator = SchemaCompiler().compile(
+        {
+            "type": "object",
+            "required": ["id"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "string", "format": "uuid"},
+                "tags": {"type": "array", "uniqueItems": True, "items": {}},
+                "size": {"type": "number", "minimum": 0, "exclusiveMinimum": True},
+                "color": {"enum": ["red", 1]},
+                "note": {"type": "string", "nullable": True},
+            },
+        }
+    )
+    assert validator.is_valid(
+        {"id": "00000000-0000-0000-0000-000000000000", "size": 1, "note": None}
+    )
+    issues = validator.errors(
+        {"tags": [1, 1], "size": 0, "color": True, "note": 3, "extra": 1}
+    )
+    assert sorted(issue.keyword for issue in issues) == [
+        "additionalProperties",
+        "enum",
+        "minimum",
+        "required",
+        "type",
+        "uniqueItems",
+    ]
+    with pytest.raises(ValidationError) as info:
+        validator.validate({"id": "nope"})
+    assert info.value.issues == [
+        ValidationIssue("/id", "format", "is not a valid uuid")
+    ]
+
+
+def test_request_and_response_validators():
+    compiler = SchemaCompiler(DOC)
+    request = compiler.request_validator("/pets", "POST")
+    assert request.is_valid({"kind": "Dog"})
+    assert request.is_valid({"kind": "kitty", "name": "Tom"})
+    assert [issue.path for issue in request.errors({"kind": "Cat", "lives": 10})] == [
+        "",
+        "/lives",
+    ]
+    (issue,) = request.errors({"kind": "Fish"})
+    assert (issue.path, issue.keyword) == ("/kind", "discriminator")
+    for kind in (["Cat"], {"Cat": 1}, 1):
+        (issue,) = request.errors({"kind": kind})
+        assert (issue.path, issue.keyword) == ("/kind", "discriminator")
+    response = compiler.response_validator("/pets", "post", 201)
+    assert response.errors([{"kind": "Dog"}, {}])[0].path == "/1"
+    assert compiler.request_validator("/pets", "post") is request
+    with pytest.raises(KeyError):
+        compiler.response_validator("/pets", "post", 404)
+
+
+def test_recursive_and_aliased_refs():
+    compiler = SchemaCompiler(DOC)
+    validator = compiler.compile({"$ref": R + "Alias"})
+    assert validator.is_valid({"children": [{"children": []}]})
+    (issue,) = validator.errors({"children": [{"children": [1]}]})
+    assert issue.path == "/children/0/children/0"
+
+
+def test_loops_of_bare_refs_fail_to_compile():
+    compiler = SchemaCompiler(DOC)
+    with pytest.raises(RefCycleError) as info:
+        compiler.compile({"properties": {"x": {"$ref": R + "Loop"}}})
+    assert info.value.cycle[0] == info.value.cycle[-1]
+    with pytest.raises(RefCycleError):
+        compiler.compile({"$ref": R + "Loop2"})
+    with pytest.raises(RefCycleError):
+        compiler.compile({"$ref": R + "Loop"})
+
+
+def test_failed_refs_do_not_leave_trampolines_behind():
+    doc = {"components": {"schemas": {"Broken": {"items": {"$ref": R + "Gone"}}}}}
+    compiler = SchemaCompiler(doc)
+    for _ in range(2):
+        with pytest.raises(RefResolutionError):
+            compiler.compile({"$ref": R + "Broken"})
+
+
+def test_equal_schemas_compile_once():
+    compiler = SchemaCompiler()
+    first = compiler.compile({"type": "string", "maxLength": 3})
+    second = compiler.compile({"maxLength": 3, "type": "string"})
+    assert compiler.compiled == 1
+    assert compiler.hits == 1
+    assert first._check is second._check